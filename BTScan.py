@@ -11,6 +11,7 @@ from bleak.backends.device import BLEDevice
 from bleak.exc import BleakError
 import sys
 import os
+import time
 from typing import List, Dict, Optional, Tuple
 import json
 from datetime import datetime
@@ -53,6 +54,7 @@ def load_models_json():
     color_temp_cmds = []
     color_cmds = []
     query_cmds = []
+    handshakes = {}
     
     for model in models_data:
         # Collect UUIDs
@@ -61,6 +63,10 @@ def load_models_json():
         if 'read_uuid' in model:
             read_uuids.add(model['read_uuid'])
         
+        # Collect login handshakes by model name
+        if model.get('handshake') and 'name' in model:
+            handshakes.setdefault(model['name'].lower(), model['handshake'])
+        
         # Collect commands
         if 'commands' in model:
             cmds = model['commands']
@@ -109,7 +115,8 @@ def load_models_json():
         'white': white_cmds,
         'color_temp': color_temp_cmds,
         'color': color_cmds,
-        'query': query_cmds
+        'query': query_cmds,
+        'handshakes': handshakes
     }
 
 # Load commands from models.json
@@ -139,6 +146,7 @@ if models_commands:
             )
     # Query commands
     QUERY_COMMANDS = [(cmd, f"Query from {i}") for i, cmd in enumerate(models_commands['query'])]
+    KNOWN_HANDSHAKES = models_commands['handshakes']
 else:
     KNOWN_WRITE_UUIDS = []
     KNOWN_READ_UUIDS = []
@@ -148,6 +156,7 @@ else:
     KNOWN_COLOR_TEMP = []
     NEW_COLOR_COMMANDS = []
     QUERY_COMMANDS = []
+    KNOWN_HANDSHAKES = {}
     print(f"ERROR: models.json not found or invalid, no commands loaded. Please ensure models.json is in the correct location.\n")
 
 print(f"Loaded {len(KNOWN_TURN_ON)} turn_on commands from models")
@@ -155,6 +164,12 @@ print(f"Loaded {len(KNOWN_TURN_OFF)} turn_off commands from models")
 print(f"Loaded {len(NEW_COLOR_COMMANDS)} color command templates from models")
 print(f"Loaded {len(QUERY_COMMANDS)} query commands from models\n")
 
+# Login used by MELK/MODELX devices without a handshake in models.json
+DEFAULT_HANDSHAKE = [
+    {"write": [0x7e, 0x07, 0x83], "ack": True, "min_delay": 0.2, "max_delay": 1.0},
+    {"write": [0x7e, 0x04, 0x04], "ack": True, "min_delay": 0.2, "max_delay": 1.0},
+]
+
 # Additional new turn on/off commands for testing (beyond models.json)
 NEW_TURN_ON_COMMANDS = []
 NEW_TURN_OFF_COMMANDS = []
@@ -452,18 +467,52 @@ class LEDStripDiscovery:
             except ValueError:
                 print("Invalid input")
     
+    def _get_handshake(self, device: BLEDevice) -> Optional[List[Dict]]:
+        """Handshake of the longest model name matching the device name"""
+        name = (device.name or "").lower()
+        matches = [model_name for model_name in KNOWN_HANDSHAKES if name.startswith(model_name)]
+        if matches:
+            return KNOWN_HANDSHAKES[max(matches, key=len)]
+        if name.startswith("melk") or name.startswith("modelx"):
+            return DEFAULT_HANDSHAKE
+        return None
+    
     async def _execute_login(self, client: BleakClient, device: BLEDevice, char_uuid: str):
-        """Execute login procedure for MELK/MODELX devices"""
-        if device.name and (device.name.lower().startswith("melk") or device.name.lower().startswith("modelx")):
-            try:
-                print("Executing login procedure...")
-                await client.write_gatt_char(char_uuid, bytes([0x7e, 0x07, 0x83]), response=False)
-                await asyncio.sleep(1)
-                await client.write_gatt_char(char_uuid, bytes([0x7e, 0x04, 0x04]), response=False)
-                await asyncio.sleep(1)
-                print("Login completed!\n")
-            except Exception as e:
-                print(f"Login procedure failed: {e}\n")
+        """Execute login handshake for MELK/MODELX devices.
+        
+        Each step waits min_delay once the write is acknowledged by the device
+        (write with response), or max_delay when no acknowledgement is possible.
+        """
+        handshake = self._get_handshake(device)
+        if not handshake:
+            return
+        try:
+            print("Executing login procedure...")
+            char = client.services.get_characteristic(char_uuid)
+            can_ack = char is not None and 'write' in char.properties
+            start = time.monotonic()
+            fixed = 0.0
+            for step in handshake:
+                step_start = time.monotonic()
+                min_delay = step.get("min_delay", 0.1)
+                max_delay = step.get("max_delay", 1.0)
+                fixed += max_delay
+                acked = False
+                if step.get("ack") and can_ack:
+                    try:
+                        await client.write_gatt_char(char_uuid, bytes(step["write"]), response=True)
+                        acked = True
+                    except BleakError:
+                        can_ack = False
+                if not acked:
+                    await client.write_gatt_char(char_uuid, bytes(step["write"]), response=False)
+                delay = (min_delay if acked else max_delay) - (time.monotonic() - step_start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elapsed = time.monotonic() - start
+            print(f"Login completed in {elapsed:.2f}s (fixed delays {fixed:.2f}s)\n")
+        except Exception as e:
+            print(f"Login procedure failed: {e}\n")
     
     async def test_command(self, client: BleakClient, char_uuid: str, command: List[int], 
                           description: str, ask_user: bool = True, turn_on_first: List[int] = None) -> bool:
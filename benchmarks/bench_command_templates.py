@@ -0,0 +1,132 @@
+"""Micro-benchmark: precompiled command templates vs. list-based getters.
+
+Usage:
+    python benchmarks/bench_command_templates.py [model] [iterations]
+
+The "legacy" functions below reproduce the previous Model getters, which
+copied the command list, rescanned it for placeholders on every call and
+left the list-to-bytes conversion to write_gatt_char.
+
+Every path builds a frame in about a microsecond, against milliseconds for
+the BLE write that follows, and the differences are within run-to-run noise
+for some commands (color_temp in particular), so the result is printed as
+the median and spread of several repeats rather than a single best time.
+"""
+import importlib
+import statistics
+import sys
+import timeit
+import types
+from pathlib import Path
+
+COMPONENT_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "elkbledom"
+
+
+def load_model_module():
+    """Load model.py without the package __init__ so Home Assistant is not required."""
+    package = types.ModuleType("elkbledom_bench")
+    package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules[package.__name__] = package
+    return importlib.import_module("elkbledom_bench.model")
+
+
+def legacy_get_color_cmd(models, internal_key, r, g, b):
+    if internal_key in models:
+        cmd = models[internal_key].get("commands", {}).get("color", []).copy()
+        result = []
+        for x in cmd:
+            if x == "r":
+                result.append(r)
+            elif x == "g":
+                result.append(g)
+            elif x == "b":
+                result.append(b)
+            else:
+                result.append(x)
+        return result
+    return None
+
+
+def legacy_get_brightness_cmd(models, internal_key, intensity):
+    if internal_key in models:
+        cmd = models[internal_key].get("commands", {}).get("brightness", []).copy()
+        cmd = [int(intensity * 100 / 255) if x == "i" else x for x in cmd]
+        return cmd
+    return None
+
+
+def legacy_get_color_temp_cmd(models, internal_key, warm, cold):
+    if internal_key in models:
+        cmd = models[internal_key].get("commands", {}).get("color_temp", []).copy()
+        result = []
+        for x in cmd:
+            if x == "w":
+                result.append(int(warm))
+            elif x == "c":
+                result.append(int(cold))
+            else:
+                result.append(x)
+        return result
+    return None
+
+
+REPEAT = 7
+
+
+def measure(func, number: int):
+    """Time per call (ns) of each repeat."""
+    return [total / number * 1e9 for total in timeit.repeat(func, number=number, repeat=REPEAT)]
+
+
+def format_times(times) -> str:
+    return f"{statistics.median(times):.0f} ({min(times):.0f}-{max(times):.0f})"
+
+
+def main() -> None:
+    model_key = sys.argv[1] if len(sys.argv) > 1 else "ELK-BLEDOM"
+    number = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+
+    model_module = load_model_module()
+    models = model_module.load_models(COMPONENT_DIR / "models.json")
+    if model_key not in models:
+        sys.exit(f"Unknown model {model_key}, available: {', '.join(sorted(models))}")
+    manager = model_module.Model()
+    manager._models = models
+    spec = manager.get_spec(model_key)
+
+    # Sanity check: both paths must produce the same frames
+    assert bytes(legacy_get_color_cmd(models, model_key, 1, 2, 3)) == bytes(manager.get_color_cmd(model_key, 1, 2, 3))
+    assert bytes(legacy_get_brightness_cmd(models, model_key, 50)) == bytes(manager.get_brightness_cmd(model_key, 50))
+    assert bytes(legacy_get_color_temp_cmd(models, model_key, 30, 70)) == bytes(manager.get_color_temp_cmd(model_key, 30, 70))
+
+    cases = {
+        "color": (
+            lambda: bytes(legacy_get_color_cmd(models, model_key, 10, 20, 30)),
+            lambda: manager.get_color_cmd(model_key, 10, 20, 30),
+            lambda: spec.color_cmd(10, 20, 30),
+        ),
+        "brightness": (
+            lambda: bytes(legacy_get_brightness_cmd(models, model_key, 50)),
+            lambda: manager.get_brightness_cmd(model_key, 50),
+            lambda: spec.brightness_cmd(50),
+        ),
+        "color_temp": (
+            lambda: bytes(legacy_get_color_temp_cmd(models, model_key, 30, 70)),
+            lambda: manager.get_color_temp_cmd(model_key, 30, 70),
+            lambda: spec.color_temp_cmd(30, 70),
+        ),
+    }
+
+    print(f"Model {model_key}, {number} iterations per case, median (min-max) of {REPEAT} repeats")
+    print(f"{'command':<12}{'legacy ns/op':>22}{'getter ns/op':>22}{'spec ns/op':>22}{'legacy/spec':>13}{'getter/spec':>13}")
+    for name, (legacy, getter, spec_path) in cases.items():
+        legacy_times = measure(legacy, number)
+        getter_times = measure(getter, number)
+        spec_times = measure(spec_path, number)
+        spec_median = statistics.median(spec_times)
+        print(f"{name:<12}{format_times(legacy_times):>22}{format_times(getter_times):>22}{format_times(spec_times):>22}"
+              f"{statistics.median(legacy_times) / spec_median:>12.2f}x{statistics.median(getter_times) / spec_median:>12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Import-time benchmark for the elkbledom integration.
+
+Usage:
+    python benchmarks/bench_import_time.py [runs]
+
+Each run imports the integration and all its platforms in a fresh interpreter,
+after Home Assistant and bleak are already imported, so only the integration's
+own import cost is measured. An audit hook records every file opened during
+the import; the benchmark fails if any data file (models.json,
+definitions.json, ...) is read, since import must do no file I/O.
+
+Requires a Python environment with Home Assistant installed.
+"""
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = r"""
+import json, sys, time
+
+# Import Home Assistant dependencies up front so they are not measured
+import homeassistant.components.bluetooth
+import homeassistant.components.light
+import homeassistant.components.number
+import homeassistant.components.select
+import homeassistant.components.switch
+import homeassistant.config_entries
+import bleak_retry_connector
+
+opened = []
+
+def audit(event, args):
+    if event == "open" and isinstance(args[0], str) and "elkbledom" in args[0]:
+        if not args[0].endswith((".py", ".pyc")):
+            opened.append(args[0])
+
+sys.addaudithook(audit)
+start = time.perf_counter()
+import custom_components.elkbledom
+import custom_components.elkbledom.config_flow
+import custom_components.elkbledom.light
+import custom_components.elkbledom.number
+import custom_components.elkbledom.select
+import custom_components.elkbledom.switch
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "opened": opened}))
+"""
+
+
+def run_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    samples = []
+    opened = set()
+    for _ in range(runs):
+        result = run_once()
+        samples.append(result["elapsed"] * 1000)
+        opened.update(result["opened"])
+
+    print(f"Import of custom_components.elkbledom and platforms, {runs} runs")
+    print(f"  min {min(samples):.2f} ms, median {statistics.median(samples):.2f} ms, max {max(samples):.2f} ms")
+    if opened:
+        print("FAIL: files read during import:")
+        for path in sorted(opened):
+            print(f"  {path}")
+        sys.exit(1)
+    print("OK: no data files read during import")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Packet-to-GATT latency benchmark for the DDP / E1.31 UDP bridge.
+
+Usage:
+    python benchmarks/bench_udp_bridge.py [ddp|e131] [fps] [seconds] [gatt_write_ms]
+
+A sender thread sends RGB packets to the bridge over local UDP at the given
+rate. The strip is simulated by a client whose GATT write takes
+gatt_write_ms. Each packet carries its sequence number in the red and green
+channels, so every write can be matched with the moment its packet was sent.
+Latency is measured from the sendto() call to the end of the GATT write.
+"""
+import asyncio
+import importlib
+import socket
+import statistics
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+COMPONENT_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "elkbledom"
+DDP_PORT = 14048
+E131_PORT = 15568
+UNIVERSE = 1
+CHANNEL = 1
+
+
+def load_module(name):
+    """Load a component module without the package __init__ so Home Assistant is not required."""
+    package = sys.modules.get("elkbledom_bench")
+    if package is None:
+        package = types.ModuleType("elkbledom_bench")
+        package.__path__ = [str(COMPONENT_DIR)]
+        sys.modules[package.__name__] = package
+    return importlib.import_module(f"elkbledom_bench.{name}")
+
+
+def ddp_packet(seq: int) -> bytes:
+    payload = bytes((seq >> 8, seq & 0xFF, 0x5A))
+    return bytes((0x41, seq & 0x0F, 0x01, 0x01)) + (0).to_bytes(4, "big") + len(payload).to_bytes(2, "big") + payload
+
+
+def e131_packet(seq: int) -> bytes:
+    slots = bytes((seq >> 8, seq & 0xFF, 0x5A))
+    packet = bytearray(126 + len(slots))
+    packet[0:2] = (0x0010).to_bytes(2, "big")
+    packet[4:16] = b"ASC-E1.17\x00\x00\x00"
+    packet[113:115] = UNIVERSE.to_bytes(2, "big")
+    packet[123:125] = (len(slots) + 1).to_bytes(2, "big")
+    packet[125] = 0
+    packet[126:] = slots
+    return bytes(packet)
+
+
+class FakeClient:
+    def __init__(self, write_time: float) -> None:
+        self.write_time = write_time
+        self.writes = []
+
+    async def write_gatt_char(self, char, data, response=False):
+        await asyncio.sleep(self.write_time)
+        self.writes.append((time.monotonic(), data))
+
+
+class FakeInstance:
+    """Just the streaming API of BLEDOMInstance."""
+
+    def __init__(self, streaming, client) -> None:
+        self.name = "bench"
+        self._streaming = streaming
+        self._client = client
+        self._stream = None
+
+    async def start_stream(self):
+        self._stream = self._streaming.StreamingSession(
+            self.name, self._client, None, lambda r, g, b: bytes((0x7E, 0x00, 0x05, 0x03, r, g, b, 0x00, 0xEF)))
+        self._stream.start()
+        return self._stream
+
+    def push_color(self, r, g, b, received_at=None):
+        return self._stream is not None and self._stream.push(r, g, b, received_at)
+
+    async def stop_stream(self):
+        session, self._stream = self._stream, None
+        if session:
+            await session.stop()
+            return session.stats
+        return {}
+
+
+def send(protocol: str, fps: float, seconds: float, sent_at: list) -> None:
+    port = DDP_PORT if protocol == "ddp" else E131_PORT
+    build = ddp_packet if protocol == "ddp" else e131_packet
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    interval = 1.0 / fps
+    start = time.monotonic()
+    for seq in range(int(fps * seconds)):
+        delay = start + seq * interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        packet = build(seq)
+        sent_at.append(time.monotonic())
+        sock.sendto(packet, ("127.0.0.1", port))
+    sock.close()
+
+
+async def run(protocol: str, fps: float, seconds: float, write_time: float) -> None:
+    udp_bridge = load_module("udp_bridge")
+    streaming = load_module("streaming")
+    client = FakeClient(write_time)
+    instance = FakeInstance(streaming, client)
+    bridge = udp_bridge.UdpBridge("127.0.0.1", DDP_PORT, E131_PORT)
+    await bridge.start()
+    bridge.add_target("bench", UNIVERSE, CHANNEL, instance)
+
+    sent_at = []
+    sender = threading.Thread(target=send, args=(protocol, fps, seconds, sent_at))
+    sender.start()
+    while sender.is_alive():
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(write_time * 3 + 0.1)
+    stream_stats = await instance.stop_stream()
+    await bridge.stop()
+
+    latencies = []
+    for written_at, frame in client.writes:
+        seq = frame[4] << 8 | frame[5]
+        latencies.append((written_at - sent_at[seq]) * 1000)
+    latencies.sort()
+    print(f"{protocol}: {len(sent_at)} packets at {fps:g} fps, simulated GATT write {write_time * 1000:g} ms")
+    print(f"  bridge: {bridge.stats}")
+    print(f"  stream: {stream_stats}")
+    if latencies:
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+        print(f"  packet-to-GATT latency: min {latencies[0]:.2f} ms, median {statistics.median(latencies):.2f} ms, "
+              f"p95 {p95:.2f} ms, max {latencies[-1]:.2f} ms")
+    last = client.writes[-1][1] if client.writes else None
+    if last is None or (last[4] << 8 | last[5]) != len(sent_at) - 1:
+        print("FAIL: last packet was not the last color written")
+        sys.exit(1)
+    print("OK: last packet reached the strip")
+
+
+def main() -> None:
+    protocol = sys.argv[1] if len(sys.argv) > 1 else "ddp"
+    fps = float(sys.argv[2]) if len(sys.argv) > 2 else 40
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 3
+    write_time = float(sys.argv[4]) / 1000 if len(sys.argv) > 4 else 0.015
+    asyncio.run(run(protocol, fps, seconds, write_time))
+
+
+if __name__ == "__main__":
+    main()
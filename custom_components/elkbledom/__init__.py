@@ -8,10 +8,15 @@ from homeassistant.core import HomeAssistant, Event, ServiceCall
 from homeassistant.const import CONF_MAC, EVENT_HOMEASSISTANT_STOP, ATTR_ENTITY_ID
 from homeassistant.const import Platform
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
 
-from .const import DOMAIN, CONF_RESET, CONF_DELAY, CONF_MODEL
+from .const import DOMAIN, CONF_RESET, CONF_DELAY, CONF_MODEL, CONF_UDP_UNIVERSE, CONF_UDP_CHANNEL, CONF_CONNECT_CONCURRENCY, CONF_ADAPTIVE_DELAY
 from .elkbledom import BLEDOMInstance
 from .model import ensure_models_loaded
+from .definitions import ensure_definitions_loaded
+from .gatt_cache import async_get_gatt_cache
+from .connect_scheduler import get_connect_scheduler
+from .udp_bridge import async_add_udp_target, async_remove_udp_target
 import logging
 
 LOGGER = logging.getLogger(__name__)
@@ -25,6 +30,7 @@ PLATFORMS: list[Platform] = [
 # Service names
 SERVICE_SET_RANDOM_COLOR = "set_random_color"
 SERVICE_SET_RGB_COLOR = "set_rgb_color"
+SERVICE_PREPARE = "prepare"
 
 # Service schemas
 SERVICE_SET_RANDOM_COLOR_SCHEMA = vol.Schema({
@@ -40,22 +46,32 @@ SERVICE_SET_RGB_COLOR_SCHEMA = vol.Schema({
     vol.Optional("brightness", default=255): vol.All(vol.Coerce(int), vol.Range(min=0, max=255)),
 })
 
+SERVICE_PREPARE_SCHEMA = vol.Schema({
+    vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+    vol.Optional("duration", default=10): vol.All(vol.Coerce(float), vol.Range(min=1, max=600)),
+})
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up ElkBLEDOM from a config entry."""
     reset = entry.options.get(CONF_RESET, None) or entry.data.get(CONF_RESET, None)
     delay = entry.options.get(CONF_DELAY, None) or entry.data.get(CONF_DELAY, None)
     mac = entry.options.get(CONF_MAC, None) or entry.data.get(CONF_MAC, None)
     forced_model = entry.options.get(CONF_MODEL, None) or entry.data.get(CONF_MODEL, None)
-    LOGGER.debug("Config: Reset: %s, Delay: %s, Mac: %s, Forced Model: %s", reset, delay, mac, forced_model)
+    adaptive_delay = entry.options.get(CONF_ADAPTIVE_DELAY, False)
+    LOGGER.debug("Config: Reset: %s, Delay: %s, Adaptive: %s, Mac: %s, Forced Model: %s", reset, delay, adaptive_delay, mac, forced_model)
 
     # Ensure models are loaded (will reuse if already in hass.data)
     await ensure_models_loaded(hass)
+    await ensure_definitions_loaded(hass)
+    await async_get_gatt_cache(hass)
     
-    instance = BLEDOMInstance(entry.data[CONF_MAC], reset, delay, hass, forced_model)
+    get_connect_scheduler(hass).set_limit(entry.entry_id, entry.options.get(CONF_CONNECT_CONCURRENCY))
+    instance = BLEDOMInstance(entry.data[CONF_MAC], reset, delay, hass, forced_model, adaptive_delay=adaptive_delay)
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = instance
    
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    await _async_setup_udp_target(hass, entry, instance)
 
     async def _async_stop(event: Event) -> None:
         """Close the connection."""
@@ -132,18 +148,63 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             schema=SERVICE_SET_RGB_COLOR_SCHEMA,
         )
     
+    if not hass.services.has_service(DOMAIN, SERVICE_PREPARE):
+        async def handle_prepare(call: ServiceCall) -> None:
+            """Handle the prepare service call, connecting in background."""
+            duration = call.data["duration"]
+            registry = er.async_get(hass)
+            instances = {}
+            for entity_id in call.data[ATTR_ENTITY_ID]:
+                entity = registry.async_get(entity_id)
+                instance = hass.data.get(DOMAIN, {}).get(entity.config_entry_id) if entity else None
+                if instance is None:
+                    LOGGER.warning("Cannot prepare %s: not an %s entity", entity_id, DOMAIN)
+                    continue
+                instances[instance.address] = instance
+            for instance in instances.values():
+                hass.async_create_task(_async_prepare(instance, duration))
+
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_PREPARE,
+            handle_prepare,
+            schema=SERVICE_PREPARE_SCHEMA,
+        )
+
     return True
+
+async def _async_prepare(instance: BLEDOMInstance, duration: float) -> None:
+    """Connect a strip ahead of use, logging instead of raising."""
+    try:
+        await instance.prepare(duration)
+    except Exception as error:  # pylint: disable=broad-except
+        LOGGER.warning("%s: Could not prepare connection: %s", instance.name, error)
    
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         instance = hass.data[DOMAIN][entry.entry_id]
+        await async_remove_udp_target(hass, entry.entry_id)
+        get_connect_scheduler(hass).set_limit(entry.entry_id, None)
         await instance.stop()
     return unload_ok
 
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     instance = hass.data[DOMAIN][entry.entry_id]
-    if entry.title != instance.name:
+    adaptive_delay = entry.options.get(CONF_ADAPTIVE_DELAY, False)
+    if entry.title != instance.name or adaptive_delay != (instance.idle_timeout_stats is not None):
         await hass.config_entries.async_reload(entry.entry_id)
+        return
+    get_connect_scheduler(hass).set_limit(entry.entry_id, entry.options.get(CONF_CONNECT_CONCURRENCY))
+    await _async_setup_udp_target(hass, entry, instance)
+
+async def _async_setup_udp_target(hass: HomeAssistant, entry: ConfigEntry, instance: BLEDOMInstance) -> None:
+    """Map the strip to its DDP / E1.31 universe and channel, if configured."""
+    await async_remove_udp_target(hass, entry.entry_id)
+    universe = entry.options.get(CONF_UDP_UNIVERSE, 0)
+    if universe:
+        channel = entry.options.get(CONF_UDP_CHANNEL, 1)
+        LOGGER.debug("%s: Streaming from UDP universe %s, channel %s", instance.name, universe, channel)
+        await async_add_udp_target(hass, entry.entry_id, universe, channel, instance)
@@ -0,0 +1,132 @@
+"""Integration-wide table of the latest advertisement of each strip"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from homeassistant.components.bluetooth import (
+    BluetoothCallbackMatcher,
+    BluetoothChange,
+    BluetoothScanningMode,
+    BluetoothServiceInfoBleak,
+    async_last_service_info,
+    async_register_callback,
+)
+from homeassistant.core import callback
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+LOGGER = logging.getLogger(__name__)
+
+# Advertisement tracker data key in hass.data
+ADVERTISEMENT_TRACKER_DATA_KEY = "elkbledom_advertisements"
+
+AdvertisementListener = Callable[[BluetoothServiceInfoBleak], None]
+
+
+class AdvertisementTracker:
+    """Latest advertisement of every subscribed strip, by address.
+
+    One bluetooth callback per subscribed address feeds the table, so it
+    covers every configured strip whatever name it advertises. Instances
+    look their device up in O(1) instead of scanning every device Home
+    Assistant has seen, and get new advertisements pushed.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._latest: Dict[str, BluetoothServiceInfoBleak] = {}
+        self._listeners: Dict[str, List[AdvertisementListener]] = {}
+        self._unsubscribes: Dict[str, Callable[[], None]] = {}
+        self.advertisements = 0
+
+    @callback
+    def async_stop(self) -> None:
+        for unsubscribe in self._unsubscribes.values():
+            unsubscribe()
+        self._unsubscribes.clear()
+
+    @callback
+    def _async_on_advertisement(self, service_info: BluetoothServiceInfoBleak, change: BluetoothChange) -> None:
+        address = service_info.address.upper()
+        self._latest[address] = service_info
+        self.advertisements += 1
+        listeners = self._listeners.get(address)
+        if listeners:
+            for listener in listeners:
+                listener(service_info)
+
+    def get(self, address: str) -> Optional[BluetoothServiceInfoBleak]:
+        """Latest advertisement of a device (RSSI, BLEDevice and time seen), None if not seen yet."""
+        address = address.upper()
+        service_info = self._latest.get(address)
+        if service_info is None:
+            # Not subscribed (yet), ask Home Assistant for what it saw last
+            service_info = async_last_service_info(self._hass, address, connectable=False)
+        return service_info
+
+    @callback
+    def async_subscribe(self, address: str, listener: AdvertisementListener) -> Callable[[], None]:
+        """Call listener with each new advertisement of a device, returns the unsubscribe function.
+
+        The first subscriber of an address registers its bluetooth callback,
+        which replays the advertisement Home Assistant already has right away.
+        """
+        address = address.upper()
+        listeners = self._listeners.setdefault(address, [])
+        listeners.append(listener)
+        if address not in self._unsubscribes:
+            self._unsubscribes[address] = async_register_callback(
+                self._hass,
+                self._async_on_advertisement,
+                BluetoothCallbackMatcher(address=address, connectable=False),
+                BluetoothScanningMode.ACTIVE,
+            )
+
+        @callback
+        def _unsubscribe() -> None:
+            listeners.remove(listener)
+            if not listeners:
+                self._listeners.pop(address, None)
+                self._latest.pop(address, None)
+                if (unsubscribe := self._unsubscribes.pop(address, None)) is not None:
+                    unsubscribe()
+
+        return _unsubscribe
+
+    @property
+    def has_listeners(self) -> bool:
+        return bool(self._listeners)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "devices": len(self._latest),
+            "subscribed": len(self._listeners),
+            "advertisements": self.advertisements,
+        }
+
+
+@callback
+def async_get_advertisement_tracker(hass: HomeAssistant) -> AdvertisementTracker:
+    """Get the advertisement tracker, creating it on first use."""
+    tracker: Optional[AdvertisementTracker] = hass.data.get(ADVERTISEMENT_TRACKER_DATA_KEY)
+    if tracker is None:
+        tracker = hass.data[ADVERTISEMENT_TRACKER_DATA_KEY] = AdvertisementTracker(hass)
+    return tracker
+
+
+def get_advertisement_tracker(hass: HomeAssistant) -> Optional[AdvertisementTracker]:
+    """Get the advertisement tracker if it has been started."""
+    return hass.data.get(ADVERTISEMENT_TRACKER_DATA_KEY)
+
+
+@callback
+def async_release_advertisement_tracker(hass: HomeAssistant) -> None:
+    """Stop the advertisement tracker once no strip listens to it."""
+    tracker: Optional[AdvertisementTracker] = hass.data.get(ADVERTISEMENT_TRACKER_DATA_KEY)
+    if tracker is not None and not tracker.has_listeners:
+        del hass.data[ADVERTISEMENT_TRACKER_DATA_KEY]
+        tracker.async_stop()
@@ -0,0 +1,309 @@
+"""Outbound command queue for LED strips"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from typing import AbstractSet, Any, AsyncContextManager, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# Command kinds, only the newest pending frame of each kind is sent
+KIND_COLOR = "color"
+KIND_BRIGHTNESS = "brightness"
+KIND_WHITE = "white"
+KIND_COLOR_TEMP = "color_temp"
+KIND_EFFECT = "effect"
+KIND_EFFECT_SPEED = "effect_speed"
+KIND_POWER = "power"
+
+COMMAND_KINDS = (
+    KIND_COLOR,
+    KIND_BRIGHTNESS,
+    KIND_WHITE,
+    KIND_COLOR_TEMP,
+    KIND_EFFECT,
+    KIND_EFFECT_SPEED,
+    KIND_POWER,
+)
+
+# Kinds only sent in the background lane
+KIND_TIME = "time"
+KIND_QUERY = "query"
+# Kinds written as sent, not tracked by the device-state shadow
+KIND_MIC = "mic"
+KIND_MIC_EFFECT = "mic_effect"
+KIND_MIC_SENSITIVITY = "mic_sensitivity"
+KIND_SCHEDULE_ON = "schedule_on"
+KIND_SCHEDULE_OFF = "schedule_off"
+
+# Lanes, interactive groups are always written before background ones
+LANE_INTERACTIVE = "interactive"
+LANE_BACKGROUND = "background"
+LANES = (LANE_INTERACTIVE, LANE_BACKGROUND)
+
+# Minimum time between two consecutive writes to the same device (seconds)
+MIN_WRITE_INTERVAL = 0.05
+# Smoothing factor for the measured write duration (exponential moving average)
+WRITE_TIME_SMOOTHING = 0.2
+# Smoothing factor for the lane latency (exponential moving average)
+LATENCY_SMOOTHING = 0.2
+
+
+class _Group:
+    """Frames submitted together, written back to back in order."""
+
+    __slots__ = ("frames", "queued_at")
+
+    def __init__(self) -> None:
+        # kind -> (frame, waiters)
+        self.frames: "OrderedDict[str, Tuple[Any, List[asyncio.Future]]]" = OrderedDict()
+        self.queued_at = time.monotonic()
+
+
+class CommandQueue:
+    """Latest-wins outbound queue for one device, drained by a single writer task.
+
+    Frames are keyed by command kind. Submitting a frame while another frame
+    of the same kind is still pending replaces it, so a burst of slider events
+    turns into a few writes that end on the final value. Writes are paced to
+    the write time measured on the link.
+
+    Each submit is a group: once the writer starts a group it writes all of
+    its frames in order under one hold of the connection, so frames of other
+    callers never land in between. A pending group loses the kinds a newer
+    group also sets.
+
+    Groups go to one of two lanes. Background groups are only started while
+    no interactive group waits, and the writer yields before each of them.
+    An interactive frame discards pending background frames of the kinds it
+    replaces (its own kind and, through supersedes, the kinds it makes
+    obsolete); their callers complete with False instead of True.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        writer: Callable[[Any], Awaitable[None]],
+        min_interval: float = MIN_WRITE_INTERVAL,
+        on_write: Optional[Callable[[str, Any], None]] = None,
+        supersedes: Optional[Callable[[str], AbstractSet[str]]] = None,
+        hold: Optional[Callable[[], AsyncContextManager[Any]]] = None,
+    ) -> None:
+        self._name = name
+        self._writer = writer
+        self._on_write = on_write
+        self._supersedes = supersedes
+        self._hold = hold
+        self._min_interval = min_interval
+        self._lanes: Dict[str, Deque[_Group]] = {lane: deque() for lane in LANES}
+        # Group being written, its frames still count as pending
+        self._active: Optional[_Group] = None
+        self._drain_task: Optional[asyncio.Task] = None
+        self._last_write = 0.0
+        self._write_time = 0.0
+        self.submitted = 0
+        self.written = 0
+        self.groups = 0
+        self.dropped = 0
+        self.discarded = 0
+        self._latency: Dict[str, float] = dict.fromkeys(LANES, 0.0)
+        self._max_latency: Dict[str, float] = dict.fromkeys(LANES, 0.0)
+        self._written_by_lane: Dict[str, int] = dict.fromkeys(LANES, 0)
+
+    @property
+    def interval(self) -> float:
+        """Current pacing interval between writes."""
+        return max(self._min_interval, self._write_time)
+
+    @property
+    def pending_kinds(self) -> AbstractSet[str]:
+        """Kinds with a frame waiting to be written, in any lane."""
+        kinds = set(self._active.frames) if self._active is not None else set()
+        for groups in self._lanes.values():
+            for group in groups:
+                kinds.update(group.frames)
+        return kinds
+
+    @property
+    def busy(self) -> bool:
+        """Whether frames are waiting or being written."""
+        return self._drain_task is not None and not self._drain_task.done()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Queue counters."""
+        return {
+            "submitted": self.submitted,
+            "written": self.written,
+            "groups": self.groups,
+            "dropped": self.dropped,
+            "discarded": self.discarded,
+            "pending": sum(len(group.frames) for groups in self._lanes.values() for group in groups),
+            "interval": round(self.interval, 4),
+            "lanes": {
+                lane: {
+                    "written": self._written_by_lane[lane],
+                    "latency_ms": round(self._latency[lane] * 1000, 1),
+                    "max_latency_ms": round(self._max_latency[lane] * 1000, 1),
+                }
+                for lane in LANES
+            },
+        }
+
+    async def submit(self, kind: str, frame: Any, lane: str = LANE_INTERACTIVE) -> bool:
+        """Queue a frame and wait until it (or a newer frame of the same kind) is written.
+
+        Returns False if an interactive frame discarded it.
+        """
+        results = await self.submit_many([(kind, frame)], lane)
+        return results[0]
+
+    async def submit_many(self, frames: List[Tuple[str, Any]], lane: str = LANE_INTERACTIVE) -> List[bool]:
+        """Queue frames as one group and wait until all of them are written."""
+        return await self.enqueue_many(frames, lane)
+
+    def enqueue_many(self, frames: List[Tuple[str, Any]], lane: str = LANE_INTERACTIVE) -> "asyncio.Future[List[bool]]":
+        """Queue frames as one group right away, the returned future completes once all are written."""
+        loop = asyncio.get_running_loop()
+        group = _Group()
+        futures = []
+        for kind, frame in frames:
+            future = loop.create_future()
+            futures.append(future)
+            if lane == LANE_INTERACTIVE:
+                self._discard_background(kind)
+            waiters = self._take_pending(lane, kind)
+            if kind in group.frames:
+                # Same kind twice in one group, the later frame wins
+                waiters += group.frames.pop(kind)[1]
+                self.dropped += 1
+            waiters.append(future)
+            group.frames[kind] = (frame, waiters)
+            self.submitted += 1
+        if group.frames:
+            self._lanes[lane].append(group)
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain())
+        return asyncio.gather(*futures)
+
+    def _take_pending(self, lane: str, kind: str) -> List[asyncio.Future]:
+        """Remove a pending frame of kind from the groups of a lane, returning its callers.
+
+        They complete with the newer write, which is where the removed frame went.
+        """
+        groups = self._lanes[lane]
+        for group in groups:
+            if kind in group.frames:
+                _, waiters = group.frames.pop(kind)
+                self.dropped += 1
+                if not group.frames:
+                    groups.remove(group)
+                return waiters
+        return []
+
+    def _discard_background(self, kind: str) -> None:
+        """Drop pending background frames an interactive frame of kind makes stale."""
+        groups = self._lanes[LANE_BACKGROUND]
+        if not groups:
+            return
+        stale = {kind}
+        if self._supersedes is not None:
+            stale |= self._supersedes(kind)
+        for group in list(groups):
+            for other in stale & group.frames.keys():
+                _, waiters = group.frames.pop(other)
+                self.discarded += 1
+                LOGGER.debug("%s: Discarding stale background %s frame", self._name, other)
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(False)
+            if not group.frames:
+                groups.remove(group)
+
+    async def _drain(self) -> None:
+        """Write pending groups one at a time, interactive first."""
+        interactive = self._lanes[LANE_INTERACTIVE]
+        background = self._lanes[LANE_BACKGROUND]
+        yielded = False
+        while interactive or background:
+            if interactive:
+                lane, group = LANE_INTERACTIVE, interactive.popleft()
+            elif not yielded:
+                # Give interactive callers a chance before each background group
+                yielded = True
+                await asyncio.sleep(0)
+                continue
+            else:
+                lane, group = LANE_BACKGROUND, background.popleft()
+            yielded = False
+            self._active = group
+            try:
+                await self._write_group(lane, group)
+            finally:
+                self._active = None
+
+    async def _write_group(self, lane: str, group: _Group) -> None:
+        self.groups += 1
+        waiters: List[asyncio.Future] = []
+        try:
+            async with self._hold() if self._hold is not None else nullcontext():
+                while group.frames:
+                    wait = self._last_write + self.interval - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    kind, (frame, waiters) = group.frames.popitem(last=False)
+                    start = time.monotonic()
+                    try:
+                        await self._writer(frame)
+                    finally:
+                        self._last_write = time.monotonic()
+                        elapsed = self._last_write - start
+                        self._write_time += (elapsed - self._write_time) * WRITE_TIME_SMOOTHING
+                    self.written += 1
+                    self._record_latency(lane, self._last_write - group.queued_at)
+                    if self._on_write is not None:
+                        self._on_write(kind, frame)
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_result(True)
+                    if len(waiters) > 1:
+                        LOGGER.debug("%s: Coalesced %d %s frames into one write", self._name, len(waiters), kind)
+        except asyncio.CancelledError:
+            for _, rest in group.frames.values():
+                waiters = waiters + rest
+            group.frames.clear()
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.cancel()
+            raise
+        except Exception as err:  # pylint: disable=broad-except
+            # The rest of the group is aborted, its callers retry it as a whole
+            for _, rest in group.frames.values():
+                waiters = waiters + rest
+            group.frames.clear()
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(err)
+
+    def _record_latency(self, lane: str, latency: float) -> None:
+        self._written_by_lane[lane] += 1
+        self._latency[lane] += (latency - self._latency[lane]) * LATENCY_SMOOTHING
+        self._max_latency[lane] = max(self._max_latency[lane], latency)
+
+    async def stop(self) -> None:
+        """Cancel the writer task and release any waiting callers."""
+        task, self._drain_task = self._drain_task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for groups in self._lanes.values():
+            for group in groups:
+                for _, waiters in group.frames.values():
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.cancel()
+            groups.clear()
@@ -15,7 +15,9 @@ from homeassistant.components.bluetooth import (
     async_discovered_service_info,
 )
 
-from .const import DOMAIN, CONF_RESET, CONF_DELAY, CONF_MODEL, CONF_EFFECTS_CLASS, EFFECTS_MAP
+from .const import DOMAIN, CONF_RESET, CONF_DELAY, CONF_MODEL, CONF_EFFECTS_CLASS, CONF_UDP_UNIVERSE, CONF_UDP_CHANNEL, CONF_CONNECT_CONCURRENCY, DEFAULT_CONNECT_CONCURRENCY, CONF_ADAPTIVE_DELAY
+from .definitions import ensure_definitions_loaded
+from .gatt_cache import async_get_gatt_cache
 import logging
 
 LOGGER = logging.getLogger(__name__)
@@ -213,7 +215,8 @@ class BLEDOMFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             LOGGER.error("No models available in manual setup! Check if models.json is loaded.")
         
         # Create effects class selector
-        effects_classes_dict = {class_name: class_name for class_name in EFFECTS_MAP.keys()}
+        definitions = await ensure_definitions_loaded(self.hass)
+        effects_classes_dict = {class_name: class_name for class_name in definitions.classes}
         
         return self.async_show_form(
             step_id="manual", data_schema=vol.Schema(
@@ -228,6 +231,7 @@ class BLEDOMFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     async def toggle_light(self):
         try:
             if not self._instance:
+                await async_get_gatt_cache(self.hass)
                 self._instance = BLEDOMInstance(self.mac, False, 120, self.hass, self._model_name)
             # Update to get current state
             await self._instance.update()
@@ -273,13 +277,17 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
             new_options = {
                 CONF_RESET: user_input[CONF_RESET],
-                CONF_DELAY: user_input[CONF_DELAY]
+                CONF_DELAY: user_input[CONF_DELAY],
+                CONF_ADAPTIVE_DELAY: user_input.get(CONF_ADAPTIVE_DELAY, False),
             }
             if CONF_MODEL in user_input:
                 # Value is already internal_key from vol.In
                 new_options[CONF_MODEL] = user_input[CONF_MODEL]
             if CONF_EFFECTS_CLASS in user_input:
                 new_options[CONF_EFFECTS_CLASS] = user_input[CONF_EFFECTS_CLASS]
+            new_options[CONF_UDP_UNIVERSE] = user_input.get(CONF_UDP_UNIVERSE, 0)
+            new_options[CONF_UDP_CHANNEL] = user_input.get(CONF_UDP_CHANNEL, 1)
+            new_options[CONF_CONNECT_CONCURRENCY] = user_input.get(CONF_CONNECT_CONCURRENCY, DEFAULT_CONNECT_CONCURRENCY)
             return self.async_create_entry(title="", data=new_options)
 
         # Ensure models are loaded
@@ -295,11 +303,13 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             current_effects_class = model_manager.get_effects_class(current_model)
         
         # Create effects class selector
-        effects_classes_dict = {class_name: class_name for class_name in EFFECTS_MAP.keys()}
+        definitions = await ensure_definitions_loaded(self.hass)
+        effects_classes_dict = {class_name: class_name for class_name in definitions.classes}
         
         schema_dict = {
             vol.Optional(CONF_RESET, default=options.get(CONF_RESET)): bool,
             vol.Optional(CONF_DELAY, default=options.get(CONF_DELAY)): int,
+            vol.Optional(CONF_ADAPTIVE_DELAY, default=options.get(CONF_ADAPTIVE_DELAY, False)): bool,
         }
         
         # Add model selector if models are available
@@ -317,6 +327,12 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 schema_dict[vol.Optional(CONF_EFFECTS_CLASS, default=current_effects_class)] = vol.In(effects_classes_dict)
             else:
                 schema_dict[vol.Optional(CONF_EFFECTS_CLASS)] = vol.In(effects_classes_dict)
+
+        # DDP / E1.31 mapping: RGB from 3 channels starting at udp_channel
+        schema_dict[vol.Optional(CONF_UDP_UNIVERSE, default=options.get(CONF_UDP_UNIVERSE, 0))] = vol.All(vol.Coerce(int), vol.Range(min=0, max=63999))
+        schema_dict[vol.Optional(CONF_UDP_CHANNEL, default=options.get(CONF_UDP_CHANNEL, 1))] = vol.All(vol.Coerce(int), vol.Range(min=1, max=510))
+        # Shared by all strips on an adapter, the lowest configured value applies
+        schema_dict[vol.Optional(CONF_CONNECT_CONCURRENCY, default=options.get(CONF_CONNECT_CONCURRENCY, DEFAULT_CONNECT_CONCURRENCY))] = vol.All(vol.Coerce(int), vol.Range(min=1, max=4))
         
         return self.async_show_form(
             step_id="user",
@@ -0,0 +1,166 @@
+"""Per-adapter scheduler for BLE connection attempts"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .connection_manager import PRIORITY_COMMAND, UNKNOWN_SOURCE
+from .const import DEFAULT_CONNECT_CONCURRENCY
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+LOGGER = logging.getLogger(__name__)
+
+# Connect scheduler data key in hass.data
+CONNECT_SCHEDULER_DATA_KEY = "elkbledom_connect_scheduler"
+
+# Highest configurable number of concurrent connection attempts per adapter
+MAX_CONNECT_CONCURRENCY = 4
+# RSSI used for ordering when a device has not been heard yet
+UNKNOWN_RSSI = -127
+# Smoothing factor for the queue and radio times (exponential moving average)
+TIME_SMOOTHING = 0.2
+
+
+class ConnectAttempt:
+    """Timing of one connection attempt."""
+
+    __slots__ = ("queued_at", "started_at", "wait", "radio")
+
+    def __init__(self) -> None:
+        self.queued_at = time.monotonic()
+        self.started_at = 0.0
+        # Time waiting for a turn and time spent connecting on the radio (seconds)
+        self.wait = 0.0
+        self.radio = 0.0
+
+
+class ConnectScheduler:
+    """Limits concurrent establish_connection calls per adapter or proxy.
+
+    BlueZ and proxies reject connections started while another one is in
+    progress, so attempts on a source are run a few at a time. Waiting
+    attempts are started in order: devices with user commands pending first,
+    then the strongest RSSI.
+
+    Holders provide `name`, `rssi` and `pending_commands`.
+    """
+
+    def __init__(self, limit: int = DEFAULT_CONNECT_CONCURRENCY) -> None:
+        self._default_limit = limit
+        # entry key -> configured limit, the lowest one applies
+        self._limits: Dict[str, int] = {}
+        self._running: Dict[str, int] = {}
+        # source -> [(attempt, priority, future, holder)]
+        self._waiters: Dict[str, List[Tuple[ConnectAttempt, int, asyncio.Future, Any]]] = {}
+        self.attempts = 0
+        self.queued = 0
+        self._wait_avg = 0.0
+        self._wait_max = 0.0
+        self._radio_avg = 0.0
+        self._radio_max = 0.0
+
+    @property
+    def limit(self) -> int:
+        return min(self._limits.values(), default=self._default_limit)
+
+    def set_limit(self, key: str, limit: Optional[int]) -> None:
+        """Set (or clear with None) the concurrency configured by one entry."""
+        if limit:
+            self._limits[key] = max(1, min(MAX_CONNECT_CONCURRENCY, limit))
+        else:
+            self._limits.pop(key, None)
+        for source in list(self._waiters):
+            self._start_next(source)
+
+    @asynccontextmanager
+    async def attempt(self, holder: Any, source: Optional[str], priority: int = PRIORITY_COMMAND) -> AsyncIterator[ConnectAttempt]:
+        """Wait for a turn on source, then time the attempt run inside the block."""
+        source = source or UNKNOWN_SOURCE
+        attempt = ConnectAttempt()
+        if self._running.get(source, 0) >= self.limit or self._waiters.get(source):
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.setdefault(source, []).append((attempt, priority, future, holder))
+            self.queued += 1
+            LOGGER.debug("%s: Waiting for a connection attempt slot on %s", holder.name, source)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._finish(source)
+                else:
+                    self._remove(source, future)
+                raise
+        else:
+            self._running[source] = self._running.get(source, 0) + 1
+        attempt.started_at = time.monotonic()
+        attempt.wait = attempt.started_at - attempt.queued_at
+        try:
+            yield attempt
+        finally:
+            attempt.radio = time.monotonic() - attempt.started_at
+            self._record(attempt)
+            self._finish(source)
+
+    def _finish(self, source: str) -> None:
+        self._running[source] -= 1
+        if not self._running[source]:
+            del self._running[source]
+        self._start_next(source)
+
+    def _remove(self, source: str, future: asyncio.Future) -> None:
+        waiters = self._waiters.get(source, [])
+        waiters[:] = [entry for entry in waiters if entry[2] is not future]
+        if not waiters:
+            self._waiters.pop(source, None)
+
+    def _start_next(self, source: str) -> None:
+        waiters = self._waiters.get(source)
+        while waiters and self._running.get(source, 0) < self.limit:
+            # Ordered when a turn frees up, commands may have arrived while waiting
+            entry = min(waiters, key=self._order)
+            waiters.remove(entry)
+            self._running[source] = self._running.get(source, 0) + 1
+            entry[2].set_result(None)
+        if not waiters:
+            self._waiters.pop(source, None)
+
+    @staticmethod
+    def _order(entry: Tuple[ConnectAttempt, int, asyncio.Future, Any]) -> Tuple[bool, int, float]:
+        attempt, priority, _, holder = entry
+        has_commands = priority == PRIORITY_COMMAND and holder.pending_commands > 0
+        rssi = holder.rssi if holder.rssi is not None else UNKNOWN_RSSI
+        return (not has_commands, -rssi, attempt.queued_at)
+
+    def _record(self, attempt: ConnectAttempt) -> None:
+        self.attempts += 1
+        self._wait_avg += (attempt.wait - self._wait_avg) * TIME_SMOOTHING
+        self._wait_max = max(self._wait_max, attempt.wait)
+        self._radio_avg += (attempt.radio - self._radio_avg) * TIME_SMOOTHING
+        self._radio_max = max(self._radio_max, attempt.radio)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "attempts": self.attempts,
+            "queued": self.queued,
+            "running": dict(self._running),
+            "waiting": {source: len(waiters) for source, waiters in self._waiters.items()},
+            "queue_wait_ms": round(self._wait_avg * 1000, 1),
+            "max_queue_wait_ms": round(self._wait_max * 1000, 1),
+            "radio_ms": round(self._radio_avg * 1000, 1),
+            "max_radio_ms": round(self._radio_max * 1000, 1),
+        }
+
+
+def get_connect_scheduler(hass: HomeAssistant) -> ConnectScheduler:
+    """Get the connect scheduler shared by all strips, creating it on first use."""
+    scheduler = hass.data.get(CONNECT_SCHEDULER_DATA_KEY)
+    if scheduler is None:
+        scheduler = hass.data[CONNECT_SCHEDULER_DATA_KEY] = ConnectScheduler()
+    return scheduler
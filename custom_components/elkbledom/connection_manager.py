@@ -0,0 +1,230 @@
+"""Integration-wide BLE connection slot manager"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+LOGGER = logging.getLogger(__name__)
+
+# Connection manager data key in hass.data
+CONNECTION_MANAGER_DATA_KEY = "elkbledom_connection_manager"
+
+# Connect request priorities, lower is served first
+PRIORITY_COMMAND = 0
+PRIORITY_BACKGROUND = 10
+
+# Slots per adapter or proxy when Home Assistant does not report them
+DEFAULT_SOURCE_SLOTS = 3
+# Source key for devices whose adapter is unknown
+UNKNOWN_SOURCE = "unknown"
+# Longest wait for a slot before giving up (seconds)
+ACQUIRE_TIMEOUT = 30.0
+# How often waiters look for an idle connection to evict (seconds)
+EVICT_POLL_INTERVAL = 0.5
+# Smoothing factor for the average slot wait (exponential moving average)
+WAIT_SMOOTHING = 0.2
+
+
+class _Lease:
+    __slots__ = ("holder", "source", "granted_at", "last_used")
+
+    def __init__(self, holder: Any, source: str) -> None:
+        self.holder = holder
+        self.source = source
+        self.granted_at = self.last_used = time.monotonic()
+
+
+class ConnectionManager:
+    """Grants connection leases per adapter or proxy.
+
+    Every connection needs a lease on the source (adapter or proxy) it goes
+    through. When a source is full, the least recently used idle connection
+    on it is evicted; if none is idle, the request waits in a priority queue
+    until a lease is released.
+
+    Holders provide `name`, `address`, `connection_idle` and `async release_connection()`.
+    """
+
+    def __init__(self, hass: Optional[HomeAssistant] = None, default_slots: int = DEFAULT_SOURCE_SLOTS) -> None:
+        self._hass = hass
+        self._default_slots = default_slots
+        self._leases: Dict[Any, _Lease] = {}
+        # source -> heap of (priority, sequence, future, holder)
+        self._waiters: Dict[str, List[Tuple[int, int, asyncio.Future, Any]]] = {}
+        self._sequence = itertools.count()
+        self.granted = 0
+        self.waited = 0
+        self.evictions = 0
+        self.timeouts = 0
+        self._wait_avg = 0.0
+        self._wait_max = 0.0
+
+    def capacity(self, source: str) -> int:
+        """Slots this integration may use on a source."""
+        allocations = self._allocations(source)
+        if allocations is None:
+            return self._default_slots
+        ours = {lease.holder.address for lease in self._leases.values() if lease.source == source}
+        foreign = sum(1 for address in allocations.allocated if address not in ours)
+        return max(1, allocations.slots - foreign)
+
+    def _allocations(self, source: str) -> Any:
+        if self._hass is None or source == UNKNOWN_SOURCE:
+            return None
+        try:
+            from habluetooth import get_manager  # pylint: disable=import-outside-toplevel
+
+            current = get_manager().async_current_allocations(source)
+        except Exception:  # pylint: disable=broad-except
+            return None
+        return current[0] if current else None
+
+    def _in_use(self, source: str) -> int:
+        return sum(1 for lease in self._leases.values() if lease.source == source)
+
+    def has_lease(self, holder: Any) -> bool:
+        return holder in self._leases
+
+    def touch(self, holder: Any) -> None:
+        """Mark a connection as used, moving it to the back of the eviction order."""
+        lease = self._leases.get(holder)
+        if lease is not None:
+            lease.last_used = time.monotonic()
+
+    async def acquire(self, holder: Any, source: Optional[str], priority: int = PRIORITY_COMMAND) -> float:
+        """Wait for a lease on source, returns the time spent waiting."""
+        if holder in self._leases:
+            self.touch(holder)
+            return 0.0
+        source = source or UNKNOWN_SOURCE
+        start = time.monotonic()
+        ahead = any(entry[0] <= priority for entry in self._waiters.get(source, ()))
+        if not ahead and self._in_use(source) < self.capacity(source):
+            self._grant(holder, source)
+            return self._record_wait(start)
+        if not ahead and (victim := self._take_idle(holder, source)) is not None:
+            await self._disconnect(victim)
+            return self._record_wait(start)
+
+        future = asyncio.get_running_loop().create_future()
+        waiters = self._waiters.setdefault(source, [])
+        heapq.heappush(waiters, (priority, next(self._sequence), future, holder))
+        LOGGER.debug("%s: Waiting for a connection slot on %s (%d in use)", holder.name, source, self._in_use(source))
+        deadline = start + ACQUIRE_TIMEOUT
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise asyncio.TimeoutError(f"No connection slot free on {source}")
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), min(remaining, EVICT_POLL_INTERVAL))
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                # Connections may have gone idle since the last look
+                if waiters and waiters[0][2] is future and (victim := self._take_idle(holder, source)) is not None:
+                    future.cancel()
+                    await self._disconnect(victim)
+                    break
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted right as the caller gave up
+                self.release(holder)
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            self._prune(source)
+        self.waited += 1
+        return self._record_wait(start)
+
+    def release(self, holder: Any) -> None:
+        """Return the lease of a holder, handing the slot to the next waiter."""
+        lease = self._leases.pop(holder, None)
+        if lease is None:
+            return
+        LOGGER.debug("%s: Released connection slot on %s after %.1fs",
+                     holder.name, lease.source, time.monotonic() - lease.granted_at)
+        self._grant_next(lease.source)
+
+    def _grant(self, holder: Any, source: str) -> None:
+        self._leases[holder] = _Lease(holder, source)
+        self.granted += 1
+
+    def _grant_next(self, source: str) -> None:
+        waiters = self._waiters.get(source)
+        while waiters and self._in_use(source) < self.capacity(source):
+            _, _, future, holder = heapq.heappop(waiters)
+            if future.done():
+                continue
+            self._grant(holder, source)
+            future.set_result(None)
+
+    def _prune(self, source: str) -> None:
+        waiters = self._waiters.get(source)
+        if waiters is None:
+            return
+        waiters[:] = [entry for entry in waiters if not entry[2].done()]
+        heapq.heapify(waiters)
+        if not waiters:
+            del self._waiters[source]
+
+    def _take_idle(self, holder: Any, source: str) -> Optional[Any]:
+        """Hand the slot of the least recently used idle connection on source to holder, returns its old holder."""
+        idle = [lease for lease in self._leases.values()
+                if lease.source == source and lease.holder.connection_idle]
+        if not idle:
+            return None
+        victim = min(idle, key=lambda lease: lease.last_used).holder
+        del self._leases[victim]
+        self._grant(holder, source)
+        self.evictions += 1
+        LOGGER.debug("%s: Evicting idle connection of %s from %s", holder.name, victim.name, source)
+        return victim
+
+    async def _disconnect(self, victim: Any) -> None:
+        try:
+            await victim.release_connection()
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.warning("%s: Could not disconnect evicted connection: %s", victim.name, err)
+
+    def _record_wait(self, start: float) -> float:
+        wait = time.monotonic() - start
+        self._wait_avg += (wait - self._wait_avg) * WAIT_SMOOTHING
+        self._wait_max = max(self._wait_max, wait)
+        return wait
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        sources: Dict[str, Dict[str, int]] = {}
+        for lease in self._leases.values():
+            sources.setdefault(lease.source, {"in_use": 0, "waiting": 0})["in_use"] += 1
+        for source, waiters in self._waiters.items():
+            sources.setdefault(source, {"in_use": 0, "waiting": 0})["waiting"] = len(waiters)
+        for source, counts in sources.items():
+            counts["capacity"] = self.capacity(source)
+        return {
+            "granted": self.granted,
+            "waited": self.waited,
+            "evictions": self.evictions,
+            "timeouts": self.timeouts,
+            "wait_ms": round(self._wait_avg * 1000, 1),
+            "max_wait_ms": round(self._wait_max * 1000, 1),
+            "sources": sources,
+        }
+
+
+def get_connection_manager(hass: HomeAssistant) -> ConnectionManager:
+    """Get the connection manager shared by all strips, creating it on first use."""
+    manager = hass.data.get(CONNECTION_MANAGER_DATA_KEY)
+    if manager is None:
+        manager = hass.data[CONNECTION_MANAGER_DATA_KEY] = ConnectionManager(hass)
+    return manager
@@ -1,12 +1,20 @@
 from enum import Enum
-import json
-from pathlib import Path
+
+from .definitions import get_definitions
 
 DOMAIN = "elkbledom"
 CONF_RESET = "reset"
 CONF_DELAY = "delay"
 CONF_MODEL = "model"
 CONF_EFFECTS_CLASS = "effects_class"
+# UDP (DDP / E1.31) bridge mapping, universe 0 disables it
+CONF_UDP_UNIVERSE = "udp_universe"
+CONF_UDP_CHANNEL = "udp_channel"
+# Concurrent connection attempts per adapter or proxy
+CONF_CONNECT_CONCURRENCY = "connect_concurrency"
+DEFAULT_CONNECT_CONCURRENCY = 2
+# Learn the disconnect delay from the gaps between commands
+CONF_ADAPTIVE_DELAY = "adaptive_delay"
 
 # Brightness mode configuration
 CONF_BRIGHTNESS_MODE = "brightness_mode"
@@ -49,35 +57,25 @@ class WEEK_DAYS (Enum):
 
 #print(EFFECTS.blink_red.value)
 
-# Load effects definitions from definitions.json
-def _load_effects_from_json():
-    """Load effects definitions and lists from definitions.json"""
-    definitions_file = Path(__file__).parent / "definitions.json"
-    try:
-        with open(definitions_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            effects_defs = data.get("effects_definitions", {})
-            effects_lists = data.get("effects_lists", {})
-            
-            # Create Enum classes dynamically for all effects definitions
-            effects_enums = {}
-            for effect_class_name, effect_values in effects_defs.items():
-                effects_enums[effect_class_name] = Enum(effect_class_name, effect_values)
-            
-            return effects_enums, effects_lists
-    except Exception as e:
-        # Fallback to empty dicts if file doesn't exist or can't be loaded
-        return {}, {}
-
-_effects_enums, _effects_lists_data = _load_effects_from_json()
-
-# Export all effect classes and lists dynamically
+# Effect classes (EFFECTS, EFFECTS_MELK, ...) and lists (EFFECTS_list, EFFECTS_list_MELK, ...)
+# come from definitions.json. They are resolved lazily from the registry that
+# async_setup_entry loads in the executor, this module never reads the file.
 # This allows adding new effects in models.json without changing this file
-globals().update(_effects_enums)  # EFFECTS, EFFECTS_MELK, EFFECTS_MELK_OF10, etc.
-globals().update(_effects_lists_data)  # EFFECTS_list, EFFECTS_list_MELK, etc.
-
-# Create EFFECTS_MAP with all dynamically loaded effect classes
-EFFECTS_MAP = _effects_enums.copy()
-
-# Create EFFECTS_LIST_MAP with all dynamically loaded effect lists
-EFFECTS_LIST_MAP = _effects_lists_data.copy()
+def __getattr__(name: str):
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    registry = get_definitions()
+    if registry.mtime is None:
+        raise AttributeError(
+            f"module {__name__!r} attribute {name!r} is not available before the effects "
+            "definitions are loaded (ensure_definitions_loaded)"
+        )
+    if name == "EFFECTS_MAP":
+        return registry.enums
+    if name == "EFFECTS_LIST_MAP":
+        return dict(registry.lists)
+    if name in registry.classes:
+        return registry.classes[name].enum
+    if name in registry.lists:
+        return registry.lists[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
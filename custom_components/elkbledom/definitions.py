@@ -0,0 +1,117 @@
+"""Effects definitions registry for LED strips"""
+from __future__ import annotations
+
+import json
+import logging
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+LOGGER = logging.getLogger(__name__)
+
+# Definitions data key in hass.data
+DEFINITIONS_DATA_KEY = "elkbledom_definitions"
+
+DEFINITIONS_FILE = Path(__file__).parent / "definitions.json"
+
+
+class EffectsClass:
+    """One effects class with O(1) lookups in both directions."""
+
+    __slots__ = ("name", "values", "names", "enum")
+
+    def __init__(self, name: str, values: Dict[str, int]) -> None:
+        self.name = name
+        # effect name -> value
+        self.values = dict(values)
+        # value -> effect name (first name wins for duplicated values)
+        self.names: Dict[int, str] = {}
+        for effect_name, value in self.values.items():
+            self.names.setdefault(value, effect_name)
+        self.enum = Enum(name, self.values)
+
+
+class EffectsRegistry:
+    """Effects definitions and lists loaded once from definitions.json."""
+
+    def __init__(self, data: Dict, mtime: Optional[float] = None) -> None:
+        self.mtime = mtime
+        self.definitions: Dict[str, Dict[str, int]] = data.get("effects_definitions", {})
+        self.lists: Dict[str, List[str]] = data.get("effects_lists", {})
+        self.classes: Dict[str, EffectsClass] = {
+            class_name: EffectsClass(class_name, values)
+            for class_name, values in self.definitions.items()
+        }
+        # Effects classes and lists are paired by position in definitions.json
+        self.class_lists: Dict[str, str] = dict(zip(self.definitions, self.lists))
+
+    @property
+    def enums(self) -> Dict[str, type]:
+        """Effects class name -> Enum."""
+        return {class_name: effects.enum for class_name, effects in self.classes.items()}
+
+    def get_enum(self, effects_class_name: str) -> Optional[type]:
+        effects = self.classes.get(effects_class_name)
+        return effects.enum if effects else None
+
+    def get_value(self, effects_class_name: str, effect_name: str) -> Optional[int]:
+        effects = self.classes.get(effects_class_name)
+        return effects.values.get(effect_name) if effects else None
+
+    def get_name(self, effects_class_name: str, value: int) -> Optional[str]:
+        effects = self.classes.get(effects_class_name)
+        return effects.names.get(value) if effects else None
+
+    def get_list(self, effects_list_name: str) -> List[str]:
+        return self.lists.get(effects_list_name, [])
+
+    def get_list_for_class(self, effects_class_name: str) -> Optional[List[str]]:
+        effects_list_name = self.class_lists.get(effects_class_name)
+        return self.lists.get(effects_list_name) if effects_list_name else None
+
+
+_EMPTY_REGISTRY = EffectsRegistry({})
+# Last registry loaded in this process, shared by all config entries
+_registry: Optional[EffectsRegistry] = None
+
+
+def load_definitions(
+    definitions_file: Path = DEFINITIONS_FILE,
+    current: Optional[EffectsRegistry] = None,
+) -> EffectsRegistry:
+    """Load definitions.json unless its mtime is unchanged (blocking, run in executor)."""
+    global _registry
+    try:
+        mtime = definitions_file.stat().st_mtime
+    except OSError as e:
+        LOGGER.error("definitions.json file not found at %s: %s", definitions_file, e)
+        return current or _EMPTY_REGISTRY
+    if current is not None and current.mtime == mtime:
+        return current
+    try:
+        data = json.loads(definitions_file.read_text(encoding="utf-8"))
+        registry = EffectsRegistry(data, mtime)
+    except Exception as e:
+        LOGGER.error("Error loading definitions.json: %s", e)
+        return current or _EMPTY_REGISTRY
+    LOGGER.debug("Loaded %d effects classes from definitions.json", len(registry.classes))
+    _registry = registry
+    return registry
+
+
+async def ensure_definitions_loaded(hass: HomeAssistant) -> EffectsRegistry:
+    """Ensure definitions are loaded in hass.data, reloading them if the file changed."""
+    current = hass.data.get(DEFINITIONS_DATA_KEY) or _registry
+    registry = await hass.async_add_executor_job(load_definitions, DEFINITIONS_FILE, current)
+    hass.data[DEFINITIONS_DATA_KEY] = registry
+    return registry
+
+
+def get_definitions(hass: Optional[HomeAssistant] = None) -> EffectsRegistry:
+    """Get the loaded definitions registry without doing any I/O."""
+    if hass is not None and DEFINITIONS_DATA_KEY in hass.data:
+        return hass.data[DEFINITIONS_DATA_KEY]
+    return _registry or _EMPTY_REGISTRY
@@ -1,65 +1,120 @@
 import asyncio
+import dataclasses
 import datetime
+import time
 import traceback
 import logging
 from typing import Any, TypeVar, cast, Tuple, Optional, Dict, List
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from homeassistant.exceptions import ConfigEntryNotReady
 
 from bleak.backends.device import BLEDevice
 from bleak.backends.service import BleakGATTServiceCollection
-from bleak.exc import BleakDBusError
+from bleak.exc import BleakCharacteristicNotFoundError, BleakError
 from bleak_retry_connector import BLEAK_RETRY_EXCEPTIONS as BLEAK_EXCEPTIONS
 from bleak_retry_connector import (
     BleakClientWithServiceCache,
     BleakNotFoundError,
+    device_source,
     establish_connection,
 )
-from homeassistant.components.bluetooth import async_discovered_service_info, async_ble_device_from_address
+from homeassistant.components.bluetooth import BluetoothServiceInfoBleak, async_ble_device_from_address
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from home_assistant_bluetooth import BluetoothServiceInfo
 
-from .model import Model
+from .model import Model, ModelSpec, LOGIN_NAME_PREFIXES, NO_NOTIFY_NAME_PREFIXES
+from .gatt_cache import get_gatt_cache, services_fingerprint
+from .handshake import DEFAULT_LOGIN_STEPS, HandshakeTiming, run_handshake
+from .planner import MODE_COLOR_TEMP, MODE_EFFECT, MODE_RGB, MODE_WHITE, CommandPlanner, TargetState, color_temp_rgb, scale_rgb
+from .transition import TRANSITION_MODES, TransitionEngine, render_transition
+from .streaming import StreamingSession
+from .shadow import COLOR_MODE_KINDS, DeviceShadow, superseded_kinds
+from .connection_manager import PRIORITY_BACKGROUND, PRIORITY_COMMAND, get_connection_manager
+from .connect_scheduler import ConnectAttempt, get_connect_scheduler
+from .idle_timeout import AdaptiveIdleTimeout
+from .state_delta import StateDelta, signal_state_delta
+from .query import PendingQueries
+from .status_frames import decode_status
+from .reconciler import FIELD_KINDS, StateReconciler
+from .advertisements import async_get_advertisement_tracker, async_release_advertisement_tracker
+from .retry import DEFAULT_RETRY_POLICY, STATE_CLOSED, STATE_HALF_OPEN, CircuitBreaker, DeviceUnavailableError, RetryPolicy
+from .command_queue import (
+    CommandQueue,
+    KIND_BRIGHTNESS,
+    KIND_COLOR,
+    KIND_COLOR_TEMP,
+    KIND_EFFECT,
+    KIND_EFFECT_SPEED,
+    KIND_MIC,
+    KIND_MIC_EFFECT,
+    KIND_MIC_SENSITIVITY,
+    KIND_POWER,
+    KIND_QUERY,
+    KIND_SCHEDULE_OFF,
+    KIND_SCHEDULE_ON,
+    KIND_TIME,
+    LANE_BACKGROUND,
+)
 
 LOGGER = logging.getLogger(__name__)
 
-DEFAULT_ATTEMPTS = 3
 #DISCONNECT_DELAY = 120
-BLEAK_BACKOFF_TIME = 0.25
-RETRY_BACKOFF_EXCEPTIONS = (BleakDBusError,)
+# Seconds between checks while another caller holds the circuit breaker trial
+PROBE_POLL_INTERVAL = 1.0
+# Color sent by the reset option when turning on, clears changes made by an IR remote
+RESET_COLOR = (250, 250, 250)
 WrapFuncType = TypeVar("WrapFuncType", bound=Callable[..., Any])
 
+# Set while a decorated call runs, nested calls leave retries to the outermost one
+_RETRYING: ContextVar[bool] = ContextVar("elkbledom_retrying", default=False)
+
 def retry_bluetooth_connection_error(func: WrapFuncType) -> WrapFuncType:
     """Define a wrapper to retry on bleak error.
 
     The accessory is allowed to disconnect us any time so
-    we need to retry the operation.
+    we need to retry the operation. Retries follow the instance
+    RetryPolicy, and calls fail fast while its circuit breaker is open.
+    Success is recorded by the GATT writes and connects themselves, a call
+    holding the half-open trial that ends without either reopens the breaker.
     """
 
     async def _async_wrap_retry_bluetooth_connection_error(
         self: "BLEDOMInstance", *args: Any, **kwargs: Any
     ) -> Any:
-        # LOGGER.debug("%s: Starting retry loop", self.name)
-        attempts = DEFAULT_ATTEMPTS
-        max_attempts = attempts - 1
-
-        for attempt in range(attempts):
-            try:
-                return await func(self, *args, **kwargs)
-            except BleakNotFoundError:
-                # The lock cannot be found so there is no
-                # point in retrying.
-                raise
-            except RETRY_BACKOFF_EXCEPTIONS as err:
-                if attempt >= max_attempts:
-                    LOGGER.debug("%s: %s error calling %s, reach max attempts (%s/%s)",self.name,type(err),func,attempt,max_attempts,exc_info=True,)
-                    raise
-                LOGGER.debug("%s: %s error calling %s, backing off %ss, retrying (%s/%s)...",self.name,type(err),func,BLEAK_BACKOFF_TIME,attempt,max_attempts,exc_info=True,)
-                await asyncio.sleep(BLEAK_BACKOFF_TIME)
-            except BLEAK_EXCEPTIONS as err:
-                if attempt >= max_attempts:
-                    LOGGER.debug("%s: %s error calling %s, reach max attempts (%s/%s): %s",self.name,type(err),func,attempt,max_attempts,err,exc_info=True,)
+        if _RETRYING.get():
+            return await func(self, *args, **kwargs)
+        breaker = self._breaker
+        if not breaker.allow():
+            raise DeviceUnavailableError(f"{self.name} is unreachable, reconnecting in background")
+        trial = breaker.state == STATE_HALF_OPEN
+        policy = self._retry_policy
+        deadline = time.monotonic() + policy.budget
+        max_attempts = policy.attempts - 1
+        token = _RETRYING.set(True)
+        try:
+            for attempt in range(policy.attempts):
+                try:
+                    return await func(self, *args, **kwargs)
+                except BleakNotFoundError:
+                    # The device cannot be found so there is no
+                    # point in retrying.
+                    self._record_failure()
                     raise
-                LOGGER.debug("%s: %s error calling %s, retrying  (%s/%s)...: %s",self.name,type(err),func,attempt,max_attempts,err,exc_info=True,)
+                except BLEAK_EXCEPTIONS as err:
+                    backoff = policy.backoff(attempt)
+                    if attempt >= max_attempts or time.monotonic() + backoff > deadline:
+                        LOGGER.debug("%s: %s error calling %s, reach max attempts (%s/%s): %s",self.name,type(err),func,attempt,max_attempts,err,exc_info=True,)
+                        self._record_failure()
+                        raise
+                    LOGGER.debug("%s: %s error calling %s, backing off %.2fs, retrying (%s/%s)...: %s",self.name,type(err),func,backoff,attempt,max_attempts,err,exc_info=True,)
+                    await asyncio.sleep(backoff)
+        finally:
+            _RETRYING.reset(token)
+            if trial and breaker.state == STATE_HALF_OPEN:
+                # Cancelled, failed otherwise or never touched the radio
+                breaker.reopen()
 
     return cast(WrapFuncType, _async_wrap_retry_bluetooth_connection_error)
 
@@ -74,6 +129,7 @@ class DeviceData():
         self._address = self._discovery.address
         self._name = self._discovery.name
         self._rssi = self._discovery.rssi
+        self._last_seen = self._discovery.time
         self._hass = hass
         self._bledevice = async_ble_device_from_address(hass, self._address)
         
@@ -96,28 +152,38 @@ class DeviceData():
     @property
     def rssi(self):
         return self._rssi
+
+    @property
+    def last_seen(self) -> float:
+        """Monotonic time of the latest advertisement."""
+        return self._last_seen
     
     def bledevice(self) -> BLEDevice:
         return self._bledevice
     
     def update_device(self) -> None:
-        #TODO for discovery_info in async_last_service_info(self._hass, self._address):
-        for discovery_info in async_discovered_service_info(self._hass):
-            if discovery_info.address == self._address:
-                self._rssi = discovery_info.rssi
-                ##TODO SOMETHING WITH DEVICE discovery_info
-        return
+        discovery_info = async_get_advertisement_tracker(self._hass).get(self._address)
+        if discovery_info is not None:
+            self.update_from_advertisement(discovery_info)
+
+    def update_from_advertisement(self, discovery_info: BluetoothServiceInfoBleak) -> None:
+        """Refresh RSSI and device from the latest advertisement."""
+        self._rssi = discovery_info.rssi
+        self._last_seen = discovery_info.time
+        self._bledevice = discovery_info.device
 
     def _start_update(self, service_info: BluetoothServiceInfo) -> None:
         """Update from BLE advertisement data."""
         LOGGER.debug("Parsing Govee BLE advertisement data: %s", service_info)
 
 class BLEDOMInstance:
-    def __init__(self, address, reset: bool, delay: int, hass, forced_model: str = None) -> None:
+    def __init__(self, address, reset: bool, delay: int, hass, forced_model: str = None,
+                 retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY, adaptive_delay: bool = False) -> None:
         self.loop = asyncio.get_running_loop()
         self._address = address
         self._reset = reset
         self._delay = delay
+        self._idle_timeout = AdaptiveIdleTimeout(address, delay) if adaptive_delay else None
         self._hass = hass
         self._forced_model = forced_model
         self._device: BLEDevice | None = None
@@ -139,9 +205,26 @@ class BLEDOMInstance:
         self._mic_enabled = False
         self._model = None
         self._model_name = None
+        self._spec: ModelSpec | None = None
         self._color_temp = None
         self._read_uuid = None
         self._write_uuid = None
+        self._gatt_cache = get_gatt_cache(hass)
+        self._connections = get_connection_manager(hass)
+        self._slot_wait = 0.0
+        self._connect_scheduler = get_connect_scheduler(hass)
+        self._connect_attempt: ConnectAttempt | None = None
+        self._handshake_timing: HandshakeTiming | None = None
+        self._retry_policy = retry_policy
+        self._breaker = CircuitBreaker(address, retry_policy)
+        self._probe_task: asyncio.Task | None = None
+        self._mode: str | None = None
+        # Users keeping the connection open (no disconnect timer while > 0)
+        self._holds = 0
+        self._stream: StreamingSession | None = None
+        self._prepare_timer: asyncio.TimerHandle | None = None
+        self._prepared_until = 0.0
+        self._restore_on_power: TargetState | None = None
         
         # New: Brightness mode configuration
         self._brightness_mode = "auto"  # auto, rgb, native
@@ -152,22 +235,28 @@ class BLEDOMInstance:
         except (Exception) as error:
             LOGGER.error("Error getting device: %s", error)
 
-        for discovery_info in async_discovered_service_info(hass):
-            if discovery_info.address == address:
-                devicedata = DeviceData(hass, discovery_info)
-                #LOGGER.debug("device %s: %s %s",devicedata.name, devicedata.address, devicedata.rssi)
-                if devicedata.is_supported:
-                    self._device_data = devicedata
+        advertisements = async_get_advertisement_tracker(hass)
+        self._unsubscribe_advertisements: Callable[[], None] | None = None
+        if (discovery_info := advertisements.get(address)) is not None:
+            self._on_advertisement(discovery_info)
         
         if not self._device:
             raise ConfigEntryNotReady(f"You need to add bluetooth integration (https://www.home-assistant.io/integrations/bluetooth) or couldn't find a nearby device with address: {address}")
+        self._unsubscribe_advertisements = advertisements.async_subscribe(address, self._on_advertisement)
             
         # self._adv_data: AdvertisementData | None = None
         self._detect_model()
+        self._shadow = DeviceShadow(self.name)
+        self._queue = CommandQueue(self.name, self._write_while_connected, on_write=self._on_write,
+                                   supersedes=superseded_kinds, hold=self._hold_connection)
+        self._transitions = TransitionEngine(self.name, self._queue)
+        self._queries = PendingQueries(self.name)
+        self._reconciler = StateReconciler(self.name, self._intended_state, self._reported_state,
+                                           self._repair_fields, self._accept_fields)
         LOGGER.debug('Model information for device %s : ModelNo %s, Turn on cmd %s, Turn off cmd %s, rssi %s', 
                      self._device.name, self._model_name, 
-                     self._model.get_turn_on_cmd(self._model_name), 
-                     self._model.get_turn_off_cmd(self._model_name), 
+                     self._spec.turn_on_cmd, 
+                     self._spec.turn_off_cmd, 
                      self.rssi)
         
     def _detect_model(self, char_handle: Optional[int] = None):
@@ -194,6 +283,10 @@ class BLEDOMInstance:
             else:
                 LOGGER.warning("Unknown model for device %s with handle 0x%04x", self._device.name, char_handle)
                 self._model_name = "ELK-BLEDOM"  # Default fallback
+        elif (cached := self._get_cached_gatt()) and self._model.has_model(cached.get("model")):
+            # Model refined by handle on a previous run
+            self._model_name = cached["model"]
+            LOGGER.debug("%s: Using cached model: %s", self._device.name, self._model_name)
         else:
             # Standard name-based detection
             self._model_name = self._model.detect_model(self._device.name or "")
@@ -202,6 +295,72 @@ class BLEDOMInstance:
         if not self._model_name:
             LOGGER.warning("Unknown model for device %s", self._device.name)
             self._model_name = "ELK-BLEDOM"  # Default fallback
+
+        self._update_spec()
+
+    def _update_spec(self) -> None:
+        """Resolve the spec and capability flags of the detected model."""
+        self._spec = self._model.get_spec(self._model_name)
+        # Login and notification support also depend on the advertised name (e.g. MODELX)
+        device_name = (self._device.name or "").lower()
+        self._needs_login = self._spec.needs_login or device_name.startswith(LOGIN_NAME_PREFIXES)
+        self._uses_notify = self._spec.uses_notify and not device_name.startswith(NO_NOTIFY_NAME_PREFIXES)
+        self._handshake = self._spec.handshake or (DEFAULT_LOGIN_STEPS if self._needs_login else ())
+
+    def _on_advertisement(self, discovery_info: BluetoothServiceInfoBleak) -> None:
+        """Latest advertisement of the device, pushed by the advertisement tracker."""
+        if self._device_data is None:
+            devicedata = DeviceData(self._hass, discovery_info)
+            if not devicedata.is_supported:
+                return
+            self._device_data = devicedata
+        else:
+            self._device_data.update_from_advertisement(discovery_info)
+        if discovery_info.connectable and discovery_info.device.name:
+            # Newest path to the device, e.g. through a proxy closer to it
+            self._device = discovery_info.device
+
+    def _get_cached_gatt(self) -> Optional[Dict[str, Any]]:
+        """Get characteristics resolved on a previous run, if any."""
+        if self._gatt_cache is None:
+            return None
+        return self._gatt_cache.get(self._address)
+
+    def _restore_characteristics(self, services: BleakGATTServiceCollection) -> bool:
+        """Reuse characteristics resolved on a previous run if the services did not change."""
+        cached = self._get_cached_gatt()
+        if not cached or not services:
+            return False
+        if cached.get("fingerprint") != services_fingerprint(services):
+            LOGGER.debug("%s: GATT services changed, resolving characteristics again", self.name)
+            self._gatt_cache.invalidate(self._address)
+            return False
+        if cached.get("model") != self._model_name:
+            if self._forced_model or not self._model.has_model(cached.get("model")):
+                return False
+            self._model_name = cached["model"]
+            self._update_spec()
+        self._write_uuid = cached.get("write_uuid")
+        self._read_uuid = cached.get("read_uuid")
+        LOGGER.debug("%s: Characteristics restored from cache (model %s)", self.name, self._model_name)
+        return bool(self._write_uuid)
+
+    def _save_characteristics(self, services: BleakGATTServiceCollection) -> None:
+        """Persist resolved characteristics so the next run can skip resolution."""
+        if self._gatt_cache is None or not services:
+            return
+        self._gatt_cache.set(self._address, {
+            "model": self._model_name,
+            "write_uuid": self._write_uuid,
+            "read_uuid": self._read_uuid,
+            "fingerprint": services_fingerprint(services),
+        })
+
+    def _invalidate_characteristics(self) -> None:
+        """Forget resolved characteristics, the next connection resolves them again."""
+        self._cached_services = None
+        if self._gatt_cache is not None:
+            self._gatt_cache.invalidate(self._address)
     
     async def apply_brightness_mode(self, mode: str) -> None:
         """Apply new brightness mode and reconnect if needed."""
@@ -216,16 +375,57 @@ class BLEDOMInstance:
     def get_color_base(self):
         return self._rgb_color_base
             
-    async def _write(self, data: bytearray):
-        """Send command to device and read response."""
+    async def _write(self, kind: str, data) -> None:
+        """Send a command through the writer task, without checking the shadow."""
         if not data:
             return
+        await self._queue.submit(kind, data)
+
+    @asynccontextmanager
+    async def _hold_connection(self) -> AsyncIterator[None]:
+        """Connect once and keep the connection while the writer task sends a command group."""
         await self._ensure_connected()
-        await self._write_while_connected(data)
+        if not self._client or not self._client.is_connected:
+            raise BleakError(f"{self.name}: not connected")
+        self._holds += 1
+        self._reset_disconnect_timer()
+        try:
+            yield
+        finally:
+            self._holds -= 1
+            if self._client and self._client.is_connected:
+                self._reset_disconnect_timer()
+
+    async def _send(self, kind: str, data, force: bool = False) -> None:
+        """Send command through the coalescing queue, newest frame of each kind wins.
+
+        Frames the device already shows are skipped unless force is set. A frame
+        is never skipped while a frame of the same or a superseding kind is
+        pending, since that one would change the state first.
+        """
+        if not data:
+            return
+        # A new command replaces any running transition
+        self._transitions.cancel()
+        if not force and not self._has_pending_conflict(kind) and self._shadow.is_redundant(kind, data):
+            return
+        await self._queue.submit(kind, data)
+
+    def _has_pending_conflict(self, kind: str) -> bool:
+        pending = self._queue.pending_kinds
+        return kind in pending or not superseded_kinds(kind).isdisjoint(pending)
 
     async def _write_while_connected(self, data: bytearray):
-        LOGGER.debug(''.join(format(x, ' 03x') for x in data))
-        await self._client.write_gatt_char(self._write_uuid, data, False)
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("%s: Writing %s", self.name, bytes(data).hex(" "))
+        try:
+            await self._client.write_gatt_char(self._write_uuid, data, False)
+            self._breaker.record_success()
+        except BleakCharacteristicNotFoundError:
+            LOGGER.warning("%s: Write characteristic %s not found, dropping cached characteristics", self.name, self._write_uuid)
+            self._invalidate_characteristics()
+            await self._execute_disconnect()
+            raise
 
     @property
     def address(self):
@@ -257,11 +457,11 @@ class BLEDOMInstance:
     
     @property
     def min_color_temp_kelvin(self):
-        return self._model.get_min_color_temp_kelvin(self._model_name)
+        return self._spec.min_color_temp_kelvin
     
     @property
     def max_color_temp_kelvin(self):
-        return self._model.get_max_color_temp_kelvin(self._model_name)
+        return self._spec.max_color_temp_kelvin
     
     @property
     def color_temp_kelvin(self):
@@ -295,140 +495,381 @@ class BLEDOMInstance:
     @property
     def model(self):
         return self._model
+
+    @property
+    def spec(self) -> ModelSpec:
+        return self._spec
+
+    @property
+    def queue_stats(self):
+        return self._queue.stats
+
+    @property
+    def shadow_stats(self) -> Dict[str, Any]:
+        return self._shadow.stats
+
+    @property
+    def circuit_stats(self) -> Dict[str, Any]:
+        return self._breaker.stats
+
+    @property
+    def disconnect_delay(self) -> Optional[float]:
+        """Idle time before disconnecting, adaptive if enabled."""
+        if self._idle_timeout is not None:
+            return self._idle_timeout.timeout
+        return self._delay
+
+    @property
+    def idle_timeout_stats(self) -> Optional[Dict[str, Any]]:
+        return self._idle_timeout.stats if self._idle_timeout is not None else None
+
+    @property
+    def connection_stats(self) -> Dict[str, Any]:
+        """Slot wait of the last connect and counters of the shared connection manager."""
+        attempt = self._connect_attempt
+        return {
+            "slot_wait_ms": round(self._slot_wait * 1000, 1),
+            "connect_queue_ms": round(attempt.wait * 1000, 1) if attempt else None,
+            "connect_radio_ms": round(attempt.radio * 1000, 1) if attempt else None,
+            "slots": self._connections.stats,
+            "attempts": self._connect_scheduler.stats,
+        }
+
+    @property
+    def pending_commands(self) -> int:
+        """Frames waiting for the connection."""
+        return len(self._queue.pending_kinds) + (1 if self._queue.busy else 0)
+
+    @property
+    def handshake_stats(self) -> Optional[Dict[str, Any]]:
+        """Timing of the last login handshake, None if the device needs no login."""
+        if self._handshake_timing is None:
+            return None
+        return self._handshake_timing.as_dict()
+
+    @property
+    def query_stats(self) -> Dict[str, Any]:
+        return self._queries.stats
+
+    @property
+    def can_reconcile(self) -> bool:
+        """Whether the device can report its state to check writes against."""
+        spec = self._spec
+        return spec.has_query and spec.query_opcode is not None and self._uses_notify and spec.read_uuid is not None
+
+    @property
+    def reconcile_stats(self) -> Optional[Dict[str, Any]]:
+        """Statistics of the state checks, None if the device cannot report its state."""
+        if not self.can_reconcile:
+            return None
+        return self._reconciler.stats
+
+    def _on_write(self, kind: str, frame) -> None:
+        """Frame written by the queue: record it in the shadow and check it arrived later on."""
+        self._shadow.confirm(kind, frame)
+        if kind in self._shadow.saved and self.can_reconcile:
+            self._reconciler.note_write()
+
+    def _intended_state(self) -> StateDelta:
+        """State the frames in the shadow should have put the device in, for the fields they set."""
+        intended = StateDelta()
+        spec = self._spec
+        power = self._shadow.frame(KIND_POWER)
+        if power is not None:
+            intended.is_on = power == bytes(spec.turn_on_cmd or b"")
+        if intended.is_on is False:
+            # Color fields of a strip turned off are not reconciled
+            return intended
+        color = self._shadow.frame(KIND_COLOR)
+        if color is not None and "color" in spec.commands:
+            intended.rgb_color = spec.commands["color"].extract(color)
+        brightness = self._shadow.frame(KIND_BRIGHTNESS)
+        if brightness is not None and "brightness" in spec.commands:
+            # 'i' placeholder is a 0-100 percentage
+            intended.brightness = spec.commands["brightness"].extract(brightness)[0] * 255 // 100
+        return intended
+
+    async def _reported_state(self) -> Optional[StateDelta]:
+        """State reported by the device, None while commands are being sent or not connected.
+
+        Checks never connect: a strip disconnected when idle is checked on the
+        next connection a command opens.
+        """
+        if self._stream is not None or self._transitions.running or self.pending_commands:
+            return None
+        if not self._client or not self._client.is_connected:
+            return None
+        response = await self.query_state()
+        if response is None:
+            return None
+        return decode_status(self._spec.status_frames, response)
+
+    async def _repair_fields(self, fields: List[str], intended: StateDelta) -> bool:
+        """Re-send the shadow frames of fields the device did not apply."""
+        frames = []
+        for name, kind in FIELD_KINDS.items():
+            frame = self._shadow.frame(kind)
+            if name in fields and frame is not None:
+                frames.append((kind, frame))
+        if not frames or not all(await self._queue.submit_many(frames, LANE_BACKGROUND)):
+            return False
+        # The query response put the reported values in the state, show the intended ones again
+        self._apply_delta(StateDelta(**{name: getattr(intended, name) for name in fields}))
+        return True
+
+    def _accept_fields(self, fields: List[str]) -> None:
+        """Keep the state reported by the device, its frames in the shadow are no longer shown."""
+        self._shadow.invalidate(FIELD_KINDS[name] for name in fields)
     
-    @retry_bluetooth_connection_error
-    async def set_color_temp(self, value: int) -> None:
-        if value > 100:
-            value = 100
-        warm = value
-        cold = 100 - value
-        color_temp_cmd = self._model.get_color_temp_cmd(self._model_name, warm, cold)
-        await self._write(color_temp_cmd)
-        self._color_temp = warm
+    def _is_current(self, kind: str, frame) -> bool:
+        """Whether the device shows this frame and nothing queued will change it."""
+        return not self._has_pending_conflict(kind) and self._shadow.matches(kind, frame)
 
     @retry_bluetooth_connection_error
-    async def set_color_temp_kelvin(self, value: int, brightness: int) -> None:
-        # White colours are represented by colour temperature percentage from 0x0 to 0x64 from warm to cool
-        # Warm (0x0) is only the warm white LED, cool (0x64) is only the white LED and then a mixture between the two
-        self._color_temp_kelvin = value
-        min_temp = self._model.get_min_color_temp_kelvin(self._model_name)
-        max_temp = self._model.get_max_color_temp_kelvin(self._model_name)
-        if value < min_temp:
-            value = min_temp
-        if value > max_temp:
-            value = max_temp
-
-        # Ensure brightness is not None before using it
-        if brightness is None:
-            brightness = self._brightness if self._brightness is not None else 255
-        self._brightness = brightness
-
-        # Clamp t to [0, 1]: 0 = warmest (min_temp), 1 = coolest (max_temp)
-        t = (value - min_temp) / (max_temp - min_temp) if max_temp > min_temp else 1.0
-
-        # Prefer native color_temp command if the model supports it
-        native_ct_cmd = self._model.get_color_temp_cmd(self._model_name, 50, 50)
-        if native_ct_cmd:
-            # Convert kelvin → warm/cold percentages (0-100)
-            # warm=100/cold=0 at min_temp (warmest), warm=0/cold=100 at max_temp (coolest)
-            warm_pct = int((1.0 - t) * 100)
-            cold_pct = int(t * 100)
-            cmd = self._model.get_color_temp_cmd(self._model_name, warm_pct, cold_pct)
-            await self._write(cmd)
-            # Set brightness via white channel if model supports it
-            white_cmd = self._model.get_white_cmd(self._model_name, brightness)
-            if white_cmd:
-                await self._write(white_cmd)
-            return
+    async def apply_state(self, target: TargetState, force: bool = False, transition: Optional[float] = None,
+                          reset_color: bool = False) -> None:
+        """Move the device to a target state with the fewest frames, on one connection.
 
-        # Fallback: RGB emulation for models without native color_temp command
-        warm = (255, 138, 18)   # Warm white ~1800K
-        cool = (180, 220, 255)  # Cool white ~7000K
+        With a transition (seconds) the change is interpolated in background
+        and the call returns once it started. reset_color first queues power
+        on and white in the background lane, frames of the target replace them.
+        """
+        self._transitions.cancel()
+        reset = self._queue_reset_color() if reset_color else None
+        if target.power and target.mode is None and self._restore_on_power is not None:
+            # Turning on after a fade out, bring back the state before the fade
+            target = dataclasses.replace(self._restore_on_power, power=True, effect_speed=target.effect_speed)
+        self._restore_on_power = None
+        self._fill_target(target)
+        try:
+            if not (transition and self._start_transition(target, transition)):
+                await self._apply_target(target, force)
+        except BaseException:
+            if reset is not None:
+                reset.cancel()
+            raise
+        if reset is not None:
+            power_sent, color_sent = await reset
+            if power_sent:
+                self._is_on = True
+            if color_sent:
+                self._rgb_color = RESET_COLOR
+
+    def _queue_reset_color(self) -> "asyncio.Future[List[bool]]":
+        """Queue power on and white in the background lane, to undo changes made by an IR remote."""
+        return self._queue.enqueue_many(
+            [(KIND_POWER, self._spec.turn_on_cmd), (KIND_COLOR, self._spec.color_cmd(*RESET_COLOR))],
+            LANE_BACKGROUND,
+        )
 
-        r = int(warm[0] + (cool[0] - warm[0]) * t)
-        g = int(warm[1] + (cool[1] - warm[1]) * t)
-        b = int(warm[2] + (cool[2] - warm[2]) * t)
+    def _fill_target(self, target: TargetState) -> None:
+        """Complete a target with the current values it leaves unchanged."""
+        if target.mode in (MODE_RGB, MODE_COLOR_TEMP) and target.brightness is None:
+            target.brightness = self._brightness if self._brightness is not None else 255
+        if target.brightness is not None:
+            target.brightness = max(1, min(int(target.brightness), 255))
+        if target.mode == MODE_RGB and target.rgb is None:
+            target.rgb = self._rgb_color_base
+        if target.mode == MODE_WHITE and target.white is None:
+            target.white = 255
+
+    async def _apply_target(self, target: TargetState, force: bool = False) -> None:
+        is_current = (lambda kind, frame: False) if force else self._is_current
+        planner = CommandPlanner(self._spec, is_current, (self._brightness_mode or "auto").lower())
+        frames = planner.plan(target)
+        LOGGER.debug("%s: Planned %s as %d frames: %s, skipped %s", self.name, target, len(frames),
+                     [kind for kind, _ in frames], planner.skipped)
+        for kind in planner.skipped:
+            self._shadow.count_saved(kind)
+        if frames:
+            # One group: written in order on one connection, no other frames in between
+            await self._queue.submit_many(frames)
+        self._update_state(target, planner.prescaled)
+
+    def _update_state(self, target: TargetState, prescaled: bool) -> None:
+        if target.power is not None:
+            self._is_on = target.power
+        if target.mode is not None:
+            self._mode = target.mode
+        if target.mode == MODE_RGB:
+            self._rgb_color_base = target.rgb
+            self._rgb_color = scale_rgb(target.rgb, target.brightness) if prescaled else target.rgb
+            self._brightness = target.brightness
+        elif target.mode == MODE_COLOR_TEMP:
+            self._color_temp_kelvin = target.color_temp_kelvin
+            self._brightness = target.brightness
+            if not self._spec.has_ct:
+                self._rgb_color_base = color_temp_rgb(self._spec, target.color_temp_kelvin)
+                self._rgb_color = scale_rgb(self._rgb_color_base, target.brightness)
+        elif target.mode == MODE_WHITE:
+            self._brightness = target.white
+            if not self._spec.has_white:
+                self._rgb_color = scale_rgb((255, 255, 255), target.white)
+        elif target.mode == MODE_EFFECT:
+            self._effect = target.effect
+        if target.effect_speed is not None:
+            self._effect_speed = target.effect_speed
+
+    def _current_target(self) -> TargetState:
+        """Current state of the device as a target."""
+        mode = self._mode or (MODE_RGB if self._spec.has_rgb else MODE_COLOR_TEMP if self._spec.has_ct else MODE_WHITE)
+        brightness = self._brightness if self._brightness is not None else 255
+        kelvin = self._color_temp_kelvin or (self._spec.min_color_temp_kelvin + self._spec.max_color_temp_kelvin) // 2
+        return TargetState(mode=mode, rgb=self._rgb_color_base, color_temp_kelvin=kelvin,
+                           white=brightness, brightness=brightness)
+
+    def _start_transition(self, target: TargetState, duration: float) -> bool:
+        """Start interpolating to target, False if this change cannot be interpolated."""
+        if not self._spec.can_transition:
+            return False
+        start = self._current_target()
+        final = target
+        if target.power is False:
+            if not self._is_on:
+                return False
+            # Fade out, then turn off
+            end = dataclasses.replace(start, brightness=1, white=1)
+        elif target.mode is None:
+            end = dataclasses.replace(start, power=target.power)
+        else:
+            end = target
+        if not self._is_on:
+            # Fade in from off
+            start = dataclasses.replace(start, brightness=1, white=1)
+        if start.mode not in TRANSITION_MODES or end.mode != start.mode:
+            return False
 
-        # Save the unscaled color as base color for future brightness adjustments
-        self._rgb_color_base = (r, g, b)
+        mode = (self._brightness_mode or "auto").lower()
+        steps = self._transitions.step_count(duration, 1)
+        rendered = render_transition(self._spec, start, end, steps, duration, self._is_current, mode)
+        frames_per_step = sum(len(frames) for _, frames in rendered) / max(len(rendered), 1)
+        fitted = self._transitions.step_count(duration, frames_per_step)
+        if fitted < steps:
+            rendered = render_transition(self._spec, start, end, fitted, duration, self._is_current, mode)
+        LOGGER.debug("%s: Transition over %.1fs in %d steps", self.name, duration, len(rendered))
+
+        async def finish() -> None:
+            if final.power is False:
+                self._restore_on_power = dataclasses.replace(self._current_target(), power=None)
+            await self._apply_target(final)
+
+        self._transitions.start(rendered, duration, finish)
+        # Report the final state right away, a fade out reports off while it dims
+        self._update_state(final, False)
+        return True
+
+    async def start_stream(self, max_fps: Optional[float] = None) -> StreamingSession:
+        """Open a streaming session that keeps the connection until stop_stream."""
+        self._transitions.cancel()
+        if self._stream is not None and self._stream.active:
+            return self._stream
+        if self._stream is not None:
+            await self.stop_stream()
+        await self._ensure_connected()
+        if not self._client or not self._client.is_connected:
+            raise BleakError(f"{self.name}: not connected")
+        # Model may be refined on connect, pin the template afterwards
+        template = self._spec.commands.get("color")
+        if template is None:
+            raise CharacteristicMissingError(f"{self.name}: model {self._model_name} has no color command")
+        write_char = self._client.services.get_characteristic(self._write_uuid)
+        if write_char is None:
+            raise CharacteristicMissingError(f"{self.name}: write characteristic {self._write_uuid} not found")
+        self._holds += 1
+        self._reset_disconnect_timer()
+        self._stream = StreamingSession(self.name, self._client, write_char, template.build, max_fps)
+        self._stream.start()
+        LOGGER.debug("%s: Streaming started", self.name)
+        return self._stream
+
+    def push_color(self, r: int, g: int, b: int, received_at: Optional[float] = None) -> bool:
+        """Offer a color to the streaming session, False if none is running."""
+        return self._stream is not None and self._stream.push(r, g, b, received_at)
+
+    async def stop_stream(self) -> Dict[str, Any]:
+        """End the streaming session and release the connection."""
+        session, self._stream = self._stream, None
+        if session is None:
+            return {}
+        await session.stop()
+        if session.last_frame is not None:
+            # Keep shadow and state in line with the last streamed color
+            self._shadow.confirm(KIND_COLOR, session.last_frame)
+            self._rgb_color = self._rgb_color_base = session.last_color
+            self._mode = MODE_RGB
+        self._holds -= 1
+        if self._client and self._client.is_connected:
+            self._reset_disconnect_timer()
+        stats = session.stats
+        LOGGER.debug("%s: Streaming stopped: %s", self.name, stats)
+        return stats
 
-        # Apply brightness scaling
-        scale = brightness / 255.0
-        r_scaled, g_scaled, b_scaled = int(r * scale), int(g * scale), int(b * scale)
+    @retry_bluetooth_connection_error
+    async def prepare(self, duration: float) -> None:
+        """Connect now and keep the connection open for duration seconds.
 
-        # Send scaled color but mark base color was already saved above
-        await self.set_color((r_scaled, g_scaled, b_scaled), is_base_color=False)
-        # Note: _rgb_color is set in set_color, but _rgb_color_base is preserved
+        Holds the connection like a stream does, a second call extends the
+        window. Connecting goes through _ensure_connected, so commands sent
+        meanwhile wait on the same connect lock instead of racing it.
+        """
+        until = time.monotonic() + duration
+        if until > self._prepared_until:
+            if self._prepare_timer is None:
+                self._holds += 1
+            else:
+                self._prepare_timer.cancel()
+            self._prepared_until = until
+            self._prepare_timer = self.loop.call_later(duration, self._end_prepare)
+        await self._ensure_connected()
+        LOGGER.debug("%s: Prepared for %ss, connected: %s", self.name, duration,
+                     bool(self._client and self._client.is_connected))
+
+    def _end_prepare(self) -> None:
+        """Release the connection held by prepare."""
+        self._prepare_timer = None
+        self._prepared_until = 0.0
+        self._holds -= 1
+        if self._client and self._client.is_connected:
+            self._reset_disconnect_timer()
+
+    @property
+    def stream_stats(self) -> Dict[str, Any]:
+        return self._stream.stats if self._stream is not None else {}
+
+    @property
+    def transition_stats(self) -> Dict[str, int]:
+        return self._transitions.stats
 
     @retry_bluetooth_connection_error
-    async def set_color(self, rgb: Tuple[int, int, int], is_base_color: bool = False) -> None:
+    async def set_color_temp(self, value: int, force: bool = False) -> None:
+        if value > 100:
+            value = 100
+        warm = value
+        cold = 100 - value
+        color_temp_cmd = self._spec.color_temp_cmd(warm, cold)
+        await self._send(KIND_COLOR_TEMP, color_temp_cmd, force)
+        self._color_temp = warm
+
+    @retry_bluetooth_connection_error
+    async def set_color(self, rgb: Tuple[int, int, int], is_base_color: bool = False, force: bool = False) -> None:
         r, g, b = rgb
-        color_cmd = self._model.get_color_cmd(self._model_name, r, g, b)
-        await self._write(color_cmd)
+        color_cmd = self._spec.color_cmd(r, g, b)
+        await self._send(KIND_COLOR, color_cmd, force)
         self._rgb_color = rgb
         # If this is a base color (not brightness-scaled), save it
         if is_base_color:
             self._rgb_color_base = rgb
 
     @retry_bluetooth_connection_error
-    async def set_white(self, intensity: int) -> None:
-        if intensity is None:
-            intensity = 255  # Valor por defecto si no se especifica
-        white_cmd = self._model.get_white_cmd(self._model_name, intensity)
-        await self._write(white_cmd)
-        self._brightness = intensity
-
-    @retry_bluetooth_connection_error
-    async def set_brightness(self, intensity: int) -> None:
-        """Set brightness with configurable mode (auto/rgb/native)."""
-        self._brightness = max(1, min(int(intensity), 255))
-        percent = round(self._brightness * 100 / 255)
-        mode = (self._brightness_mode or "auto").lower()
-        
-        # ALWAYS use base RGB color (not already-scaled color) to avoid cumulative scaling
-        r, g, b = self._rgb_color_base
-        
-        async def write_rgb_scaled():
-            """Scale RGB values by brightness from base color."""
-            scale = self._brightness / 255.0
-            rr, gg, bb = int(r * scale), int(g * scale), int(b * scale)
-            # Don't save as base color, this is scaled
-            await self.set_color((rr, gg, bb), is_base_color=False)
-            LOGGER.debug("%s: Brightness set via RGB scaling: %d%% (Base RGB: %d,%d,%d -> Scaled: %d,%d,%d)", self.name, percent, r, g, b, rr, gg, bb)
-
-        async def write_native():
-            """Use native brightness command then set base color."""
-            brightness_cmd = self._model.get_brightness_cmd(self._model_name, percent)
-            await self._write(brightness_cmd)
-            LOGGER.debug("%s: Brightness set via native command: %d%%", self.name, percent)
-
-        try:
-            if mode == "rgb":
-                # Always use RGB scaling
-                await write_rgb_scaled()
-            elif mode == "native":
-                # Always use native brightness command
-                await write_native()
-            else:  # auto
-                # Try native first, fallback to RGB on error
-                try:
-                    await write_native()
-                except Exception as e:
-                    LOGGER.warning("%s: Native brightness failed, fallback to RGB: %s", self.name, e)
-                    await write_rgb_scaled()
-        except Exception as e:
-            LOGGER.error("%s: Error setting brightness: %s", self.name, e)  
-            
-    @retry_bluetooth_connection_error
-    async def set_effect_speed(self, value: int) -> None:
-        effect_speed = self._model.get_effect_speed_cmd(self._model_name, value)
-        await self._write(effect_speed)
+    async def set_effect_speed(self, value: int, force: bool = False) -> None:
+        effect_speed = self._spec.effect_speed_cmd(value)
+        await self._send(KIND_EFFECT_SPEED, effect_speed, force)
         self._effect_speed = value
 
     @retry_bluetooth_connection_error
-    async def set_effect(self, value: int) -> None:
-        effect = self._model.get_effect_cmd(self._model_name, value)
-        await self._write(effect)
+    async def set_effect(self, value: int, force: bool = False) -> None:
+        effect = self._spec.effect_cmd(value)
+        await self._send(KIND_EFFECT, effect, force)
         self._effect = value
 
     @retry_bluetooth_connection_error
@@ -437,7 +878,9 @@ class BLEDOMInstance:
         if not 0x80 <= value <= 0x87:
             LOGGER.warning("Invalid mic effect value: 0x%02x, must be between 0x80 and 0x87", value)
             return
-        await self._write([0x7e, 0x05, 0x03, value, 0x04, 0xff, 0xff, 0x00, 0xef])
+        await self._write(KIND_MIC_EFFECT, [0x7e, 0x05, 0x03, value, 0x04, 0xff, 0xff, 0x00, 0xef])
+        # Mic effects replace the color shown by the strip
+        self._shadow.invalidate(COLOR_MODE_KINDS)
         self._mic_effect = value
         LOGGER.debug("Mic effect set to: 0x%02x", value)
 
@@ -447,34 +890,34 @@ class BLEDOMInstance:
         if not 0 <= value <= 100:
             LOGGER.warning("Invalid mic sensitivity value: %d, must be between 0 and 100", value)
             return
-        await self._write([0x7e, 0x04, 0x06, value, 0xff, 0xff, 0xff, 0x00, 0xef])
+        await self._write(KIND_MIC_SENSITIVITY, [0x7e, 0x04, 0x06, value, 0xff, 0xff, 0xff, 0x00, 0xef])
         self._mic_sensitivity = value
         LOGGER.debug("Mic sensitivity set to: %d", value)
 
     @retry_bluetooth_connection_error
     async def enable_mic(self) -> None:
         """Enable external microphone."""
-        await self._write([0x7e, 0x04, 0x07, 0x01, 0xff, 0xff, 0xff, 0x00, 0xef])
+        await self._write(KIND_MIC, [0x7e, 0x04, 0x07, 0x01, 0xff, 0xff, 0xff, 0x00, 0xef])
         self._mic_enabled = True
         LOGGER.debug("External microphone enabled")
 
     @retry_bluetooth_connection_error
     async def disable_mic(self) -> None:
         """Disable external microphone."""
-        await self._write([0x7e, 0x04, 0x07, 0x00, 0xff, 0xff, 0xff, 0x00, 0xef])
+        await self._write(KIND_MIC, [0x7e, 0x04, 0x07, 0x00, 0xff, 0xff, 0xff, 0x00, 0xef])
         self._mic_enabled = False
         LOGGER.debug("External microphone disabled")
 
     @retry_bluetooth_connection_error
-    async def turn_on(self) -> None:
-        cmd = self._model.get_turn_on_cmd(self._model_name)
-        await self._write(cmd)
+    async def turn_on(self, force: bool = False) -> None:
+        cmd = self._spec.turn_on_cmd
+        await self._send(KIND_POWER, cmd, force)
         self._is_on = True
 
     @retry_bluetooth_connection_error
-    async def turn_off(self) -> None:
-        cmd = self._model.get_turn_off_cmd(self._model_name)
-        await self._write(cmd)
+    async def turn_off(self, force: bool = False) -> None:
+        cmd = self._spec.turn_off_cmd
+        await self._send(KIND_POWER, cmd, force)
         self._is_on = False
 
     @retry_bluetooth_connection_error
@@ -483,7 +926,7 @@ class BLEDOMInstance:
             value = days + 0x80
         else:
             value = days
-        await self._write([0x7e, 0x00, 0x82, hours, minutes, 0x00, 0x00, value, 0xef])
+        await self._write(KIND_SCHEDULE_ON, [0x7e, 0x00, 0x82, hours, minutes, 0x00, 0x00, value, 0xef])
 
     @retry_bluetooth_connection_error
     async def set_scheduler_off(self, days: int, hours: int, minutes: int, enabled: bool) -> None:
@@ -491,7 +934,7 @@ class BLEDOMInstance:
             value = days + 0x80
         else:
             value = days
-        await self._write([0x7e, 0x00, 0x82, hours, minutes, 0x00, 0x01, value, 0xef])
+        await self._write(KIND_SCHEDULE_OFF, [0x7e, 0x00, 0x82, hours, minutes, 0x00, 0x01, value, 0xef])
 
     @retry_bluetooth_connection_error
     async def sync_time(self) -> None:
@@ -505,38 +948,43 @@ class BLEDOMInstance:
             int(now.strftime('%S')),
             day_of_week
         )
-        await self._write(cmd)
+        await self._queue.submit(KIND_TIME, cmd, LANE_BACKGROUND)
 
     @retry_bluetooth_connection_error
     async def custom_time(self, hour: int, minute: int, second: int, day_of_week: int) -> None:
         cmd = self._model.get_custom_time_cmd(self._model_name, hour, minute, second, day_of_week)
-        await self._write(cmd)
+        await self._queue.submit(KIND_TIME, cmd, LANE_BACKGROUND)
+
+    async def query_state(self) -> Optional[bytes]:
+        """Query device state and wait for the response, concurrent callers share one query.
 
-    async def query_state(self) -> None:
-        """Query device state using model-specific command."""
+        Returns the response frame, which also updates the state through the
+        notification handler, or None if the model cannot answer or did not in time.
+        """
+        spec = self._spec
+        if not spec.has_query or spec.query_opcode is None or not self._uses_notify or not self._read_uuid:
+            return None
         if not self._client or not self._client.is_connected:
-            return
-        
-        query_cmd = self._model.get_query_cmd(self._model_name)
-        if query_cmd:
-            try:
-                LOGGER.debug("%s: Querying state with model command", self.name)
-                await self._write_while_connected(query_cmd)
-                await asyncio.sleep(0.2)
-            except Exception as e:
-                LOGGER.debug("%s: Query command failed: %s", self.name, e)
+            return None
+        try:
+            return await self._queries.request(spec.query_opcode, self._send_query, spec.query_timeout)
+        except Exception as e:
+            LOGGER.debug("%s: Query command failed: %s", self.name, e)
+            return None
+
+    async def _send_query(self) -> None:
+        LOGGER.debug("%s: Querying state with model command", self.name)
+        if not await self._queue.submit(KIND_QUERY, self._spec.query_cmd, LANE_BACKGROUND):
+            raise ConnectionAbortedError("Query discarded before it was written")
 
     @retry_bluetooth_connection_error
     async def update(self) -> None:
         try:
-            await self._ensure_connected()
+            await self._ensure_connected(PRIORITY_BACKGROUND)
 
-            # Query device state
-            # if self._read_uuid and self._client and self._client.is_connected:
-            #     try:
-            #         await self.query_state()
-            #     except Exception as e:
-            #         LOGGER.debug("%s: Could not query state: %s", self.name, e)
+            # Query device state, the response is applied by the notification handler
+            if self._read_uuid and self._client and self._client.is_connected:
+                await self.query_state()
 
             # PROBLEMS WITH STATUS VALUE, I HAVE NOT VALUE TO WRITE AND GET STATUS
             if(self._is_on is None):
@@ -545,22 +993,8 @@ class BLEDOMInstance:
                 self._color_temp_kelvin = 5000
                 self._brightness = 255
 
-            self._device_data.update_device()
-            #future = asyncio.get_event_loop().create_future()
-            #await self._device.start_notify(self._read_uuid, create_status_callback(future))
-            #await self._write([0x7e, 0x00, 0x01, 0xfa, 0x00, 0x00, 0x00, 0x00, 0xef])
-            #await self._write([0x7e, 0x00, 0x10])
-            #await self._write([0xef, 0x01, 0x77])
-            #await self._write([0x10])
-            #await self._write([0x25, 0x00])
-            #await self._write([0x25, 0x02])
-            #await asyncio.wait_for(future, 5.0)
-            #await self._device.stop_notify(self._read_uuid)
-            #res = future.result()
-            #self._is_on = True #if res[2] == 0x23 else False if res[2] == 0x24 else None
-            # self._rgb_color = (res[6], res[7], res[8])
-            # self._brightness = res[9] if res[9] > 0 else None
-            # LOGGER.debug(''.join(format(x, ' 03x') for x in res))
+            if self._device_data is not None:
+                self._device_data.update_device()
             
         except (Exception) as error:
             self._is_on = False
@@ -568,8 +1002,15 @@ class BLEDOMInstance:
             track = traceback.format_exc()
             LOGGER.debug(track)
         
-    async def _ensure_connected(self) -> None:
-        """Ensure connection to device is established."""
+    async def _ensure_connected(self, priority: int = PRIORITY_COMMAND) -> None:
+        """Ensure connection to device is established.
+
+        Connecting takes a slot lease from the connection manager first, the
+        lease is returned when the connection closes or fails to open. The
+        attempt itself waits for its turn in the adapter connect scheduler.
+        """
+        if priority == PRIORITY_COMMAND and self._idle_timeout is not None:
+            self._idle_timeout.record_activity()
         if self._connect_lock.locked():
             LOGGER.debug(
                 "%s: Connection already in progress, waiting for it to complete; RSSI: %s",
@@ -585,155 +1026,163 @@ class BLEDOMInstance:
                 self._reset_disconnect_timer()
                 return
 
-            LOGGER.debug("%s: Connecting; RSSI: %s", self.name, self.rssi)
+            source = device_source(self._device)
+            self._slot_wait = await self._connections.acquire(self, source, priority)
+            # The lease is kept only if this call hands a connected client over
+            connected = False
             try:
-                client = await establish_connection(
-                        BleakClientWithServiceCache,
-                        self._device,
-                        self.name,
-                        self._disconnected,
-                        cached_services=self._cached_services,
-                        ble_device_callback=lambda: self._device,
-                    )
-            except asyncio.TimeoutError:
-                LOGGER.error("%s: Connection attempt timed out; RSSI: %s", self.name, self.rssi)
-                return
-
-            LOGGER.debug("%s: Connected; RSSI: %s", self.name, self.rssi)
-            
-            # Execute login command BEFORE resolving characteristics for MELK/MODELX devices
-            # These devices disconnect if login is not performed first
-            if self._device.name.lower().startswith("melk") or self._device.name.lower().startswith("modelx"):
-                LOGGER.debug("%s: Executing login procedure before service discovery; RSSI: %s", self.name, self.rssi)
+                LOGGER.debug("%s: Connecting; RSSI: %s", self.name, self.rssi)
                 try:
-                    # Get services to find write UUID for login
-                    temp_services = None
+                    async with self._connect_scheduler.attempt(self, source, priority) as attempt:
+                        self._connect_attempt = attempt
+                        client = await establish_connection(
+                                BleakClientWithServiceCache,
+                                self._device,
+                                self.name,
+                                self._disconnected,
+                                cached_services=self._cached_services,
+                                ble_device_callback=lambda: self._device,
+                            )
+                except asyncio.TimeoutError:
+                    LOGGER.error("%s: Connection attempt timed out; RSSI: %s", self.name, self.rssi)
+                    return
+
+                LOGGER.debug("%s: Connected; RSSI: %s", self.name, self.rssi)
+            
+                # Execute login command BEFORE resolving characteristics for MELK/MODELX devices
+                # These devices disconnect if login is not performed first
+                if self._needs_login:
+                    LOGGER.debug("%s: Executing login procedure before service discovery; RSSI: %s", self.name, self.rssi)
                     try:
-                        temp_services = client.services
-                    except (AttributeError, Exception):
+                        # Get services to find write UUID for login
+                        temp_services = None
                         try:
-                            temp_services = await client.get_services()
-                        except (AttributeError, Exception) as e:
-                            LOGGER.error("%s: Failed to get services: %s", self.name, e)
-                            raise
+                            temp_services = client.services
+                        except (AttributeError, Exception):
+                            try:
+                                temp_services = await client.get_services()
+                            except (AttributeError, Exception) as e:
+                                LOGGER.error("%s: Failed to get services: %s", self.name, e)
+                                raise
                     
-                    temp_write_uuid = None
+                        login_char = None
                     
-                    # Find write characteristic for login
-                    write_uuid = self._model.get_write_uuid(self._model_name)
-                    if write_uuid and (char := temp_services.get_characteristic(write_uuid)):
-                        temp_write_uuid = str(char.uuid)  # Ensure it's a string
-                        LOGGER.debug("%s: Found write UUID for login: %s", self.name, temp_write_uuid)
+                        # Find write characteristic for login
+                        cached = self._get_cached_gatt() or {}
+                        write_uuid = cached.get("write_uuid") or self._spec.write_uuid
+                        if write_uuid and (char := temp_services.get_characteristic(write_uuid)):
+                            login_char = char
+                            LOGGER.debug("%s: Found write UUID for login: %s", self.name, char.uuid)
                     
-                    if temp_write_uuid:
-                        LOGGER.info("%s: Executing login sequence...", self.name)
-                        await client.write_gatt_char(temp_write_uuid, bytes([0x7e, 0x07, 0x83]), response=False)
-                        await asyncio.sleep(1)
-                        await client.write_gatt_char(temp_write_uuid, bytes([0x7e, 0x04, 0x04]), response=False)
-                        await asyncio.sleep(1)
-                        LOGGER.info("%s: Login sequence completed", self.name)
-                    else:
-                        LOGGER.warning("%s: Could not find write UUID for login procedure", self.name)
-                except Exception as e:
-                    LOGGER.error("%s: Login procedure failed: %s", self.name, e)
-                    # Continue anyway, might work for some devices
+                        if login_char:
+                            LOGGER.info("%s: Executing login sequence...", self.name)
+                            read_uuid = cached.get("read_uuid") or self._spec.read_uuid
+                            timing = await run_handshake(self.name, client, login_char, self._handshake, read_uuid)
+                            self._handshake_timing = timing
+                            LOGGER.info("%s: Login sequence completed in %.2fs (fixed delays %.2fs, saved %.2fs, %d/%d steps acknowledged)",
+                                        self.name, timing.elapsed, timing.fixed, timing.saved,
+                                        timing.acknowledged, len(self._handshake))
+                        else:
+                            LOGGER.warning("%s: Could not find write UUID for login procedure", self.name)
+                    except Exception as e:
+                        LOGGER.error("%s: Login procedure failed: %s", self.name, e)
+                        # Continue anyway, might work for some devices
             
-            # Try to get services with fallback
-            services_obj = None
-            try:
-                services_obj = client.services
-            except (AttributeError, Exception):
+                # Try to get services with fallback
+                services_obj = None
                 try:
-                    services_obj = await client.get_services()
-                except (AttributeError, Exception) as e:
-                    LOGGER.error("%s: Failed to get services: %s", self.name, e)
-                    await client.disconnect()
-                    raise
+                    services_obj = client.services
+                except (AttributeError, Exception):
+                    try:
+                        services_obj = await client.get_services()
+                    except (AttributeError, Exception) as e:
+                        LOGGER.error("%s: Failed to get services: %s", self.name, e)
+                        await client.disconnect()
+                        raise
             
-            resolved = self._resolve_characteristics(services_obj)
-            if not resolved:
-                # Try to handle services failing to load
-                try:
-                    # Try alternate method
-                    alt_services = None
+                restored = self._restore_characteristics(services_obj)
+                resolved = restored or self._resolve_characteristics(services_obj)
+                if restored:
+                    self._cached_services = services_obj
+                elif not resolved:
+                    # Try to handle services failing to load
                     try:
-                        alt_services = await client.get_services()
-                    except (AttributeError, Exception):
+                        # Try alternate method
+                        alt_services = None
                         try:
-                            alt_services = client.services
-                        except (AttributeError, Exception) as e:
-                            LOGGER.warning("%s: Could not get services with either method: %s", self.name, e)
-                            raise
+                            alt_services = await client.get_services()
+                        except (AttributeError, Exception):
+                            try:
+                                alt_services = client.services
+                            except (AttributeError, Exception) as e:
+                                LOGGER.warning("%s: Could not get services with either method: %s", self.name, e)
+                                raise
                     
-                    if alt_services:
-                        resolved = self._resolve_characteristics(alt_services)
-                        self._cached_services = alt_services if resolved else None
-                except (AttributeError, Exception) as error:
-                    LOGGER.warning("%s: Could not resolve characteristics from services; RSSI: %s", self.name, self.rssi)
-            else:
-                self._cached_services = services_obj if resolved else None
+                        if alt_services:
+                            resolved = self._resolve_characteristics(alt_services)
+                            self._cached_services = alt_services if resolved else None
+                    except Exception as error:
+                        LOGGER.warning("%s: Could not resolve characteristics from services: %s; RSSI: %s", self.name, error, self.rssi)
+                else:
+                    self._cached_services = services_obj if resolved else None
             
-            if not resolved:
-                await client.clear_cache()
-                await client.disconnect()
-                raise CharacteristicMissingError(
-                    "Failed to find supported characteristics, device may not be supported"
-                )
+                if not resolved:
+                    await client.clear_cache()
+                    await client.disconnect()
+                    raise CharacteristicMissingError(
+                        "Failed to find supported characteristics, device may not be supported"
+                    )
 
-            LOGGER.debug("%s: Characteristics resolved: %s; RSSI: %s", self.name, resolved, self.rssi)
+                LOGGER.debug("%s: Characteristics resolved: %s; RSSI: %s", self.name, resolved, self.rssi)
+                if not restored:
+                    self._save_characteristics(self._cached_services)
 
-            self._client = client
-            self._reset_disconnect_timer()
+                self._client = client
+                connected = True
+                self._breaker.record_success()
+                self._reset_disconnect_timer()
 
-            # Enable notifications (simple method, no manual CCCD)
-            try:
-                if not self._device.name.lower().startswith("melk") and not self._device.name.lower().startswith("ledble"):
-                    if self._read_uuid is not None and isinstance(self._read_uuid, str) and self._read_uuid.lower() != "none":
-                        LOGGER.debug("%s: Enabling notifications; RSSI: %s", self.name, self.rssi)
-                        await client.start_notify(self._read_uuid, self._notification_handler)
-                        LOGGER.info("%s: Notifications enabled", self.name)
-                    else:
-                        LOGGER.warning("%s: Read UUID not resolved (value: %s), skipping notifications", self.name, self._read_uuid)
-            except Exception as e:
-                LOGGER.warning("%s: Notifications could not be enabled: %s", self.name, e)
+                # Enable notifications (simple method, no manual CCCD)
+                try:
+                    if self._uses_notify:
+                        if self._read_uuid is not None:
+                            LOGGER.debug("%s: Enabling notifications; RSSI: %s", self.name, self.rssi)
+                            await client.start_notify(self._read_uuid, self._notification_handler)
+                            LOGGER.info("%s: Notifications enabled", self.name)
+                        else:
+                            LOGGER.warning("%s: Read UUID not resolved (value: %s), skipping notifications", self.name, self._read_uuid)
+                except Exception as e:
+                    LOGGER.warning("%s: Notifications could not be enabled: %s", self.name, e)
+            finally:
+                if not connected:
+                    self._connections.release(self)
 
 
 
     def _notification_handler(self, _sender: int, data: bytearray) -> None:
         """Handle notification responses."""
         self._notification_received = True  # Mark that we got a response
-        LOGGER.info("%s: ✓ Notification received (%d bytes): %s", self.name, len(data), ' '.join(f'{x:02x}' for x in data))
-        
-        # Parse notification data if available
-        if len(data) >= 9 and data[0] == 0x7e and data[8] == 0xef:
-            # Valid response packet
-            cmd_type = data[2]
-            
-            # Status response (0x01)
-            if cmd_type == 0x01:
-                # Power state might be in data[3]
-                power_state = data[3]
-                if power_state in [0x23, 0xf0, 0x01]:
-                    self._is_on = True
-                    LOGGER.debug("%s: Parsed power state: ON", self.name)
-                elif power_state in [0x24, 0x00]:
-                    self._is_on = False
-                    LOGGER.debug("%s: Parsed power state: OFF", self.name)
-                
-                # Try to parse RGB color if available
-                if len(data) >= 8:
-                    r, g, b = data[4], data[5], data[6]
-                    if r != 0xff or g != 0xff or b != 0xff:  # Not default/invalid values
-                        self._rgb_color = (r, g, b)
-                        LOGGER.debug("%s: Parsed RGB color: (%d, %d, %d)", self.name, r, g, b)
-                
-                # Brightness might be in data[7]
-                if len(data) >= 8 and data[7] != 0xff:
-                    brightness_percent = data[7]
-                    self._brightness = int(brightness_percent * 255 / 100)
-                    LOGGER.debug("%s: Parsed brightness: %d%%", self.name, brightness_percent)
-        
-        return
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("%s: Notification received (%d bytes): %s", self.name, len(data), data.hex(" "))
+
+        delta = decode_status(self._spec.status_frames, data)
+        if delta is not None:
+            self._apply_delta(delta)
+        # Answers a pending query once the state it reports is applied
+        self._queries.resolve(data)
+
+    def _apply_delta(self, delta: StateDelta) -> StateDelta:
+        """Store the fields that differ from the known state and push them to the entities."""
+        changed = StateDelta()
+        for name in delta.changed:
+            value = getattr(delta, name)
+            if getattr(self, "_" + name) != value:
+                setattr(self, "_" + name, value)
+                setattr(changed, name, value)
+        if changed:
+            LOGGER.debug("%s: State changed on device: %s", self.name, changed)
+            async_dispatcher_send(self._hass, signal_state_delta(self._address), changed)
+        return changed
 
     def _resolve_characteristics(self, services: BleakGATTServiceCollection) -> bool:
         """Resolve characteristics."""
@@ -748,7 +1197,7 @@ class BLEDOMInstance:
                 LOGGER.debug("%s:   Characteristic %s (properties: %s)", self.name, char.uuid, char.properties)
         
         # Try to find read characteristic
-        read_uuid = self._model.get_read_uuid(self._model_name)
+        read_uuid = self._spec.read_uuid
         if read_uuid and (char := services.get_characteristic(read_uuid)):
             self._read_uuid = str(char.uuid)  # Ensure it's a string
             LOGGER.debug("%s: Found read UUID: %s with handle %s", self.name, self._read_uuid, char.handle if hasattr(char, 'handle') else 'Unknown')
@@ -757,7 +1206,7 @@ class BLEDOMInstance:
             LOGGER.warning("%s: Could not find read characteristic: %s", self.name, read_uuid)
         
         # Try to find write characteristic
-        write_uuid = self._model.get_write_uuid(self._model_name)
+        write_uuid = self._spec.write_uuid
         if write_uuid and (char := services.get_characteristic(write_uuid)):
             self._write_uuid = str(char.uuid)  # Ensure it's a string
             char_handle = char.handle if hasattr(char, 'handle') else None
@@ -767,7 +1216,7 @@ class BLEDOMInstance:
             if char_handle is not None:
                 self._detect_model(char_handle)
                 # Update write_uuid in case model changed
-                write_uuid = self._model.get_write_uuid(self._model_name)
+                write_uuid = self._spec.write_uuid
                 if write_uuid:
                     self._write_uuid = str(write_uuid)
         else:
@@ -775,7 +1224,7 @@ class BLEDOMInstance:
             LOGGER.error("%s: Could not find write characteristic: %s", self.name, write_uuid)
         
         # For devices like MELK that don't use notifications, only write_uuid is required
-        if self._device.name.lower().startswith("melk") or self._device.name.lower().startswith("modelx"):
+        if self._needs_login:
             result = bool(self._write_uuid)
             LOGGER.debug("%s: Device doesn't require read UUID, resolved: %s", self.name, result)
             return result
@@ -786,28 +1235,97 @@ class BLEDOMInstance:
         """Reset disconnect timer."""
         if self._disconnect_timer:
             self._disconnect_timer.cancel()
+            self._disconnect_timer = None
         self._expected_disconnect = False
-        if self._delay is not None and self._delay != 0:
-            LOGGER.debug("%s: Configured disconnect from device in %s seconds; RSSI: %s", self.name, self._delay, self.rssi)
+        self._connections.touch(self)
+        if self._holds:
+            return
+        delay = self.disconnect_delay
+        if delay is not None and delay != 0:
+            LOGGER.debug("%s: Configured disconnect from device in %s seconds; RSSI: %s", self.name, delay, self.rssi)
             self._disconnect_timer = self.loop.call_later(
-                self._delay, self._disconnect
+                delay, self._disconnect
             )
 
     def _disconnected(self, client: BleakClientWithServiceCache) -> None:
         """Disconnected callback."""
+        if client is self._client:
+            self._connections.release(self)
+            self._queries.cancel_all()
         if self._expected_disconnect:
             LOGGER.debug("%s: Disconnected from device; RSSI: %s", self.name, self.rssi)
             return
         LOGGER.warning("%s: Device unexpectedly disconnected; RSSI: %s",self.name,self.rssi,)
+        # The device may have lost power, its state is no longer known
+        self._shadow.invalidate()
 
     def _disconnect(self) -> None:
         """Disconnect from device."""
         self._disconnect_timer = None
         asyncio.create_task(self._execute_timed_disconnect())
 
+    def _record_failure(self) -> None:
+        """Count a failed operation and start probing the device if the breaker opened."""
+        self._breaker.record_failure()
+        if self._breaker.state != STATE_CLOSED and (self._probe_task is None or self._probe_task.done()):
+            self._probe_task = asyncio.create_task(self._probe_unreachable())
+
+    async def _probe_unreachable(self) -> None:
+        """Try to reconnect in background while the circuit breaker is open."""
+        while self._breaker.state != STATE_CLOSED:
+            retry_at = self._breaker.retry_at
+            if retry_at is None:
+                # A command holds the half-open trial
+                await asyncio.sleep(PROBE_POLL_INTERVAL)
+                continue
+            await asyncio.sleep(max(0.0, retry_at - time.monotonic()))
+            if not self._breaker.allow():
+                continue
+            try:
+                await self._ensure_connected(PRIORITY_BACKGROUND)
+            except asyncio.CancelledError:
+                self._breaker.reopen()
+                raise
+            except Exception as err:  # pylint: disable=broad-except
+                LOGGER.debug("%s: Background reconnect failed: %s", self.name, err)
+                self._breaker.record_failure()
+                continue
+            if self._breaker.state == STATE_HALF_OPEN:
+                # Timed out without an exception
+                self._breaker.record_failure()
+
     async def stop(self) -> None:
         """Stop the LEDBLE."""
         LOGGER.debug("%s: Stop", self.name)
+        self._transitions.cancel()
+        if self._stream is not None:
+            await self.stop_stream()
+        if self._probe_task:
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self._prepare_timer:
+            self._prepare_timer.cancel()
+            self._prepare_timer = None
+            self._holds -= 1
+        if self._unsubscribe_advertisements:
+            self._unsubscribe_advertisements()
+            self._unsubscribe_advertisements = None
+            async_release_advertisement_tracker(self._hass)
+        await self._reconciler.stop()
+        await self._queue.stop()
+        await self._execute_disconnect()
+
+    @property
+    def connection_idle(self) -> bool:
+        """Whether the connection can be closed without interrupting anything."""
+        return not (self._holds or self._queue.busy or self._transitions.running or self._connect_lock.locked())
+
+    async def release_connection(self) -> None:
+        """Close the connection to give its slot to another strip."""
+        LOGGER.debug("%s: Giving up connection slot", self.name)
+        if self._disconnect_timer:
+            self._disconnect_timer.cancel()
+            self._disconnect_timer = None
         await self._execute_disconnect()
 
     async def _execute_timed_disconnect(self) -> None:
@@ -815,7 +1333,7 @@ class BLEDOMInstance:
         LOGGER.debug(
             "%s: Disconnecting after timeout of %s",
             self.name,
-            self._delay,
+            self.disconnect_delay,
         )
         await self._execute_disconnect()
     async def _execute_disconnect(self) -> None:
@@ -828,9 +1346,11 @@ class BLEDOMInstance:
             self._client = None
             self._write_uuid = None
             self._read_uuid = None
+            self._connections.release(self)
+            self._queries.cancel_all()
             if client and client.is_connected:
                 try:
-                    if read_char and not self._device.name.lower().startswith("melk") and not self._device.name.lower().startswith("ledble"):
+                    if read_char and self._uses_notify:
                         await client.stop_notify(read_char)
                     await client.disconnect()
                 except Exception as e:
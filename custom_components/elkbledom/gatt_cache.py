@@ -0,0 +1,72 @@
+"""Persistent cache of resolved GATT characteristics per device"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from bleak.backends.service import BleakGATTServiceCollection
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+LOGGER = logging.getLogger(__name__)
+
+# GATT cache data key in hass.data
+GATT_CACHE_DATA_KEY = "elkbledom_gatt_cache"
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "elkbledom.gatt_cache"
+# Delay before writing changes to disk (seconds)
+SAVE_DELAY = 10
+
+
+def services_fingerprint(services: BleakGATTServiceCollection) -> str:
+    """Hash of all service/characteristic UUIDs and handles of a device."""
+    digest = hashlib.sha1()
+    for service in sorted(services, key=lambda s: s.handle):
+        digest.update(f"{service.uuid}:".encode())
+        for char in sorted(service.characteristics, key=lambda c: c.handle):
+            digest.update(f"{char.uuid}@{char.handle};".encode())
+    return digest.hexdigest()[:16]
+
+
+class GattCache:
+    """Resolved write/read UUIDs and refined model per MAC, kept in HA storage."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data: Dict[str, Dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load()
+        if isinstance(data, dict):
+            self._data = data
+        LOGGER.debug("Loaded GATT cache for %d devices", len(self._data))
+
+    def get(self, address: str) -> Optional[Dict[str, Any]]:
+        return self._data.get(address)
+
+    def set(self, address: str, entry: Dict[str, Any]) -> None:
+        if self._data.get(address) == entry:
+            return
+        self._data[address] = entry
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+    def invalidate(self, address: str) -> None:
+        if self._data.pop(address, None) is not None:
+            LOGGER.debug("%s: GATT cache invalidated", address)
+            self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+
+async def async_get_gatt_cache(hass: HomeAssistant) -> GattCache:
+    """Get the GATT cache, loading it from storage on first use."""
+    if GATT_CACHE_DATA_KEY not in hass.data:
+        cache = GattCache(hass)
+        await cache.async_load()
+        hass.data.setdefault(GATT_CACHE_DATA_KEY, cache)
+    return hass.data[GATT_CACHE_DATA_KEY]
+
+
+def get_gatt_cache(hass: HomeAssistant) -> Optional[GattCache]:
+    """Get the GATT cache if it has been loaded."""
+    return hass.data.get(GATT_CACHE_DATA_KEY)
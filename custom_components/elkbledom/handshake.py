@@ -0,0 +1,163 @@
+"""Declarative login handshake for LED strips"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# Delays used when a step does not define them (seconds)
+DEFAULT_MIN_DELAY = 0.1
+DEFAULT_MAX_DELAY = 1.0
+
+# Login used for devices that require one but whose model has no handshake (MELK, MODELX).
+# MELK strips send no notifications, so the steps can only be paced by the write response
+DEFAULT_LOGIN_HANDSHAKE = [
+    {"write": [126, 7, 131], "ack": True, "min_delay": 0.2, "max_delay": 1.0},
+    {"write": [126, 4, 4], "ack": True, "min_delay": 0.2, "max_delay": 1.0},
+]
+
+
+@dataclass(frozen=True, slots=True)
+class HandshakeStep:
+    """One handshake step: a frame to write and how to tell when to send the next one."""
+
+    write: bytes
+    # Expected notification as a prefix pattern, None entries match any byte
+    expect: Optional[Tuple[Optional[int], ...]]
+    # Use write-with-response when the characteristic supports it. The response
+    # comes from the GATT server: it shows the frame arrived, not that the
+    # device processed it, which is why min_delay is still waited after it
+    ack: bool
+    # Wait at least min_delay after the notification or write response, at most max_delay otherwise
+    min_delay: float
+    max_delay: float
+
+    def matches(self, data: bytes) -> bool:
+        """Check whether a notification is the one this step waits for."""
+        if self.expect is None or len(data) < len(self.expect):
+            return False
+        for expected, value in zip(self.expect, data):
+            if expected is not None and expected != value:
+                return False
+        return True
+
+
+@dataclass(slots=True)
+class HandshakeTiming:
+    """Timing of one handshake run compared to waiting max_delay on every step."""
+
+    elapsed: float = 0.0
+    fixed: float = 0.0
+    steps: List[float] = field(default_factory=list)
+    acknowledged: int = 0
+
+    @property
+    def saved(self) -> float:
+        return max(0.0, self.fixed - self.elapsed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "elapsed": round(self.elapsed, 3),
+            "fixed": round(self.fixed, 3),
+            "saved": round(self.saved, 3),
+            "acknowledged": self.acknowledged,
+            "steps": [round(step, 3) for step in self.steps],
+        }
+
+
+def compile_handshake(raw: List[Dict[str, Any]]) -> Tuple[HandshakeStep, ...]:
+    """Compile a models.json handshake list."""
+    steps = []
+    for step in raw:
+        min_delay = float(step.get("min_delay", DEFAULT_MIN_DELAY))
+        max_delay = float(step.get("max_delay", DEFAULT_MAX_DELAY))
+        if min_delay > max_delay:
+            raise ValueError(f"min_delay {min_delay} greater than max_delay {max_delay}")
+        expect = step.get("expect")
+        steps.append(HandshakeStep(
+            write=bytes(step["write"]),
+            expect=tuple(expect) if expect else None,
+            ack=bool(step.get("ack", False)),
+            min_delay=min_delay,
+            max_delay=max_delay,
+        ))
+    return tuple(steps)
+
+
+DEFAULT_LOGIN_STEPS = compile_handshake(DEFAULT_LOGIN_HANDSHAKE)
+
+
+async def run_handshake(
+    name: str,
+    client: Any,
+    write_char: Any,
+    steps: Tuple[HandshakeStep, ...],
+    read_uuid: Optional[str] = None,
+) -> HandshakeTiming:
+    """Run handshake steps, advancing as soon as each step is answered.
+
+    A step is answered when its expected notification arrives or, for ack
+    steps without one, when the GATT write response arrives; otherwise the
+    engine falls back to waiting max_delay.
+    """
+    timing = HandshakeTiming()
+    loop = asyncio.get_running_loop()
+    waiter: Optional[asyncio.Future] = None
+    current: Optional[HandshakeStep] = None
+    can_ack = "write" in getattr(write_char, "properties", ())
+
+    def _notification(_sender: Any, data: bytearray) -> None:
+        if waiter is not None and not waiter.done() and current is not None and current.matches(data):
+            waiter.set_result(None)
+
+    notify = read_uuid is not None and any(step.expect for step in steps)
+    if notify:
+        try:
+            await client.start_notify(read_uuid, _notification)
+        except Exception as e:
+            LOGGER.debug("%s: Handshake notifications unavailable: %s", name, e)
+            notify = False
+
+    start = time.monotonic()
+    try:
+        for current in steps:
+            step_start = time.monotonic()
+            timing.fixed += current.max_delay
+            waiter = loop.create_future() if notify and current.expect else None
+            ready = False
+            if current.ack and can_ack:
+                try:
+                    await client.write_gatt_char(write_char, current.write, response=True)
+                    ready = waiter is None
+                except Exception as e:
+                    LOGGER.debug("%s: Handshake write with response failed, falling back: %s", name, e)
+                    can_ack = False
+                    await client.write_gatt_char(write_char, current.write, response=False)
+            else:
+                await client.write_gatt_char(write_char, current.write, response=False)
+            if waiter is not None:
+                try:
+                    remaining = current.max_delay - (time.monotonic() - step_start)
+                    await asyncio.wait_for(waiter, max(0.0, remaining))
+                    ready = True
+                except asyncio.TimeoutError:
+                    LOGGER.debug("%s: No handshake notification within %.2fs", name, current.max_delay)
+            if ready:
+                timing.acknowledged += 1
+            delay = (current.min_delay if ready else current.max_delay) - (time.monotonic() - step_start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            timing.steps.append(time.monotonic() - step_start)
+    finally:
+        waiter = None
+        if notify:
+            try:
+                await client.stop_notify(read_uuid)
+            except Exception:
+                pass
+    timing.elapsed = time.monotonic() - start
+    return timing
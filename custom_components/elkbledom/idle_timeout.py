@@ -0,0 +1,101 @@
+"""Adaptive idle-disconnect timeout for LED strips"""
+import bisect
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+# Histogram bin edges for the gaps between commands (seconds)
+GAP_EDGES = (1, 2, 3, 5, 7.5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 450, 600, 900, 1200, 1800, 3600)
+# Shortest timeout the adaptive mode picks (seconds)
+MIN_IDLE_TIMEOUT = 5
+# Longest an idle connection may hold its slot (seconds)
+DEFAULT_MAX_IDLE_TIMEOUT = 600
+# Weight kept by older gaps each time a new gap is recorded
+GAP_DECAY = 0.98
+# Recorded gaps needed before the timeout adapts
+MIN_GAP_SAMPLES = 5
+# Reconnect probability within this margin of the best counts as equally good,
+# the shorter timeout then wins
+RECONNECT_TOLERANCE = 0.05
+
+
+class AdaptiveIdleTimeout:
+    """Picks the idle-disconnect delay from the gaps between commands.
+
+    Gaps are kept in a decaying histogram. A gap longer than the timeout
+    costs a reconnect, so the timeout is the shortest bin edge, no longer
+    than max_timeout, whose reconnect probability is within a small margin
+    of the lowest one reachable. Short bursts keep the slot only as long as
+    they need instead of all night.
+    """
+
+    def __init__(self, name: str, delay: Optional[int], max_timeout: float = DEFAULT_MAX_IDLE_TIMEOUT) -> None:
+        self._name = name
+        # Configured fixed delay (0 never disconnects), compared against to count avoided reconnects
+        self._fixed = delay or None
+        self.max_timeout = max_timeout
+        self._bins: List[float] = [0.0] * len(GAP_EDGES)
+        self._weight = 0.0
+        self._samples = 0
+        self._last_activity: Optional[float] = None
+        self.timeout: float = min(delay or max_timeout, max_timeout)
+        self.reconnects_avoided = 0
+        self.extra_reconnects = 0
+
+    def record_activity(self, now: Optional[float] = None) -> None:
+        """Record a command, adding the gap since the previous one."""
+        now = time.monotonic() if now is None else now
+        last, self._last_activity = self._last_activity, now
+        if last is None:
+            return
+        gap = now - last
+        if gap < GAP_EDGES[0]:
+            # Same burst
+            return
+        fixed = self._fixed if self._fixed is not None else float("inf")
+        if fixed < gap <= self.timeout:
+            self.reconnects_avoided += 1
+        elif self.timeout < gap <= fixed:
+            self.extra_reconnects += 1
+        self._add(gap)
+
+    def _add(self, gap: float) -> None:
+        self._bins = [count * GAP_DECAY for count in self._bins]
+        self._bins[bisect.bisect_right(GAP_EDGES, gap) - 1] += 1.0
+        self._weight = self._weight * GAP_DECAY + 1.0
+        self._samples += 1
+        if self._samples >= MIN_GAP_SAMPLES:
+            timeout = self._choose()
+            if timeout != self.timeout:
+                LOGGER.debug("%s: Idle timeout adapted from %ss to %ss", self._name, self.timeout, timeout)
+                self.timeout = timeout
+
+    def reconnect_probability(self, timeout: float) -> float:
+        """Share of recent gaps longer than timeout."""
+        if not self._weight:
+            return 0.0
+        first = bisect.bisect_left(GAP_EDGES, timeout)
+        return sum(self._bins[first:]) / self._weight
+
+    def _choose(self) -> float:
+        candidates = [edge for edge in GAP_EDGES if MIN_IDLE_TIMEOUT <= edge < self.max_timeout]
+        candidates.append(self.max_timeout)
+        probabilities = [self.reconnect_probability(edge) for edge in candidates]
+        best = min(probabilities)
+        for edge, probability in zip(candidates, probabilities):
+            if probability <= best + RECONNECT_TOLERANCE:
+                return edge
+        return self.max_timeout
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "idle_timeout": self.timeout,
+            "max_idle_timeout": self.max_timeout,
+            "gaps": self._samples,
+            "reconnect_probability": round(self.reconnect_probability(self.timeout), 3),
+            "reconnects_avoided": self.reconnects_avoided,
+            "extra_reconnects": self.extra_reconnects,
+        }
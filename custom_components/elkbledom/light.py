@@ -5,9 +5,14 @@ import voluptuous as vol
 from typing import Any, Optional, Tuple
 
 from .elkbledom import BLEDOMInstance
-from .const import DOMAIN, EFFECTS, EFFECTS_list, EFFECTS_MAP, EFFECTS_LIST_MAP, CONF_EFFECTS_CLASS
+from .const import DOMAIN, CONF_EFFECTS_CLASS
+from .definitions import get_definitions
+from .planner import MODE_COLOR_TEMP, MODE_EFFECT, MODE_RGB, MODE_WHITE, TargetState
+from .state_delta import StateDelta, signal_state_delta
 
 from homeassistant.const import CONF_MAC, CONF_COLOR_TEMP
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.restore_state import RestoreEntity
@@ -17,6 +22,7 @@ from homeassistant.components.light import (
     ATTR_COLOR_TEMP_KELVIN,
     ATTR_EFFECT,
     ATTR_RGB_COLOR,
+    ATTR_TRANSITION,
     ATTR_WHITE,
     ColorMode,
     LightEntity,
@@ -28,6 +34,9 @@ from homeassistant.helpers import device_registry
 PARALLEL_UPDATES = 0  # fix entity_platform parallel_updates Semaphore
 
 LOGGER = logging.getLogger(__name__)
+# Device state fields shown by the light entity
+LIGHT_DELTA_FIELDS = ("is_on", "rgb_color", "brightness", "color_temp_kelvin", "effect_speed")
+
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Required(CONF_MAC): cv.string
 })
@@ -40,11 +49,12 @@ class BLEDOMLight(RestoreEntity, LightEntity):
     def __init__(self, bledomInstance: BLEDOMInstance, name: str, entry_id: str) -> None:
         self._instance = bledomInstance
         self._entry_id = entry_id
-        has_white = bool(self._instance.model.get_white_cmd(self._instance.model_name, 255))
-        has_color_temp = bool(self._instance.model.get_color_temp_cmd(self._instance.model_name, 50, 50))
-        has_rgb = bool(self._instance.model.get_color_cmd(self._instance.model_name, 255, 255, 255))
-        has_effect = bool(self._instance.model.get_effect_cmd(self._instance.model_name, 1))
-        self._has_effect_speed = bool(self._instance.model.get_effect_speed_cmd(self._instance.model_name, 128))
+        spec = self._instance.spec
+        has_white = spec.has_white
+        has_color_temp = spec.has_ct
+        has_rgb = spec.has_rgb
+        has_effect = spec.has_effect
+        self._has_effect_speed = spec.has_speed
         device_color_modes = set()
         if has_white and not has_rgb and not has_color_temp:
             # WHITE cannot coexist with COLOR_TEMP or RGB in HA supported_color_modes
@@ -57,7 +67,11 @@ class BLEDOMLight(RestoreEntity, LightEntity):
             device_color_modes.add(ColorMode.RGB)
             self._attr_color_mode = ColorMode.RGB
         self._attr_supported_color_modes = device_color_modes
-        self._attr_supported_features = LightEntityFeature.EFFECT if has_effect else LightEntityFeature(0)
+        self._attr_supported_features = LightEntityFeature(0)
+        if spec.can_transition:
+            self._attr_supported_features |= LightEntityFeature.TRANSITION
+        if has_effect:
+            self._attr_supported_features |= LightEntityFeature.EFFECT
         self._attr_name = name
         self._attr_effect = None
         self._attr_unique_id = self._instance.address
@@ -91,17 +105,17 @@ class BLEDOMLight(RestoreEntity, LightEntity):
     def effect_list(self):
         """Return list of available effects for this model."""
         # First check if user has manually configured effects class
+        definitions = get_definitions(self._hass)
         effects_class_name = self._get_configured_effects_class()
         if effects_class_name:
             # Get the corresponding list using the same position in both maps
-            effects_to_list_map = dict(zip(EFFECTS_MAP.keys(), EFFECTS_LIST_MAP.keys()))
-            effects_list_name = effects_to_list_map.get(effects_class_name)
-            if effects_list_name:
-                return EFFECTS_LIST_MAP.get(effects_list_name, EFFECTS_list)
+            effects_list = definitions.get_list_for_class(effects_class_name)
+            if effects_list is not None:
+                return effects_list
         
         # Otherwise use model default
-        effects_list_name = self._instance.model.get_effects_list(self._instance.model_name)
-        return EFFECTS_LIST_MAP.get(effects_list_name, EFFECTS_list)
+        effects_list_name = self._instance.spec.effects_list
+        return definitions.lists.get(effects_list_name) or definitions.get_list("EFFECTS_list")
 
     @property
     def effect(self):
@@ -111,9 +125,20 @@ class BLEDOMLight(RestoreEntity, LightEntity):
     @property
     def extra_state_attributes(self):
         """Return entity specific state attributes."""
+        attributes = {}
         if self._has_effect_speed:
-            return {"effect_speed": self._instance.effect_speed}
-        return {}
+            attributes["effect_speed"] = self._instance.effect_speed
+        idle = self._instance.idle_timeout_stats
+        if idle is not None:
+            # Diagnostics of the adaptive disconnect delay
+            attributes["idle_timeout"] = idle["idle_timeout"]
+            attributes["reconnects_avoided"] = idle["reconnects_avoided"]
+        reconcile = self._instance.reconcile_stats
+        if reconcile is not None:
+            # How often a state check found writes the device did not apply
+            attributes["state_checks"] = reconcile["checks"]
+            attributes["state_repairs"] = reconcile["repairs"]
+        return attributes
 
     @property
     def rgb_color(self):
@@ -154,6 +179,14 @@ class BLEDOMLight(RestoreEntity, LightEntity):
                 return config_entry.options.get(CONF_EFFECTS_CLASS)
         
         return None
+
+    def _get_effect_value(self, effect_name: str) -> Optional[int]:
+        """Get effect value from the configured (or model default) effects class."""
+        definitions = get_definitions(self._hass)
+        effects_class_name = self._get_configured_effects_class() or self._instance.spec.effects_class
+        if effects_class_name not in definitions.classes:
+            effects_class_name = "EFFECTS"
+        return definitions.get_value(effects_class_name, effect_name)
     
     async def async_added_to_hass(self) -> None:
         """Restore previous state when entity is added to hass."""
@@ -220,12 +253,9 @@ class BLEDOMLight(RestoreEntity, LightEntity):
             if ATTR_EFFECT in last_state.attributes:
                 self._attr_effect = last_state.attributes[ATTR_EFFECT]
                 # Get the correct effects class (user configured or model default)
-                effects_class_name = self._get_configured_effects_class()
-                if not effects_class_name:
-                    effects_class_name = self._instance.model.get_effects_class(self._instance.model_name)
-                effects_class = EFFECTS_MAP.get(effects_class_name, EFFECTS)
-                if self._attr_effect in effects_class.__members__:
-                    self._instance._effect = effects_class[self._attr_effect].value
+                effect_value = self._get_effect_value(self._attr_effect)
+                if effect_value is not None:
+                    self._instance._effect = effect_value
                 LOGGER.debug(f"Restored effect: {self._attr_effect}")
             
             # Restore effect speed from extra attributes
@@ -250,6 +280,18 @@ class BLEDOMLight(RestoreEntity, LightEntity):
             )
             self._attr_color_mode = fallback
 
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, signal_state_delta(self._instance.address), self._handle_state_delta))
+
+    @callback
+    def _handle_state_delta(self, delta: StateDelta) -> None:
+        """Write the state when the device reports a change shown by this entity."""
+        if not delta.touches(LIGHT_DELTA_FIELDS):
+            return
+        if delta.rgb_color is not None and ColorMode.RGB in self._attr_supported_color_modes:
+            self._attr_color_mode = ColorMode.RGB
+        self.async_write_ha_state()
+
     def _transform_color_brightness(self, color: Tuple[int, int, int], set_brightness: int):
         rgb = match_max_scale((255,), color)
         res = tuple(color * set_brightness // 255 for color in rgb)
@@ -257,38 +299,14 @@ class BLEDOMLight(RestoreEntity, LightEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         LOGGER.debug(f"Params turn on: {kwargs} color mode: {self._attr_color_mode}")
+        target = TargetState()
+        reset_color = False
         if not self.is_on:
-            await self._instance.turn_on()
+            target.power = True
             if self._instance.reset:
                 LOGGER.debug("Change color to white to reset led strip when other infrared control interact")
                 self._attr_effect = None
-                await self._instance.set_color(self._transform_color_brightness((255, 255, 255), 250), is_base_color=False)
-                if ATTR_WHITE in kwargs:
-                    await self._instance.set_white(kwargs[ATTR_WHITE])
-
-        
-        if ATTR_BRIGHTNESS in kwargs and kwargs[ATTR_BRIGHTNESS] != self.brightness:
-            brightness = kwargs[ATTR_BRIGHTNESS]
-            if self._attr_color_mode == ColorMode.RGB and self.rgb_color is not None:
-                # RGB mode: use native brightness or scale RGB
-                await self._instance.set_brightness(brightness)
-            elif self._attr_color_mode == ColorMode.COLOR_TEMP:
-                # COLOR_TEMP mode: re-apply current temp at new brightness
-                # (also handled below if ATTR_COLOR_TEMP_KELVIN is present, but
-                #  if only brightness changes we must apply it here)
-                if ATTR_COLOR_TEMP_KELVIN not in kwargs and CONF_COLOR_TEMP not in kwargs:
-                    current_temp = self.color_temp_kelvin
-                    if not current_temp:
-                        # No temp known yet — use midpoint of model range
-                        current_temp = (
-                            self._instance.min_color_temp_kelvin
-                            + self._instance.max_color_temp_kelvin
-                        ) // 2
-                    await self._instance.set_color_temp_kelvin(current_temp, brightness)
-            elif self._attr_color_mode == ColorMode.WHITE:
-                # WHITE mode: brightness is the white channel intensity
-                if ATTR_WHITE not in kwargs:
-                    await self._instance.set_white(brightness)
+                reset_color = True
 
         # Handle legacy color_temp (mireds) sent by some cards/automations
         if CONF_COLOR_TEMP in kwargs and ATTR_COLOR_TEMP_KELVIN not in kwargs:
@@ -300,51 +318,74 @@ class BLEDOMLight(RestoreEntity, LightEntity):
             except Exception:
                 pass
 
+        # Later attributes win, as the device ends up showing the last mode sent
+        if ATTR_BRIGHTNESS in kwargs and kwargs[ATTR_BRIGHTNESS] != self.brightness:
+            brightness = kwargs[ATTR_BRIGHTNESS]
+            if self._attr_color_mode == ColorMode.RGB and self.rgb_color is not None:
+                # RGB mode: native brightness or scaled RGB, whichever needs fewer frames
+                target.mode = MODE_RGB
+                target.brightness = brightness
+            elif self._attr_color_mode == ColorMode.COLOR_TEMP:
+                # COLOR_TEMP mode: re-apply current temp at new brightness
+                current_temp = self.color_temp_kelvin
+                if not current_temp:
+                    # No temp known yet — use midpoint of model range
+                    current_temp = (
+                        self._instance.min_color_temp_kelvin
+                        + self._instance.max_color_temp_kelvin
+                    ) // 2
+                target.mode = MODE_COLOR_TEMP
+                target.color_temp_kelvin = current_temp
+                target.brightness = brightness
+            elif self._attr_color_mode == ColorMode.WHITE:
+                # WHITE mode: brightness is the white channel intensity
+                target.mode = MODE_WHITE
+                target.white = brightness
+
         if ATTR_COLOR_TEMP_KELVIN in kwargs:
             self._attr_color_mode = ColorMode.COLOR_TEMP
             new_temp = kwargs[ATTR_COLOR_TEMP_KELVIN]
-            new_brightness = kwargs.get(ATTR_BRIGHTNESS, self.brightness)
             if new_temp != self.color_temp_kelvin or ATTR_BRIGHTNESS in kwargs:
                 self._attr_effect = None
-                await self._instance.set_color_temp_kelvin(new_temp, new_brightness)
+                target.mode = MODE_COLOR_TEMP
+                target.color_temp_kelvin = new_temp
+                target.brightness = kwargs.get(ATTR_BRIGHTNESS, self.brightness)
 
         if ATTR_WHITE in kwargs:
             if ColorMode.WHITE in self._attr_supported_color_modes:
                 self._attr_color_mode = ColorMode.WHITE
             self._attr_effect = None
-            await self._instance.set_color(self._transform_color_brightness((255, 255, 255), kwargs[ATTR_WHITE]), is_base_color=False)
-            await self._instance.set_white(kwargs[ATTR_WHITE])
+            target.mode = MODE_WHITE
+            target.white = kwargs[ATTR_WHITE]
 
         if ATTR_RGB_COLOR in kwargs:
             self._attr_color_mode = ColorMode.RGB
             if kwargs[ATTR_RGB_COLOR] != self.rgb_color:
-                color = kwargs[ATTR_RGB_COLOR]
                 self._attr_effect = None
-                # Save as base color and apply current brightness
-                await self._instance.set_color(color, is_base_color=True)
-                # Apply current brightness to the new color
-                current_brightness = kwargs.get(ATTR_BRIGHTNESS, self.brightness)
-                if current_brightness and current_brightness != 255:
-                    await self._instance.set_brightness(current_brightness)
+                target.mode = MODE_RGB
+                target.rgb = kwargs[ATTR_RGB_COLOR]
+                target.brightness = kwargs.get(ATTR_BRIGHTNESS, self.brightness)
 
         if ATTR_EFFECT in kwargs and kwargs[ATTR_EFFECT] != self.effect:
             self._attr_effect = kwargs[ATTR_EFFECT]
             # Get the correct effects class (user configured or model default)
-            effects_class_name = self._get_configured_effects_class()
-            if not effects_class_name:
-                effects_class_name = self._instance.model.get_effects_class(self._instance.model_name)
-            effects_class = EFFECTS_MAP.get(effects_class_name, EFFECTS)
-            effect_value = effects_class[kwargs[ATTR_EFFECT]].value
-            await self._instance.set_effect(effect_value)
+            effect_value = self._get_effect_value(kwargs[ATTR_EFFECT])
+            if effect_value is None:
+                raise KeyError(kwargs[ATTR_EFFECT])
+            target.mode = MODE_EFFECT
+            target.effect = effect_value
             # Also send effect speed to ensure it's applied
-            if self._instance.effect_speed is not None:
-                await self._instance.set_effect_speed(self._instance.effect_speed)
+            target.effect_speed = self._instance.effect_speed
 
+        await self._instance.apply_state(target, transition=kwargs.get(ATTR_TRANSITION), reset_color=reset_color)
         self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         LOGGER.debug(f"Params turn off: {kwargs} color mode: {self._attr_color_mode}")
-        await self._instance.turn_off()
+        if kwargs.get(ATTR_TRANSITION):
+            await self._instance.apply_state(TargetState(power=False), transition=kwargs[ATTR_TRANSITION])
+        else:
+            await self._instance.turn_off()
         self.async_write_ha_state()
 
     async def async_update(self) -> None:
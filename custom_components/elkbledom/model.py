@@ -1,18 +1,350 @@
 """Model configuration manager for LED strips"""
+from __future__ import annotations
+
 import json
 import logging
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict, List
-from enum import Enum
-from homeassistant.core import HomeAssistant
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Optional, Dict, List, Mapping, Tuple
+
+from .definitions import get_definitions
+from .handshake import HandshakeStep, compile_handshake
+from .status_frames import DEFAULT_STATUS_DECODERS, StatusFrame, compile_status_frames
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
 
 LOGGER = logging.getLogger(__name__)
 
 # Models data key - must match __init__.py
 MODELS_DATA_KEY = "elkbledom_models"
+# Model detection index data key
+MODELS_INDEX_DATA_KEY = "elkbledom_models_index"
+
+# Maximum number of memoized device name detections
+DETECTION_CACHE_SIZE = 1024
+
+# Placeholders of each command template, in the order they are passed to build()
+COMMAND_ARGUMENTS = {
+    "color": ("r", "g", "b"),
+    "color_temp": ("w", "c"),
+    "white": ("i",),
+    "brightness": ("i",),
+    "effect": ("v",),
+    "effect_speed": ("v",),
+}
+
+# Key under which the resolved ModelSpec is stored in each model dict
+MODEL_SPEC_KEY = "spec"
+
+# Device name prefixes that require a login sequence before use
+LOGIN_NAME_PREFIXES = ("melk", "modelx")
+# Device name prefixes that do not support notifications
+NO_NOTIFY_NAME_PREFIXES = ("melk", "ledble")
+
+# Time to wait for a query response once the query is written (seconds)
+DEFAULT_QUERY_TIMEOUT = 1.0
+# Offset of the opcode in query and response frames
+QUERY_OPCODE_OFFSET = 2
+
+DEFAULT_MIN_KELVIN = 1800
+DEFAULT_MAX_KELVIN = 7000
+DEFAULT_EFFECTS_CLASS = "EFFECTS"
+DEFAULT_EFFECTS_LIST = "EFFECTS_list"
+
+
+class CommandTemplate:
+    """Precompiled binary command frame.
+
+    Holds the static bytes of a command and the offsets of its placeholders,
+    so building a frame is one buffer copy plus a few indexed stores.
+    """
+
+    __slots__ = ("base", "slots")
+
+    def __init__(self, base: bytes, slots: Tuple[Tuple[int, int], ...]) -> None:
+        self.base = base
+        # (argument index, byte offset) pairs
+        self.slots = slots
+
+    @classmethod
+    def compile(cls, raw: List, arguments: Tuple[str, ...] = ()) -> "CommandTemplate":
+        """Compile a models.json command list (ints and placeholder strings)."""
+        base = bytearray(len(raw))
+        slots = []
+        for offset, item in enumerate(raw):
+            if isinstance(item, str):
+                if item not in arguments:
+                    raise ValueError(f"Unknown placeholder '{item}'")
+                slots.append((arguments.index(item), offset))
+            else:
+                base[offset] = item
+        return cls(bytes(base), tuple(slots))
+
+    def build(self, *args: int) -> bytes:
+        """Build a frame, replacing placeholders with the given arguments."""
+        if not self.slots:
+            return self.base
+        frame = bytearray(self.base)
+        for index, offset in self.slots:
+            frame[offset] = args[index]
+        return frame
+
+    def extract(self, frame: bytes) -> Tuple[int, ...]:
+        """Read the arguments back from a frame built with this template."""
+        return tuple(frame[offset] for _, offset in sorted(self.slots))
+
+
+def compile_commands(model_name: str, commands: Dict[str, List]) -> Mapping[str, CommandTemplate]:
+    """Compile all command templates of a model, skipping empty or invalid ones."""
+    compiled = {}
+    for command, raw in commands.items():
+        if not raw:
+            continue
+        try:
+            compiled[command] = CommandTemplate.compile(raw, COMMAND_ARGUMENTS.get(command, ()))
+        except (TypeError, ValueError) as e:
+            LOGGER.warning("Invalid '%s' command for model %s: %s", command, model_name, e)
+    return MappingProxyType(compiled)
+
+
+@dataclass(frozen=True, slots=True)
+class ModelSpec:
+    """Resolved model configuration, read as plain attributes on the hot path."""
+
+    key: str
+    name: str
+    handle: Optional[int]
+    write_uuid: Optional[str]
+    read_uuid: Optional[str]
+    commands: Mapping[str, CommandTemplate]
+    min_color_temp_kelvin: int
+    max_color_temp_kelvin: int
+    effects_class: str
+    effects_list: str
+    has_rgb: bool
+    has_white: bool
+    has_ct: bool
+    has_brightness: bool
+    has_effect: bool
+    has_speed: bool
+    has_query: bool
+    # Opcode (byte 2) of the response frame answering the query command
+    query_opcode: Optional[int]
+    query_timeout: float
+    # Decoders for the status notifications of the model, tried in order
+    status_frames: Tuple[StatusFrame, ...]
+    handshake: Tuple[HandshakeStep, ...]
+    needs_login: bool
+    uses_notify: bool
+
+    @property
+    def can_transition(self) -> bool:
+        """Whether the model has a color, color temperature or white command to interpolate."""
+        return self.has_rgb or self.has_ct or self.has_white
+
+    def _build(self, command: str, *args: int) -> Optional[bytes]:
+        template = self.commands.get(command)
+        if template is None:
+            return None
+        return template.build(*args)
+
+    @property
+    def turn_on_cmd(self) -> Optional[bytes]:
+        return self._build("turn_on")
+
+    @property
+    def turn_off_cmd(self) -> Optional[bytes]:
+        return self._build("turn_off")
+
+    @property
+    def query_cmd(self) -> Optional[bytes]:
+        return self._build("query")
+
+    def white_cmd(self, intensity: int) -> Optional[bytes]:
+        # 'i' placeholder is a 0-100 percentage
+        return self._build("white", int(intensity * 100 / 255))
+
+    def brightness_cmd(self, intensity: int) -> Optional[bytes]:
+        # 'i' placeholder is a 0-100 percentage
+        return self._build("brightness", int(intensity * 100 / 255))
+
+    def effect_cmd(self, value: int) -> Optional[bytes]:
+        return self._build("effect", int(value))
+
+    def effect_speed_cmd(self, value: int) -> Optional[bytes]:
+        return self._build("effect_speed", int(value))
+
+    def color_temp_cmd(self, warm: int, cold: int) -> Optional[bytes]:
+        return self._build("color_temp", int(warm), int(cold))
+
+    def color_cmd(self, r: int, g: int, b: int) -> Optional[bytes]:
+        return self._build("color", r, g, b)
+
+
+def build_model_spec(internal_key: str, model: Dict) -> ModelSpec:
+    """Resolve a models.json entry into a ModelSpec."""
+    name = model.get("name", internal_key.split("#")[0])
+    name_lower = name.lower()
+    commands = compile_commands(internal_key, model.get("commands", {}))
+    read_uuid = model.get("read_uuid")
+    if isinstance(read_uuid, str) and read_uuid.lower() == "none":
+        read_uuid = None
+    color_temp_range = model.get("color_temp_range") or {}
+    query_opcode = model.get("query_response_opcode")
+    if query_opcode is None and "query" in commands and len(commands["query"].base) > QUERY_OPCODE_OFFSET:
+        # Devices answer a query with a frame carrying the same opcode
+        query_opcode = commands["query"].base[QUERY_OPCODE_OFFSET]
+    try:
+        handshake = compile_handshake(model.get("handshake") or [])
+    except (KeyError, TypeError, ValueError) as e:
+        LOGGER.warning("Invalid handshake for model %s: %s", internal_key, e)
+        handshake = ()
+    status_frames = DEFAULT_STATUS_DECODERS
+    if "status_frames" in model:
+        try:
+            status_frames = compile_status_frames(model["status_frames"] or [])
+        except (KeyError, TypeError, ValueError) as e:
+            LOGGER.warning("Invalid status_frames for model %s: %s", internal_key, e)
+    return ModelSpec(
+        key=internal_key,
+        name=name,
+        handle=model.get("handle"),
+        write_uuid=model.get("write_uuid"),
+        read_uuid=read_uuid,
+        commands=commands,
+        min_color_temp_kelvin=color_temp_range.get("min_kelvin", DEFAULT_MIN_KELVIN),
+        max_color_temp_kelvin=color_temp_range.get("max_kelvin", DEFAULT_MAX_KELVIN),
+        effects_class=model.get("effects_class", DEFAULT_EFFECTS_CLASS),
+        effects_list=model.get("effects_list", DEFAULT_EFFECTS_LIST),
+        has_rgb="color" in commands,
+        has_white="white" in commands,
+        has_ct="color_temp" in commands,
+        has_brightness="brightness" in commands,
+        has_effect="effect" in commands,
+        has_speed="effect_speed" in commands,
+        has_query="query" in commands,
+        query_opcode=query_opcode,
+        query_timeout=float(model.get("query_timeout", DEFAULT_QUERY_TIMEOUT)),
+        status_frames=status_frames,
+        handshake=handshake,
+        needs_login=bool(handshake) or name_lower.startswith(LOGIN_NAME_PREFIXES),
+        uses_notify=read_uuid is not None and not name_lower.startswith(NO_NOTIFY_NAME_PREFIXES),
+    )
+
+
+def load_models(models_file: Path) -> Dict[str, Dict]:
+    """Load models.json and compile command templates (blocking, run in executor)."""
+    try:
+        if not models_file.exists():
+            LOGGER.error("models.json file not found at: %s", models_file)
+            return {}
+        
+        content = models_file.read_text(encoding="utf-8")
+        models_array = json.loads(content)
+        
+        # Convert array to dictionary for internal use
+        # Each model gets a unique internal key: name or name_handle
+        models_dict = {}
+        for model in models_array:
+            model_name = model.get("name", "Unknown")
+            handle = model.get("handle")
+            
+            # Create unique internal key
+            if handle is not None:
+                internal_key = f"{model_name}#{handle}"
+            else:
+                internal_key = model_name
+            
+            # Store the model data with the internal key
+            models_dict[internal_key] = model.copy()
+            # Ensure 'name' field is preserved
+            models_dict[internal_key]["name"] = model_name
+            models_dict[internal_key][MODEL_SPEC_KEY] = build_model_spec(internal_key, models_dict[internal_key])
+            
+        LOGGER.debug("Loaded %d models from models.json array", len(models_dict))
+        return models_dict
+    except json.JSONDecodeError as e:
+        LOGGER.error("Error decoding models.json: %s", e)
+        return {}
+    except Exception as e:
+        LOGGER.error("Error loading models.json from %s: %s", models_file, e)
+        return {}
+
+class ModelDetection:
+    """Precomputed detection result for one device name."""
+
+    __slots__ = ("generic", "by_handle", "handle_fallback")
+
+    def __init__(self, candidates: List[Tuple[str, Dict]]) -> None:
+        # candidates are (internal_key, model_data) in models.json order
+        self.generic: Optional[str] = None
+        self.by_handle: Dict[int, str] = {}
+        self.handle_fallback: Optional[str] = None
+        if not candidates:
+            return
+        if len(candidates) == 1:
+            self.generic = self.handle_fallback = candidates[0][0]
+            return
+
+        # Name detection: most specific (longest) name, preferring the generic version
+        by_length = sorted(candidates, key=lambda x: len(x[1].get("name", "")), reverse=True)
+        self.generic = next(
+            (key for key, data in by_length if data.get("handle") is None), by_length[0][0]
+        )
+
+        # Handle detection: first model with a matching handle, else generic, else first match
+        for key, data in candidates:
+            handle = data.get("handle")
+            if handle is not None:
+                self.by_handle.setdefault(handle, key)
+        self.handle_fallback = next(
+            (key for key, data in candidates if data.get("handle") is None), candidates[0][0]
+        )
+
+
+class ModelIndex:
+    """Lowercase prefix trie over model names, built once at load.
+
+    Each node is a dict of next character -> node; the entry under None holds the
+    models whose name ends at that node. Detections are memoized per device name,
+    so repeated advertisements from the same device cost one dict lookup.
+    """
+
+    def __init__(self, models: Dict[str, Dict]) -> None:
+        self._root: Dict = {}
+        self._order: Dict[str, int] = {}
+        self._cache: Dict[str, ModelDetection] = {}
+        for position, (internal_key, model_data) in enumerate(models.items()):
+            self._order[internal_key] = position
+            node = self._root
+            for char in model_data.get("name", internal_key.split("#")[0]).lower():
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append((internal_key, model_data))
+
+    def _candidates(self, device_name: str) -> List[Tuple[str, Dict]]:
+        """All models whose name is a prefix of device_name, in models.json order."""
+        node = self._root
+        matches = list(node.get(None, ()))
+        for char in device_name.lower():
+            node = node.get(char)
+            if node is None:
+                break
+            matches.extend(node.get(None, ()))
+        matches.sort(key=lambda x: self._order[x[0]])
+        return matches
+
+    def lookup(self, device_name: str) -> ModelDetection:
+        """Get (memoized) detection result for a device name."""
+        detection = self._cache.get(device_name)
+        if detection is None:
+            if len(self._cache) >= DETECTION_CACHE_SIZE:
+                self._cache.clear()
+            detection = ModelDetection(self._candidates(device_name))
+            self._cache[device_name] = detection
+        return detection
 
-# Cache for dynamically created effect enums
-_EFFECTS_CACHE = {}
 
 async def ensure_models_loaded(hass: HomeAssistant) -> Dict[str, Dict]:
     """Ensure models are loaded in hass.data, loading them if necessary."""
@@ -21,45 +353,10 @@ async def ensure_models_loaded(hass: HomeAssistant) -> Dict[str, Dict]:
     
     # Need to load models
     models_file = Path(__file__).parent / "models.json"
-    
-    def _load_json():
-        try:
-            if not models_file.exists():
-                LOGGER.error("models.json file not found at: %s", models_file)
-                return {}
-            
-            content = models_file.read_text(encoding="utf-8")
-            models_array = json.loads(content)
-            
-            # Convert array to dictionary for internal use
-            # Each model gets a unique internal key: name or name_handle
-            models_dict = {}
-            for model in models_array:
-                model_name = model.get("name", "Unknown")
-                handle = model.get("handle")
-                
-                # Create unique internal key
-                if handle is not None:
-                    internal_key = f"{model_name}#{handle}"
-                else:
-                    internal_key = model_name
-                
-                # Store the model data with the internal key
-                models_dict[internal_key] = model.copy()
-                # Ensure 'name' field is preserved
-                models_dict[internal_key]["name"] = model_name
-                
-            LOGGER.debug("Loaded %d models from models.json array", len(models_dict))
-            return models_dict
-        except json.JSONDecodeError as e:
-            LOGGER.error("Error decoding models.json: %s", e)
-            return {}
-        except Exception as e:
-            LOGGER.error("Error loading models.json from %s: %s", models_file, e)
-            return {}
-    
-    hass.data[MODELS_DATA_KEY] = await hass.async_add_executor_job(_load_json)
-    return hass.data[MODELS_DATA_KEY]
+    models = await hass.async_add_executor_job(load_models, models_file)
+    hass.data[MODELS_INDEX_DATA_KEY] = ModelIndex(models)
+    hass.data[MODELS_DATA_KEY] = models
+    return models
 
 def get_models_data(hass: HomeAssistant) -> Dict[str, Dict]:
     """Get models data from hass.data (loaded asynchronously in __init__.py)."""
@@ -73,8 +370,10 @@ class Model:
         """Initialize Model with optional hass instance for data access."""
         self._hass = hass
         self._models: Dict[str, Dict] = {}
+        self._index: Optional[ModelIndex] = None
         if hass is not None:
             self._models = get_models_data(hass)
+            self._index = hass.data.get(MODELS_INDEX_DATA_KEY)
     
     def get_models(self) -> List[str]:
         """Get list of all supported model names (without internal keys)"""
@@ -146,39 +445,21 @@ class Model:
         # Value is already the internal_key from the form
         return value
     
+    def _get_index(self) -> ModelIndex:
+        if self._index is None:
+            self._index = ModelIndex(self._models)
+        return self._index
+    
     def detect_model(self, device_name: str) -> Optional[str]:
         """Detect model from device name.
         
+        The longest matching model name wins; when several models share it,
+        the one without handle (generic version) is preferred.
+        
         Returns:
             Internal key of the detected model
         """
-        device_name_lower = device_name.lower()
-        
-        # Collect all matching models by device name
-        matching_models = []
-        for internal_key, model_data in self._models.items():
-            model_name = model_data.get("name", internal_key.split("#")[0])
-            if device_name_lower.startswith(model_name.lower()):
-                matching_models.append((internal_key, model_data))
-        
-        if not matching_models:
-            return None
-        
-        # Sort by model name length (longest first) for most specific match
-        matching_models.sort(key=lambda x: len(x[1].get("name", "")), reverse=True)
-        
-        # If only one match, return it
-        if len(matching_models) == 1:
-            return matching_models[0][0]
-        
-        # Multiple matches: prefer the one without handle (generic version)
-        for internal_key, model_data in matching_models:
-            if model_data.get("handle") is None:
-                LOGGER.debug("Model detected by name (generic): %s", internal_key)
-                return internal_key
-        
-        # All have handles, return first (most specific)
-        return matching_models[0][0]
+        return self._get_index().lookup(device_name).generic
     
     def detect_model_by_handle(self, device_name: str, char_handle: int) -> Optional[str]:
         """Detect model from device name and characteristic handle.
@@ -189,152 +470,71 @@ class Model:
         Returns:
             Internal key of the detected model
         """
-        device_name_lower = device_name.lower()
-        
-        # Collect all matching models by name
-        matching_models = []
-        for internal_key, model_data in self._models.items():
-            model_name = model_data.get("name", internal_key.split("#")[0])
-            if device_name_lower.startswith(model_name.lower()):
-                matching_models.append((internal_key, model_data))
-        
-        if not matching_models:
-            return None
-        
-        # If only one match, return it
-        if len(matching_models) == 1:
-            return matching_models[0][0]
-        
-        # Multiple matches: prefer the one with matching handle
-        for internal_key, model_data in matching_models:
-            model_handle = model_data.get("handle")
-            if model_handle is not None and char_handle == model_handle:
-                LOGGER.debug("Model detected by handle: %s (handle: 0x%04x)", internal_key, char_handle)
-                return internal_key
-        
-        # No handle match: return the one without handle (generic version)
-        for internal_key, model_data in matching_models:
-            if model_data.get("handle") is None:
-                LOGGER.debug("Model detected by name (no handle match): %s", internal_key)
-                return internal_key
-        
-        # Fallback: return first match
-        return matching_models[0][0]
-        
-        # No handle match: return the one without handle (generic version)
-        for model_name, model_data in matching_models:
-            if model_data.get("handle") is None:
-                LOGGER.debug("Model detected by name (no handle match): %s", model_name)
-                return model_name
-        
-        # Fallback: return first match
-        return matching_models[0][0]
+        detection = self._get_index().lookup(device_name)
+        detected = detection.by_handle.get(char_handle)
+        if detected is not None:
+            LOGGER.debug("Model detected by handle: %s (handle: 0x%04x)", detected, char_handle)
+            return detected
+        return detection.handle_fallback
+    
+    def has_model(self, internal_key: str) -> bool:
+        """Check whether an internal key is a known model"""
+        return internal_key in self._models
+    
+    def get_spec(self, internal_key: str) -> ModelSpec:
+        """Get resolved spec for model by internal key (empty spec if unknown)"""
+        model = self._models.get(internal_key)
+        if model is not None:
+            return model[MODEL_SPEC_KEY]
+        return build_model_spec(internal_key or "", {})
     
     def get_handle(self, internal_key: str) -> Optional[int]:
         """Get handle for model by internal key"""
-        if internal_key in self._models:
-            return self._models[internal_key].get("handle")
-        return None
+        return self.get_spec(internal_key).handle
     
     def get_write_uuid(self, internal_key: str) -> Optional[str]:
         """Get write characteristic UUID for model by internal key"""
-        if internal_key in self._models:
-            return self._models[internal_key].get("write_uuid")
-        return None
+        return self.get_spec(internal_key).write_uuid
     
     def get_read_uuid(self, internal_key: str) -> Optional[str]:
         """Get read characteristic UUID for model by internal key"""
-        if internal_key in self._models:
-            return self._models[internal_key].get("read_uuid")
-        return None
+        return self.get_spec(internal_key).read_uuid
     
-    def get_turn_on_cmd(self, internal_key: str) -> Optional[List[int]]:
+    def get_turn_on_cmd(self, internal_key: str) -> Optional[bytes]:
         """Get turn on command for model by internal key"""
-        if internal_key in self._models:
-            return self._models[internal_key].get("commands", {}).get("turn_on")
-        return None
+        return self.get_spec(internal_key).turn_on_cmd
     
-    def get_turn_off_cmd(self, internal_key: str) -> Optional[List[int]]:
+    def get_turn_off_cmd(self, internal_key: str) -> Optional[bytes]:
         """Get turn off command for model by internal key"""
-        if internal_key in self._models:
-            return self._models[internal_key].get("commands", {}).get("turn_off")
-        return None
+        return self.get_spec(internal_key).turn_off_cmd
     
-    def get_white_cmd(self, internal_key: str, intensity: int) -> Optional[List[int]]:
+    def get_white_cmd(self, internal_key: str, intensity: int) -> Optional[bytes]:
         """Get white command for model with intensity by internal key"""
-        if internal_key in self._models:
-            cmd = self._models[internal_key].get("commands", {}).get("white", []).copy()
-            # Replace 'i' placeholder with intensity value
-            cmd = [int(intensity * 100 / 255) if x == "i" else x for x in cmd]
-            return cmd
-        return None
-    
-    def get_effect_speed_cmd(self, internal_key: str, value: int) -> Optional[List[int]]:
+        return self.get_spec(internal_key).white_cmd(intensity)
+    
+    def get_effect_speed_cmd(self, internal_key: str, value: int) -> Optional[bytes]:
         """Get effect speed command for model by internal key"""
-        if internal_key in self._models:
-            cmd = self._models[internal_key].get("commands", {}).get("effect_speed", []).copy()
-            # Replace 'v' placeholder with value
-            cmd = [int(value) if x == "v" else x for x in cmd]
-            return cmd
-        return None
-    
-    def get_effect_cmd(self, internal_key: str, value: int) -> Optional[List[int]]:
+        return self.get_spec(internal_key).effect_speed_cmd(value)
+    
+    def get_effect_cmd(self, internal_key: str, value: int) -> Optional[bytes]:
         """Get effect command for model by internal key"""
-        if internal_key in self._models:
-            cmd = self._models[internal_key].get("commands", {}).get("effect", []).copy()
-            # Replace 'v' placeholder with value
-            cmd = [int(value) if x == "v" else x for x in cmd]
-            return cmd
-        return None
-    
-    def get_color_temp_cmd(self, internal_key: str, warm: int, cold: int) -> Optional[List[int]]:
+        return self.get_spec(internal_key).effect_cmd(value)
+    
+    def get_color_temp_cmd(self, internal_key: str, warm: int, cold: int) -> Optional[bytes]:
         """Get color temperature command for model by internal key"""
-        if internal_key in self._models:
-            cmd = self._models[internal_key].get("commands", {}).get("color_temp", []).copy()
-            # Replace 'w' and 'c' placeholders with warm and cold values
-            result = []
-            for x in cmd:
-                if x == "w":
-                    result.append(int(warm))
-                elif x == "c":
-                    result.append(int(cold))
-                else:
-                    result.append(x)
-            return result
-        return None
-    
-    def get_color_cmd(self, internal_key: str, r: int, g: int, b: int) -> Optional[List[int]]:
+        return self.get_spec(internal_key).color_temp_cmd(warm, cold)
+    
+    def get_color_cmd(self, internal_key: str, r: int, g: int, b: int) -> Optional[bytes]:
         """Get color command for model by internal key"""
-        if internal_key in self._models:
-            cmd = self._models[internal_key].get("commands", {}).get("color", []).copy()
-            # Replace 'r', 'g', 'b' placeholders with RGB values
-            result = []
-            for x in cmd:
-                if x == "r":
-                    result.append(r)
-                elif x == "g":
-                    result.append(g)
-                elif x == "b":
-                    result.append(b)
-                else:
-                    result.append(x)
-            return result
-        return None
-    
-    def get_brightness_cmd(self, internal_key: str, intensity: int) -> Optional[List[int]]:
+        return self.get_spec(internal_key).color_cmd(r, g, b)
+    
+    def get_brightness_cmd(self, internal_key: str, intensity: int) -> Optional[bytes]:
         """Get brightness command for model by internal key"""
-        if internal_key in self._models:
-            cmd = self._models[internal_key].get("commands", {}).get("brightness", []).copy()
-            # Replace 'i' placeholder with intensity value
-            cmd = [int(intensity * 100 / 255) if x == "i" else x for x in cmd]
-            return cmd
-        return None
-    
-    def get_query_cmd(self, internal_key: str) -> Optional[List[int]]:
+        return self.get_spec(internal_key).brightness_cmd(intensity)
+    
+    def get_query_cmd(self, internal_key: str) -> Optional[bytes]:
         """Get query command for model by internal key"""
-        if internal_key in self._models:
-            return self._models[internal_key].get("commands", {}).get("query")
-        return None
+        return self.get_spec(internal_key).query_cmd
     
     def get_sync_time_cmd(self, internal_key: str, hour: int, minute: int, second: int, day_of_week: int) -> List[int]:
         """Get sync time command (same for all models)"""
@@ -346,77 +546,40 @@ class Model:
     
     def get_min_color_temp_kelvin(self, internal_key: str) -> int:
         """Get minimum color temperature in Kelvin for model by internal key"""
-        if internal_key in self._models:
-            return self._models[internal_key].get("color_temp_range", {}).get("min_kelvin", 1800)
-        return 1800
+        return self.get_spec(internal_key).min_color_temp_kelvin
     
     def get_max_color_temp_kelvin(self, internal_key: str) -> int:
         """Get maximum color temperature in Kelvin for model by internal key"""
-        if internal_key in self._models:
-            return self._models[internal_key].get("color_temp_range", {}).get("max_kelvin", 7000)
-        return 7000
+        return self.get_spec(internal_key).max_color_temp_kelvin
     
     def get_effects_class(self, internal_key: str) -> str:
         """Get effects class name for model by internal key"""
-        if internal_key in self._models:
-            return self._models[internal_key].get("effects_class", "EFFECTS")
-        return "EFFECTS"
+        return self.get_spec(internal_key).effects_class
     
     def get_effects_list(self, internal_key: str) -> str:
         """Get effects list name for model by internal key"""
-        if internal_key in self._models:
-            return self._models[internal_key].get("effects_list", "EFFECTS_list")
-        return "EFFECTS_list"    
+        return self.get_spec(internal_key).effects_list
+    
     def get_effect_value(self, effects_class_name: str, effect_name: str) -> Optional[int]:
         """Get effect value from effects definitions"""
-        definitions = self._load_definitions()
-        effects_defs = definitions.get("effects_definitions", {})
-        effects_class = effects_defs.get(effects_class_name, {})
-        return effects_class.get(effect_name)
+        return get_definitions(self._hass).get_value(effects_class_name, effect_name)
+    
+    def get_effect_name(self, effects_class_name: str, value: int) -> Optional[str]:
+        """Get effect name from its value in effects definitions"""
+        return get_definitions(self._hass).get_name(effects_class_name, value)
     
     def get_effects_enum(self, effects_class_name: str) -> Optional[type]:
-        """Get or create an Enum class for the specified effects class"""
-        # Check cache first
-        if effects_class_name in _EFFECTS_CACHE:
-            return _EFFECTS_CACHE[effects_class_name]
-        
-        definitions = self._load_definitions()
-        effects_defs = definitions.get("effects_definitions", {})
-        if effects_class_name not in effects_defs:
-            return None
-        
-        # Create enum dynamically
-        effects_dict = effects_defs[effects_class_name]
-        effects_enum = Enum(effects_class_name, effects_dict)
-        
-        # Cache it
-        _EFFECTS_CACHE[effects_class_name] = effects_enum
-        return effects_enum
+        """Get the Enum class for the specified effects class"""
+        return get_definitions(self._hass).get_enum(effects_class_name)
     
     def get_effects_list_values(self, effects_list_name: str) -> List[str]:
         """Get list of effect names for a specific effects list"""
-        definitions = self._load_definitions()
-        effects_lists = definitions.get("effects_lists", {})
-        return effects_lists.get(effects_list_name, [])
+        return get_definitions(self._hass).get_list(effects_list_name)
     
     def get_all_effects_definitions(self) -> Dict[str, Dict[str, int]]:
         """Get all effects definitions"""
-        definitions = self._load_definitions()
-        return definitions.get("effects_definitions", {})
+        return get_definitions(self._hass).definitions
     
     def get_all_effects_lists(self) -> Dict[str, List[str]]:
         """Get all effects lists"""
-        definitions = self._load_definitions()
-        return definitions.get("effects_lists", {})
-    
-    def _load_definitions(self) -> Dict:
-        """Load definitions from definitions.json"""
-        definitions_file = Path(__file__).parent / "definitions.json"
-        try:
-            if not definitions_file.exists():
-                return {}
-            content = definitions_file.read_text(encoding="utf-8")
-            return json.loads(content)
-        except Exception as e:
-            LOGGER.error("Error loading definitions.json: %s", e)
-            return {}
\ No newline at end of file
+        return get_definitions(self._hass).lists
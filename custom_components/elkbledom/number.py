@@ -7,12 +7,14 @@ from homeassistant.components.number import (
 
 from .elkbledom import BLEDOMInstance
 from .const import DOMAIN
+from .state_delta import StateDelta, signal_state_delta
 
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers import device_registry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.config_entries import ConfigEntry
 
 
@@ -27,7 +29,7 @@ async def async_setup_entry(
 ) -> None:
     instance = hass.data[DOMAIN][config_entry.entry_id]
     entities = [BLEDOMMicSensitivity(instance, "Mic Sensitivity " + config_entry.data["name"], config_entry.entry_id)]
-    if instance.model.get_effect_speed_cmd(instance.model_name, 128):
+    if instance.spec.has_speed:
         entities.append(BLEDOMEffectSpeed(instance, "Effect Speed " + config_entry.data["name"], config_entry.entry_id))
     async_add_entities(entities)
 
@@ -99,6 +101,16 @@ class BLEDOMEffectSpeed(RestoreEntity, NumberEntity):
             except (ValueError, TypeError):
                 LOG.debug(f"Could not restore effect speed for {self.name}, using default")
 
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, signal_state_delta(self._instance.address), self._handle_state_delta))
+
+    @callback
+    def _handle_state_delta(self, delta: StateDelta) -> None:
+        """Write the state when the device reports a new effect speed."""
+        if delta.effect_speed is not None:
+            self._effect_speed = delta.effect_speed
+            self.async_write_ha_state()
+
 class BLEDOMMicSensitivity(RestoreEntity, NumberEntity):
     """Microphone Sensitivity entity"""
 
@@ -167,3 +179,13 @@ class BLEDOMMicSensitivity(RestoreEntity, NumberEntity):
                 LOG.debug(f"Could not restore mic sensitivity for {self.name}, using default (50)")
         else:
             LOG.debug(f"No previous state found for {self.name}")
+
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, signal_state_delta(self._instance.address), self._handle_state_delta))
+
+    @callback
+    def _handle_state_delta(self, delta: StateDelta) -> None:
+        """Write the state when the device reports a new mic sensitivity."""
+        if delta.mic_sensitivity is not None and delta.mic_sensitivity != self._mic_sensitivity:
+            self._mic_sensitivity = delta.mic_sensitivity
+            self.async_write_ha_state()
@@ -0,0 +1,154 @@
+"""Command-sequence planner for LED strips"""
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from .command_queue import (
+    KIND_BRIGHTNESS,
+    KIND_COLOR,
+    KIND_COLOR_TEMP,
+    KIND_EFFECT,
+    KIND_EFFECT_SPEED,
+    KIND_POWER,
+    KIND_WHITE,
+)
+from .model import ModelSpec
+
+# What the strip should display
+MODE_RGB = "rgb"
+MODE_COLOR_TEMP = "color_temp"
+MODE_WHITE = "white"
+MODE_EFFECT = "effect"
+
+# RGB mixed for color temperature on models without a native color_temp command
+WARM_RGB = (255, 138, 18)   # Warm white ~1800K
+COOL_RGB = (180, 220, 255)  # Cool white ~7000K
+
+Frame = Tuple[str, bytes]
+
+
+@dataclass(slots=True)
+class TargetState:
+    """Full state requested for a device, None fields are left unchanged."""
+
+    power: Optional[bool] = None
+    mode: Optional[str] = None
+    # Base color, before brightness scaling
+    rgb: Optional[Tuple[int, int, int]] = None
+    color_temp_kelvin: Optional[int] = None
+    white: Optional[int] = None
+    # 0-255, applies to the RGB and color temperature modes
+    brightness: Optional[int] = None
+    effect: Optional[int] = None
+    effect_speed: Optional[int] = None
+
+
+def scale_rgb(rgb: Tuple[int, int, int], brightness: int) -> Tuple[int, int, int]:
+    scale = brightness / 255.0
+    return int(rgb[0] * scale), int(rgb[1] * scale), int(rgb[2] * scale)
+
+
+def color_temp_rgb(spec: ModelSpec, kelvin: int) -> Tuple[int, int, int]:
+    """RGB emulation of a color temperature."""
+    t = color_temp_position(spec, kelvin)
+    return tuple(int(w + (c - w) * t) for w, c in zip(WARM_RGB, COOL_RGB))
+
+
+def color_temp_position(spec: ModelSpec, kelvin: int) -> float:
+    """0 = warmest (min kelvin), 1 = coolest (max kelvin)."""
+    min_temp = spec.min_color_temp_kelvin
+    max_temp = spec.max_color_temp_kelvin
+    kelvin = max(min_temp, min(kelvin, max_temp))
+    return (kelvin - min_temp) / (max_temp - min_temp) if max_temp > min_temp else 1.0
+
+
+class CommandPlanner:
+    """Turns a target state into the shortest frame sequence a model supports.
+
+    is_current(kind, frame) tells whether the device already shows a frame,
+    such frames are left out of the plan and their kinds listed in skipped.
+    """
+
+    def __init__(self, spec: ModelSpec, is_current: Callable[[str, bytes], bool], brightness_mode: str = "auto") -> None:
+        self._spec = spec
+        self._is_current = is_current
+        self._brightness_mode = brightness_mode
+        # Whether the last planned color frame carries the brightness
+        self.prescaled = False
+        # Kinds of the last plan left out because the device already shows them
+        self.skipped: List[str] = []
+
+    def _keep(self, frames: List[Tuple[str, Optional[bytes]]]) -> List[Frame]:
+        """Drop missing commands and frames the device already shows."""
+        kept = []
+        for kind, frame in frames:
+            if not frame:
+                continue
+            if self._is_current(kind, frame):
+                self.skipped.append(kind)
+            else:
+                kept.append((kind, frame))
+        return kept
+
+    def plan(self, target: TargetState) -> List[Frame]:
+        spec = self._spec
+        self.skipped = []
+        if target.power is False:
+            return self._keep([(KIND_POWER, spec.turn_off_cmd)])
+        frames: List[Frame] = []
+        if target.power:
+            frames += self._keep([(KIND_POWER, spec.turn_on_cmd)])
+        if target.mode == MODE_RGB:
+            frames += self._plan_rgb(target.rgb, target.brightness)
+        elif target.mode == MODE_COLOR_TEMP:
+            frames += self._plan_color_temp(target.color_temp_kelvin, target.brightness)
+        elif target.mode == MODE_WHITE:
+            frames += self._plan_white(target.white)
+        elif target.mode == MODE_EFFECT:
+            frames += self._keep([(KIND_EFFECT, spec.effect_cmd(target.effect))])
+        if target.effect_speed is not None:
+            frames += self._keep([(KIND_EFFECT_SPEED, spec.effect_speed_cmd(target.effect_speed))])
+        return frames
+
+    def _plan_rgb(self, rgb: Tuple[int, int, int], brightness: int) -> List[Frame]:
+        spec = self._spec
+        prescaled = [(KIND_COLOR, spec.color_cmd(*scale_rgb(rgb, brightness)))]
+        if not spec.has_brightness or self._brightness_mode == "rgb":
+            self.prescaled = True
+            return self._keep(prescaled)
+        mark = len(self.skipped)
+        native = self._keep([
+            (KIND_COLOR, spec.color_cmd(*rgb)),
+            (KIND_BRIGHTNESS, spec.brightness_cmd(brightness)),
+        ])
+        if self._brightness_mode == "native":
+            return native
+        native_skipped = self.skipped[mark:]
+        del self.skipped[mark:]
+        # Prescaling is exact only with the native brightness at 100%
+        prescaled = self._keep(prescaled + [(KIND_BRIGHTNESS, spec.brightness_cmd(255))])
+        self.prescaled = len(prescaled) < len(native)
+        if self.prescaled:
+            return prescaled
+        self.skipped[mark:] = native_skipped
+        return native
+
+    def _plan_color_temp(self, kelvin: int, brightness: int) -> List[Frame]:
+        spec = self._spec
+        if not spec.has_ct:
+            return self._plan_rgb_emulated(color_temp_rgb(spec, kelvin), brightness)
+        t = color_temp_position(spec, kelvin)
+        # warm=100/cold=0 at min kelvin (warmest), warm=0/cold=100 at max kelvin (coolest)
+        return self._keep([
+            (KIND_COLOR_TEMP, spec.color_temp_cmd(int((1.0 - t) * 100), int(t * 100))),
+            # Brightness via white channel if model supports it
+            (KIND_WHITE, spec.white_cmd(brightness)),
+        ])
+
+    def _plan_rgb_emulated(self, rgb: Tuple[int, int, int], brightness: int) -> List[Frame]:
+        self.prescaled = True
+        return self._keep([(KIND_COLOR, self._spec.color_cmd(*scale_rgb(rgb, brightness)))])
+
+    def _plan_white(self, intensity: int) -> List[Frame]:
+        if self._spec.has_white:
+            return self._keep([(KIND_WHITE, self._spec.white_cmd(intensity))])
+        return self._plan_rgb_emulated((255, 255, 255), intensity)
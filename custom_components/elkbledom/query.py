@@ -0,0 +1,113 @@
+"""Request/response correlation for state queries"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Dict
+
+LOGGER = logging.getLogger(__name__)
+
+# Offset of the opcode in response frames
+RESPONSE_OPCODE_OFFSET = 2
+# Smoothing factor for the average round-trip time (exponential moving average)
+RTT_SMOOTHING = 0.2
+
+
+class PendingQueries:
+    """Table of in-flight queries keyed by the opcode of their response.
+
+    A query registers a future for its response opcode before the request is
+    written, and the notification handler resolves it with the first frame
+    carrying that opcode. Callers asking while a query with the same opcode is
+    in flight share its response instead of writing the request again.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._pending: Dict[int, asyncio.Future] = {}
+        self.sent = 0
+        self.shared = 0
+        self.answered = 0
+        self.timeouts = 0
+        self._rtt_avg = 0.0
+        self._rtt_max = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def request(self, opcode: int, send: Callable[[], Awaitable[Any]], timeout: float) -> bytes:
+        """Send a query and wait for its response, or share the one in flight.
+
+        Raises asyncio.TimeoutError if no response arrives within timeout
+        after the request was written.
+        """
+        future = self._pending.get(opcode)
+        if future is not None and not future.done():
+            self.shared += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[opcode] = future
+        try:
+            await send()
+            self.sent += 1
+            sent_at = time.monotonic()
+            try:
+                response = await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                LOGGER.debug("%s: No response with opcode 0x%02x within %.1fs", self._name, opcode, timeout)
+                self._fail(future, asyncio.TimeoutError(f"No response to query 0x{opcode:02x}"))
+                raise
+            self._record(time.monotonic() - sent_at)
+            return response
+        except BaseException as err:
+            # Sharing callers get the same failure, or an abort if this caller was cancelled
+            self._fail(future, err if isinstance(err, Exception) else ConnectionAbortedError("Query abandoned"))
+            raise
+        finally:
+            if self._pending.get(opcode) is future:
+                del self._pending[opcode]
+
+    def resolve(self, data: bytes) -> bool:
+        """Complete the query waiting for this response frame, returns whether one was waiting."""
+        if len(data) <= RESPONSE_OPCODE_OFFSET:
+            return False
+        future = self._pending.get(data[RESPONSE_OPCODE_OFFSET])
+        if future is None or future.done():
+            return False
+        future.set_result(bytes(data))
+        self.answered += 1
+        return True
+
+    def cancel_all(self) -> None:
+        """Fail all in-flight queries, e.g. when the connection is lost."""
+        for future in self._pending.values():
+            self._fail(future, ConnectionAbortedError("Disconnected while waiting for a response"))
+        self._pending.clear()
+
+    @staticmethod
+    def _fail(future: asyncio.Future, err: Exception) -> None:
+        if not future.done():
+            future.set_exception(err)
+            # Retrieved here so it is not logged when no caller shares the query
+            future.exception()
+
+    def _record(self, rtt: float) -> None:
+        self._rtt_avg += (rtt - self._rtt_avg) * RTT_SMOOTHING
+        self._rtt_max = max(self._rtt_max, rtt)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "shared": self.shared,
+            "answered": self.answered,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "rtt_ms": round(self._rtt_avg * 1000, 1),
+            "max_rtt_ms": round(self._rtt_max * 1000, 1),
+        }
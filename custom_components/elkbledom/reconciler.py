@@ -0,0 +1,193 @@
+"""Background reconciliation of the device state with the state written to it"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Dict, List, Optional
+
+from .command_queue import KIND_BRIGHTNESS, KIND_COLOR, KIND_POWER
+from .state_delta import StateDelta
+
+LOGGER = logging.getLogger(__name__)
+
+# Delay between the last write and the check that it arrived (seconds)
+SETTLE_DELAY = 5.0
+# Interval between checks after the first one, doubled after each check finding nothing to do (seconds)
+MIN_RECONCILE_INTERVAL = 60.0
+MAX_RECONCILE_INTERVAL = 3600.0
+# Differences found this long after the last write are changes made outside
+# Home Assistant (e.g. an IR remote), the device state is accepted (seconds)
+REPAIR_WINDOW = 300.0
+# Command kinds setting each reconciled field, in the order repairs are written
+FIELD_KINDS = {
+    "is_on": KIND_POWER,
+    "rgb_color": KIND_COLOR,
+    "brightness": KIND_BRIGHTNESS,
+}
+# Largest difference still counted as equal, for fields reported at a coarser resolution
+FIELD_TOLERANCE = {"brightness": 3}
+
+
+def diff_state(intended: StateDelta, reported: StateDelta) -> List[str]:
+    """Names of the fields known on both sides whose values disagree."""
+    fields = []
+    for name in intended.changed:
+        want = getattr(intended, name)
+        have = getattr(reported, name)
+        if have is None or have == want:
+            continue
+        tolerance = FIELD_TOLERANCE.get(name)
+        if tolerance is not None and abs(have - want) <= tolerance:
+            continue
+        fields.append(name)
+    return sorted(fields)
+
+
+class StateReconciler:
+    """Queries the device now and then and re-sends writes it did not apply.
+
+    Frames are written without response, so a frame lost on a weak link goes
+    unnoticed. A check runs shortly after writes and then at growing
+    intervals while nothing changes. Fields the device reports differently
+    than intended are repaired once; if the repair does not take, or the
+    difference shows up long after the last write, the device state is kept.
+
+    The owner provides the callables: `snapshot()` returns the intended
+    state, `query()` the state reported by the device (None if it cannot be
+    checked now), `repair(fields, intended)` re-sends the given fields and
+    `accept(fields)` forgets the intent for fields whose device state is kept.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        snapshot: Callable[[], StateDelta],
+        query: Callable[[], Awaitable[Optional[StateDelta]]],
+        repair: Callable[[List[str], StateDelta], Awaitable[bool]],
+        accept: Callable[[List[str]], None],
+    ) -> None:
+        self._name = name
+        self._snapshot = snapshot
+        self._query = query
+        self._repair = repair
+        self._accept = accept
+        self._interval = MIN_RECONCILE_INTERVAL
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_write = 0.0
+        # Fields repaired by the last check, the next one tells whether it took
+        self._verifying: List[str] = []
+        self._repairing = False
+        self.checks = 0
+        self.skipped = 0
+        self.in_sync = 0
+        self.repairs = 0
+        self.unrepaired = 0
+        self.external = 0
+        self.repaired_fields: Dict[str, int] = {}
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def note_write(self) -> None:
+        """Check the state shortly after the last of a series of writes."""
+        self._last_write = time.monotonic()
+        if not self._repairing:
+            # New intent, earlier repairs no longer matter
+            self._verifying = []
+            self._interval = MIN_RECONCILE_INTERVAL
+        self._schedule(SETTLE_DELAY)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._start_check)
+
+    def _start_check(self) -> None:
+        self._timer = None
+        if self._task is not None and not self._task.done():
+            self._schedule(SETTLE_DELAY)
+            return
+        self._task = asyncio.create_task(self._check())
+
+    async def _check(self) -> None:
+        started = time.monotonic()
+        try:
+            await self._reconcile()
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.debug("%s: State check failed: %s", self._name, err)
+            self.skipped += 1
+        if self._last_write >= started:
+            # Writes during the check, repairs included, already scheduled the next one
+            return
+        self._schedule(self._interval)
+        self._interval = min(self._interval * 2, MAX_RECONCILE_INTERVAL)
+
+    async def _reconcile(self) -> Optional[bool]:
+        """Run one check, returns whether fields were re-sent (None if the device could not be checked)."""
+        intended = self._snapshot()
+        if not intended:
+            self.skipped += 1
+            return None
+        reported = await self._query()
+        if reported is None:
+            self.skipped += 1
+            return None
+        self.checks += 1
+        fields = diff_state(intended, reported)
+        verifying, self._verifying = self._verifying, []
+        if not fields:
+            self.in_sync += 1
+            return False
+        if verifying and not set(fields).isdisjoint(verifying):
+            self.unrepaired += 1
+            LOGGER.debug("%s: Device still reports different %s after a repair, keeping its state", self._name, fields)
+            self._accept(fields)
+            return False
+        if time.monotonic() - self._last_write > REPAIR_WINDOW:
+            self.external += 1
+            LOGGER.debug("%s: Device state changed outside Home Assistant: %s", self._name, fields)
+            self._accept(fields)
+            return False
+        LOGGER.debug("%s: Device did not apply %s, re-sending", self._name, fields)
+        self._repairing = True
+        try:
+            if not await self._repair(fields, intended):
+                # Replaced by newer commands before it was written
+                return None
+        finally:
+            self._repairing = False
+        self.repairs += 1
+        for name in fields:
+            self.repaired_fields[name] = self.repaired_fields.get(name, 0) + 1
+        self._verifying = fields
+        return True
+
+    async def stop(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "checks": self.checks,
+            "skipped": self.skipped,
+            "in_sync": self.in_sync,
+            "repairs": self.repairs,
+            "repair_rate": round(self.repairs / self.checks, 3) if self.checks else 0.0,
+            "unrepaired": self.unrepaired,
+            "external": self.external,
+            "repaired_fields": dict(self.repaired_fields),
+            "interval": self._interval,
+        }
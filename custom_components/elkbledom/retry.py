@@ -0,0 +1,118 @@
+"""Retry policy and circuit breaker for BLE operations"""
+from __future__ import annotations
+
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from homeassistant.exceptions import HomeAssistantError
+
+LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class DeviceUnavailableError(HomeAssistantError):
+    """Raised without touching the radio while the circuit breaker is open."""
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """How a failed BLE operation is retried.
+
+    Delays grow exponentially from base_delay up to max_delay, with a random
+    jitter fraction, and retrying stops once the budget (seconds since the
+    first attempt) would be exceeded.
+    """
+
+    attempts: int = 3
+    base_delay: float = 0.25
+    max_delay: float = 4.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+    budget: float = 15.0
+    # Failed operations in a row that open the circuit breaker
+    failure_threshold: int = 2
+    # Time the breaker stays open before a trial, doubled on each failed trial
+    open_timeout: float = 15.0
+    max_open_timeout: float = 300.0
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number attempt + 1."""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** attempt)
+        return delay * (1 - self.jitter * random.random())
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker that fails fast while a device is unreachable."""
+
+    def __init__(self, name: str, policy: RetryPolicy) -> None:
+        self._name = name
+        self._policy = policy
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._open_timeout = policy.open_timeout
+        self._next_trial = 0.0
+
+    @property
+    def retry_at(self) -> Optional[float]:
+        """Monotonic time of the next allowed trial while open."""
+        return self._next_trial if self.state == STATE_OPEN else None
+
+    def allow(self) -> bool:
+        """Whether an operation may touch the radio; the first caller after the timeout gets the trial."""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN and time.monotonic() >= self._next_trial:
+            LOGGER.debug("%s: Circuit half-open, trying device", self._name)
+            self.state = STATE_HALF_OPEN
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        if self.state != STATE_CLOSED:
+            LOGGER.info("%s: Device reachable again, circuit closed", self._name)
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._open_timeout = self._policy.open_timeout
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN:
+            # Failed trial, stay open longer
+            self._open_timeout = min(self._open_timeout * 2, self._policy.max_open_timeout)
+            self._open()
+        elif self.state == STATE_CLOSED and self.failures >= self._policy.failure_threshold:
+            LOGGER.warning("%s: Device unreachable after %d failed operations, failing fast for %.0fs",
+                           self._name, self.failures, self._open_timeout)
+            self.opened += 1
+            self._open()
+
+    def reopen(self) -> None:
+        """End a half-open trial that neither succeeded nor failed, the next trial waits the same timeout."""
+        if self.state == STATE_HALF_OPEN:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = STATE_OPEN
+        self._next_trial = time.monotonic() + self._open_timeout
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "open_timeout": self._open_timeout,
+        }
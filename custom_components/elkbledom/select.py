@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from homeassistant.components.select import SelectEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import DeviceInfo
@@ -10,6 +11,7 @@ from homeassistant.helpers import device_registry
 
 from .elkbledom import BLEDOMInstance
 from .const import DOMAIN, MIC_EFFECTS, MIC_EFFECTS_list, BRIGHTNESS_MODES, CONF_BRIGHTNESS_MODE
+from .state_delta import StateDelta, signal_state_delta
 
 import logging
 
@@ -88,6 +90,19 @@ class BLEDOMMicEffect(RestoreEntity, SelectEntity):
             else:
                 LOG.debug(f"Could not restore mic effect for {self.name}, using default")
 
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, signal_state_delta(self._instance.address), self._handle_state_delta))
+
+    @callback
+    def _handle_state_delta(self, delta: StateDelta) -> None:
+        """Write the state when the device reports a new mic effect."""
+        if delta.mic_effect is None:
+            return
+        option = next((name for name in MIC_EFFECTS_list if MIC_EFFECTS[name].value == delta.mic_effect), None)
+        if option is not None and option != self._current_option:
+            self._current_option = option
+            self.async_write_ha_state()
+
 
 class BLEDOMBrightnessModeSelect(RestoreEntity, SelectEntity):
     """Brightness Mode selector entity"""
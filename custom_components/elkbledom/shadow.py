@@ -0,0 +1,82 @@
+"""Device-state shadow for LED strips"""
+import logging
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+from .command_queue import (
+    COMMAND_KINDS,
+    KIND_COLOR,
+    KIND_COLOR_TEMP,
+    KIND_EFFECT,
+    KIND_WHITE,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+# Kinds that select what the strip displays, writing one replaces the others
+_COLOR_MODES: Dict[str, FrozenSet[str]] = {
+    KIND_COLOR: frozenset((KIND_COLOR_TEMP, KIND_WHITE, KIND_EFFECT)),
+    # Native CT is sent together with its white level, both describe the same mode
+    KIND_COLOR_TEMP: frozenset((KIND_COLOR, KIND_EFFECT)),
+    KIND_WHITE: frozenset((KIND_COLOR, KIND_EFFECT)),
+    KIND_EFFECT: frozenset((KIND_COLOR, KIND_COLOR_TEMP, KIND_WHITE)),
+}
+COLOR_MODE_KINDS = frozenset(_COLOR_MODES)
+
+
+def superseded_kinds(kind: str) -> FrozenSet[str]:
+    """Kinds whose device state is replaced when a frame of kind is written."""
+    return _COLOR_MODES.get(kind, frozenset())
+
+
+class DeviceShadow:
+    """Last frame confirmed by the device for each command kind.
+
+    Frames are compared as sent, so values are compared at the device
+    resolution (e.g. brightness as the 0-100 percentage in the frame).
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._frames: Dict[str, bytes] = {}
+        self.saved: Dict[str, int] = dict.fromkeys(COMMAND_KINDS, 0)
+
+    def frame(self, kind: str) -> Optional[bytes]:
+        """Last frame of kind written to the device, None if unknown."""
+        return self._frames.get(kind)
+
+    def matches(self, kind: str, frame: Any) -> bool:
+        """Check whether the device already shows this frame."""
+        return self._frames.get(kind) == bytes(frame)
+
+    def count_saved(self, kind: str) -> None:
+        self.saved[kind] = self.saved.get(kind, 0) + 1
+
+    def is_redundant(self, kind: str, frame: Any) -> bool:
+        """Check whether the device already shows this frame, counting it as saved if so."""
+        if not self.matches(kind, frame):
+            return False
+        self.count_saved(kind)
+        LOGGER.debug("%s: Skipping %s frame, device already in that state", self._name, kind)
+        return True
+
+    def confirm(self, kind: str, frame: Any) -> None:
+        """Record a frame written to the device."""
+        if kind not in self.saved:
+            # Not a state command (time sync, query)
+            return
+        self._frames[kind] = bytes(frame)
+        for other in superseded_kinds(kind):
+            self._frames.pop(other, None)
+
+    def invalidate(self, kinds: Iterable[str] = COMMAND_KINDS) -> None:
+        """Forget the confirmed state of some kinds (all by default)."""
+        for kind in kinds:
+            self._frames.pop(kind, None)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "saved": sum(self.saved.values()),
+            "saved_by_kind": {kind: count for kind, count in self.saved.items() if count},
+            "known": sorted(self._frames),
+        }
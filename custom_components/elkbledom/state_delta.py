@@ -0,0 +1,43 @@
+"""State changes reported by LED strips, pushed to their entities"""
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+from .const import DOMAIN
+
+
+@dataclass(slots=True)
+class StateDelta:
+    """Device state fields that changed, None fields did not change."""
+
+    is_on: Optional[bool] = None
+    rgb_color: Optional[Tuple[int, int, int]] = None
+    # 0-255
+    brightness: Optional[int] = None
+    color_temp_kelvin: Optional[int] = None
+    effect: Optional[int] = None
+    effect_speed: Optional[int] = None
+    mic_enabled: Optional[bool] = None
+    mic_effect: Optional[int] = None
+    mic_sensitivity: Optional[int] = None
+
+    @property
+    def changed(self) -> FrozenSet[str]:
+        return frozenset(item.name for item in fields(self) if getattr(self, item.name) is not None)
+
+    def touches(self, names: Iterable[str]) -> bool:
+        """Check whether any of the named fields changed."""
+        return any(getattr(self, name) is not None for name in names)
+
+    def __bool__(self) -> bool:
+        return self.touches(STATE_FIELDS)
+
+
+# Names of all state fields, in declaration order
+STATE_FIELDS = tuple(item.name for item in fields(StateDelta))
+
+
+def signal_state_delta(address: str) -> str:
+    """Dispatcher signal carrying the StateDelta of one device."""
+    return f"{DOMAIN}_state_delta_{address}"
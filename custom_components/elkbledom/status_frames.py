@@ -0,0 +1,131 @@
+"""Declarative status frame decoders for LED strips"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any, Dict, List, Optional, Tuple
+
+from .state_delta import STATE_FIELDS, StateDelta
+
+# Status layout used for models without a status_frames section: the answer
+# of ELK-BLEDOM style strips to the 0x7e 0x00 0x01 query
+DEFAULT_STATUS_FRAMES = [
+    {
+        "length": 9,
+        "magic": [[0, 0x7e], [2, 0x01], [8, 0xef]],
+        "fields": {
+            "is_on": {"offset": 3, "enum": {"35": True, "240": True, "1": True, "36": False, "0": False}},
+            "rgb_color": {"offset": [4, 5, 6], "ignore": [0xff, 0xff, 0xff]},
+            "brightness": {"offset": 7, "scale": [100, 255], "ignore": 0xff},
+        },
+    },
+]
+
+FieldReader = Callable[[memoryview], Any]
+
+
+def _compile_field(raw: Dict[str, Any]) -> Tuple[FieldReader, int]:
+    """Compile one field into a reader returning its value or None, and the last offset it reads."""
+    offset = raw["offset"]
+    enum = {int(key): value for key, value in raw["enum"].items()} if "enum" in raw else None
+    scale = raw.get("scale")
+    if scale is not None:
+        scale_from, scale_to = int(scale[0]), int(scale[1])
+        if scale_from <= 0:
+            raise ValueError(f"Invalid scale {scale}")
+    ignore = raw.get("ignore")
+
+    if isinstance(offset, list):
+        offsets = tuple(int(item) for item in offset)
+        if not offsets:
+            raise ValueError("Empty offset list")
+        ignored = tuple(ignore) if ignore is not None else None
+
+        def read_many(view: memoryview) -> Optional[Tuple[int, ...]]:
+            value = tuple(view[item] for item in offsets)
+            if value == ignored:
+                return None
+            if scale is not None:
+                return tuple(item * scale_to // scale_from for item in value)
+            return value
+
+        return read_many, max(offsets)
+
+    offset = int(offset)
+
+    if enum is not None:
+        def read_enum(view: memoryview) -> Any:
+            return enum.get(view[offset])
+
+        return read_enum, offset
+
+    def read_one(view: memoryview) -> Optional[int]:
+        value = view[offset]
+        if value == ignore:
+            return None
+        if scale is not None:
+            return value * scale_to // scale_from
+        return value
+
+    return read_one, offset
+
+
+class StatusFrame:
+    """Compiled status frame: recognizes one frame layout and decodes it into a StateDelta."""
+
+    __slots__ = ("length", "magic", "fields")
+
+    def __init__(self, length: int, magic: Tuple[Tuple[int, int], ...], fields: Tuple[Tuple[str, FieldReader], ...]) -> None:
+        # Minimum frame length
+        self.length = length
+        # (offset, byte) pairs every frame of this layout carries
+        self.magic = magic
+        self.fields = fields
+
+    @classmethod
+    def compile(cls, raw: Dict[str, Any]) -> "StatusFrame":
+        """Compile a models.json status_frames entry."""
+        magic = tuple((int(offset), int(value)) for offset, value in raw.get("magic", ()))
+        fields = []
+        last = max((offset for offset, _ in magic), default=-1)
+        for name, field in raw["fields"].items():
+            if name not in STATE_FIELDS:
+                raise ValueError(f"Unknown status field '{name}'")
+            reader, offset = _compile_field(field)
+            fields.append((name, reader))
+            last = max(last, offset)
+        length = int(raw.get("length", last + 1))
+        if length <= last:
+            raise ValueError(f"Length {length} too short for offset {last}")
+        return cls(length, magic, tuple(fields))
+
+    def decode(self, data: bytes) -> Optional[StateDelta]:
+        """Decode a notification, None if it does not have this layout."""
+        view = memoryview(data)
+        if len(view) < self.length:
+            return None
+        for offset, value in self.magic:
+            if view[offset] != value:
+                return None
+        delta = StateDelta()
+        for name, reader in self.fields:
+            value = reader(view)
+            if value is not None:
+                setattr(delta, name, value)
+        return delta
+
+
+def compile_status_frames(raw: List[Dict[str, Any]]) -> Tuple[StatusFrame, ...]:
+    """Compile a models.json status_frames list."""
+    return tuple(StatusFrame.compile(frame) for frame in raw)
+
+
+def decode_status(frames: Tuple[StatusFrame, ...], data: bytes) -> Optional[StateDelta]:
+    """Decode a notification with the first status frame layout it matches."""
+    for frame in frames:
+        delta = frame.decode(data)
+        if delta is not None:
+            return delta
+    return None
+
+
+DEFAULT_STATUS_DECODERS = compile_status_frames(DEFAULT_STATUS_FRAMES)
@@ -0,0 +1,127 @@
+"""Real-time color streaming for LED strips"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# Smoothing factor for the achieved frame rate and latency (exponential moving average)
+FPS_SMOOTHING = 0.1
+
+
+class StreamingSession:
+    """Pushes the newest color frame to a connected device as fast as the link allows.
+
+    Frames go to a single-slot mailbox: pushing while the previous frame is
+    still waiting replaces it, so the writer always sends the latest color.
+    Writes bypass the command queue, retries and logging, and use the pinned
+    write characteristic without response.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client: Any,
+        write_char: Any,
+        build_frame: Callable[[int, int, int], bytes],
+        max_fps: Optional[float] = None,
+    ) -> None:
+        self._name = name
+        self._client = client
+        self._write_char = write_char
+        self._build_frame = build_frame
+        self._min_interval = 1.0 / max_fps if max_fps else 0.0
+        # Newest color and when it was received
+        self._slot: Optional[Tuple[Tuple[int, int, int], float]] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._started = 0.0
+        self._fps = 0.0
+        self.last_color: Optional[Tuple[int, int, int]] = None
+        self.last_frame: Optional[bytes] = None
+        self.error: Optional[BaseException] = None
+        # Time from push (or received_at) to the end of the GATT write, seconds
+        self.latency = 0.0
+        self.max_latency = 0.0
+        self.pushed = 0
+        self.sent = 0
+        self.dropped = 0
+
+    @property
+    def active(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        self._started = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+
+    def push(self, r: int, g: int, b: int, received_at: Optional[float] = None) -> bool:
+        """Offer a color, returns False if the session has ended.
+
+        received_at is the monotonic time the color entered the host, used
+        to measure latency up to the GATT write.
+        """
+        if not self.active:
+            return False
+        if self._slot is not None:
+            self.dropped += 1
+        self._slot = ((r, g, b), received_at or time.monotonic())
+        self.pushed += 1
+        self._wakeup.set()
+        return True
+
+    async def _run(self) -> None:
+        last_write = 0.0
+        try:
+            while True:
+                await self._wakeup.wait()
+                if self._min_interval:
+                    wait = last_write + self._min_interval - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                self._wakeup.clear()
+                slot, self._slot = self._slot, None
+                if slot is None:
+                    continue
+                color, received_at = slot
+                frame = self._build_frame(*color)
+                await self._client.write_gatt_char(self._write_char, frame, False)
+                now = time.monotonic()
+                latency = now - received_at
+                self.latency += (latency - self.latency) * FPS_SMOOTHING
+                self.max_latency = max(self.max_latency, latency)
+                if last_write:
+                    self._fps += (1.0 / max(now - last_write, 1e-6) - self._fps) * FPS_SMOOTHING
+                last_write = now
+                self.sent += 1
+                self.last_color = color
+                self.last_frame = frame
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.warning("%s: Streaming stopped: %s", self._name, err)
+            self.error = err
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        return {
+            "active": self.active,
+            "pushed": self.pushed,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "fps": round(self._fps, 1),
+            "average_fps": round(self.sent / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": round(self.latency * 1000, 1),
+            "max_latency_ms": round(self.max_latency * 1000, 1),
+        }
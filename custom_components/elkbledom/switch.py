@@ -3,7 +3,8 @@ from __future__ import annotations
 from typing import Any
 
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import DeviceInfo
@@ -12,6 +13,7 @@ from homeassistant.helpers import device_registry
 
 from .elkbledom import BLEDOMInstance
 from .const import DOMAIN
+from .state_delta import StateDelta, signal_state_delta
 
 import logging
 
@@ -91,3 +93,13 @@ class BLEDOMMicSwitch(RestoreEntity, SwitchEntity):
                 LOG.debug(f"Restored mic state for {self.name}: OFF")
         else:
             LOG.debug(f"No previous mic state found for {self.name}, defaulting to OFF")
+
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, signal_state_delta(self._instance.address), self._handle_state_delta))
+
+    @callback
+    def _handle_state_delta(self, delta: StateDelta) -> None:
+        """Write the state when the device reports the mic being switched."""
+        if delta.mic_enabled is not None and delta.mic_enabled != self._is_on:
+            self._is_on = delta.mic_enabled
+            self.async_write_ha_state()
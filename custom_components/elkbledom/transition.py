@@ -0,0 +1,162 @@
+"""Host-side transitions for LED strips"""
+import asyncio
+import dataclasses
+import logging
+import math
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .command_queue import CommandQueue
+from .model import ModelSpec
+from .planner import (
+    MODE_COLOR_TEMP,
+    MODE_RGB,
+    MODE_WHITE,
+    CommandPlanner,
+    Frame,
+    TargetState,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+# Modes that can be interpolated
+TRANSITION_MODES = (MODE_RGB, MODE_COLOR_TEMP, MODE_WHITE)
+# Shortest time between two transition steps (seconds)
+MIN_STEP_INTERVAL = 0.05
+# Fraction of the measured link time reserved for other traffic
+THROUGHPUT_HEADROOM = 1.25
+
+Step = Tuple[float, List[Frame]]
+
+
+def _lerp(a: float, b: float, t: float) -> int:
+    return int(round(a + (b - a) * t))
+
+
+def interpolate(start: TargetState, end: TargetState, t: float) -> TargetState:
+    """State at position t (0-1) between two states of the same mode."""
+    state = dataclasses.replace(end, power=None, effect_speed=None)
+    if start.rgb is not None and end.rgb is not None:
+        state.rgb = tuple(_lerp(a, b, t) for a, b in zip(start.rgb, end.rgb))
+    if start.brightness is not None and end.brightness is not None:
+        state.brightness = max(1, _lerp(start.brightness, end.brightness, t))
+    if start.color_temp_kelvin is not None and end.color_temp_kelvin is not None:
+        state.color_temp_kelvin = _lerp(start.color_temp_kelvin, end.color_temp_kelvin, t)
+    if start.white is not None and end.white is not None:
+        state.white = max(1, _lerp(start.white, end.white, t))
+    return state
+
+
+def render_transition(
+    spec: ModelSpec,
+    start: TargetState,
+    end: TargetState,
+    steps: int,
+    duration: float,
+    is_current: Callable[[str, bytes], bool],
+    brightness_mode: str,
+) -> List[Step]:
+    """Render the frames of every step ahead of time.
+
+    Each step only carries the frames that changed since the previous one,
+    the final state itself is left to the caller.
+    """
+    rendered: Dict[str, bytes] = {}
+
+    def _is_current(kind: str, frame: bytes) -> bool:
+        if kind in rendered:
+            return rendered[kind] == frame
+        return is_current(kind, frame)
+
+    planner = CommandPlanner(spec, _is_current, brightness_mode)
+    result: List[Step] = []
+    for step in range(steps):
+        target = interpolate(start, end, step / steps)
+        if step == 0:
+            target.power = end.power
+        frames = planner.plan(target)
+        for kind, frame in frames:
+            rendered[kind] = frame
+        if frames:
+            result.append((duration * step / steps, frames))
+    return result
+
+
+class TransitionEngine:
+    """Plays rendered transitions through the command queue of one device.
+
+    The step rate fits the write time measured by the queue; steps that are
+    already late are dropped instead of delaying the rest of the transition,
+    their frames are merged into the next step sent.
+    """
+
+    def __init__(self, name: str, queue: CommandQueue) -> None:
+        self._name = name
+        self._queue = queue
+        self._task: Optional[asyncio.Task] = None
+        self.started = 0
+        self.cancelled = 0
+        self.steps_sent = 0
+        self.steps_dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def step_count(self, duration: float, frames_per_step: float) -> int:
+        """Number of steps the link can carry within duration."""
+        interval = max(MIN_STEP_INTERVAL, self._queue.interval * max(frames_per_step, 1.0) * THROUGHPUT_HEADROOM)
+        return max(1, math.floor(duration / interval))
+
+    def start(self, steps: List[Step], duration: float, finish: Callable[[], Awaitable[None]]) -> None:
+        """Play steps in background, then call finish to apply the final state."""
+        self.cancel()
+        self.started += 1
+        self._task = asyncio.create_task(self._play(steps, duration, finish))
+
+    def cancel(self) -> None:
+        if self.running:
+            self._task.cancel()
+            self.cancelled += 1
+        self._task = None
+
+    async def _play(self, steps: List[Step], duration: float, finish: Callable[[], Awaitable[None]]) -> None:
+        start = time.monotonic()
+        interval = duration / max(len(steps), 1)
+        # Frames of dropped steps by kind, steps only carry the kinds that changed
+        skipped: Dict[str, Frame] = {}
+        try:
+            for offset, frames in steps:
+                delay = start + offset - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                elif -delay > interval:
+                    # Link fell behind, skip to the step due now
+                    self.steps_dropped += 1
+                    for frame in frames:
+                        skipped[frame[0]] = frame
+                    continue
+                if skipped:
+                    for frame in frames:
+                        skipped[frame[0]] = frame
+                    frames, skipped = list(skipped.values()), {}
+                await self._queue.submit_many(frames)
+                self.steps_sent += 1
+            delay = start + duration - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await finish()
+        except asyncio.CancelledError:
+            LOGGER.debug("%s: Transition cancelled", self._name)
+            raise
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.warning("%s: Transition failed: %s", self._name, err)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "started": self.started,
+            "cancelled": self.cancelled,
+            "steps_sent": self.steps_sent,
+            "steps_dropped": self.steps_dropped,
+        }
@@ -0,0 +1,288 @@
+"""DDP and E1.31 (sACN) UDP receiver that streams colors to LED strips"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+import time
+from collections.abc import Coroutine
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+LOGGER = logging.getLogger(__name__)
+
+# UDP bridge data key in hass.data
+UDP_BRIDGE_DATA_KEY = "elkbledom_udp_bridge"
+
+DDP_PORT = 4048
+E131_PORT = 5568
+# DDP addresses a flat channel space, universes are mapped to blocks of this size
+UNIVERSE_SIZE = 512
+
+DDP_HEADER_SIZE = 10
+DDP_TIMECODE_SIZE = 4
+DDP_FLAG_TIMECODE = 0x10
+DDP_VERSION_MASK = 0xC0
+DDP_VERSION_1 = 0x40
+
+E131_IDENTIFIER = b"ASC-E1.17\x00\x00\x00"
+E131_UNIVERSE_OFFSET = 113
+E131_COUNT_OFFSET = 123
+E131_DATA_OFFSET = 126
+
+# Stop the stream of a strip that received no data for this long (seconds)
+STREAM_IDLE_TIMEOUT = 5.0
+# Wait before trying to stream to a strip again after it failed (seconds)
+STREAM_RETRY_DELAY = 10.0
+
+
+def e131_multicast_group(universe: int) -> str:
+    """Multicast address E1.31 sources send a universe to."""
+    return f"239.255.{universe >> 8}.{universe & 0xff}"
+
+
+def parse_ddp(data: memoryview) -> Optional[Tuple[int, memoryview]]:
+    """Channel offset and payload of a DDP data packet, without copying."""
+    if len(data) < DDP_HEADER_SIZE or data[0] & DDP_VERSION_MASK != DDP_VERSION_1:
+        return None
+    header = DDP_HEADER_SIZE + (DDP_TIMECODE_SIZE if data[0] & DDP_FLAG_TIMECODE else 0)
+    offset = int.from_bytes(data[4:8], "big")
+    length = int.from_bytes(data[8:10], "big")
+    if len(data) < header + length:
+        return None
+    return offset, data[header:header + length]
+
+
+def parse_e131(data: memoryview) -> Optional[Tuple[int, memoryview]]:
+    """Universe and DMX slots of an E1.31 data packet, without copying."""
+    if len(data) < E131_DATA_OFFSET or data[4:16] != E131_IDENTIFIER:
+        return None
+    # Property value count includes the start code, only DMX (start code 0) is used
+    count = int.from_bytes(data[E131_COUNT_OFFSET:E131_COUNT_OFFSET + 2], "big")
+    if data[E131_DATA_OFFSET - 1] != 0 or count < 1:
+        return None
+    universe = int.from_bytes(data[E131_UNIVERSE_OFFSET:E131_UNIVERSE_OFFSET + 2], "big")
+    return universe, data[E131_DATA_OFFSET:E131_DATA_OFFSET + count - 1]
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, handler) -> None:
+        self._handler = handler
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        self._handler(memoryview(data), time.monotonic())
+
+
+class UdpBridge:
+    """Maps DDP/E1.31 channels to strips and feeds their streaming sessions.
+
+    Each target takes three channels (R, G, B) starting at a 1-based channel
+    of a universe. Only the newest color reaches each strip. E1.31 is received
+    both unicast and on the multicast group of each mapped universe.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", ddp_port: int = DDP_PORT, e131_port: int = E131_PORT) -> None:
+        self._host = host
+        self._ports = {"ddp": ddp_port, "e131": e131_port}
+        self._transports: List[asyncio.DatagramTransport] = []
+        self._e131_socket: Optional[Any] = None
+        # Universes whose multicast group the E1.31 socket joined
+        self._groups: Set[int] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        # key -> (universe, channel, instance)
+        self._targets: Dict[str, Tuple[int, int, Any]] = {}
+        # universe -> [(slot offset, instance)] for E1.31
+        self._by_universe: Dict[int, List[Tuple[int, Any]]] = {}
+        # [(absolute channel offset, instance)] for DDP
+        self._by_offset: List[Tuple[int, Any]] = []
+        self._last_packet: Dict[Any, float] = {}
+        self._starting: Dict[Any, Tuple[int, int, int, float]] = {}
+        self._retry_at: Dict[Any, float] = {}
+        self._idle_timer: Optional[asyncio.TimerHandle] = None
+        self.packets = 0
+        self.invalid = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._transports)
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        for protocol, handler in (("ddp", self._handle_ddp), ("e131", self._handle_e131)):
+            try:
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda handler=handler: _Protocol(handler),
+                    local_addr=(self._host, self._ports[protocol]),
+                )
+            except OSError as err:
+                LOGGER.error("Could not listen for %s on UDP port %s: %s", protocol, self._ports[protocol], err)
+                continue
+            self._transports.append(transport)
+            LOGGER.info("Listening for %s on UDP port %s", protocol, self._ports[protocol])
+            if protocol == "e131":
+                self._e131_socket = transport.get_extra_info("socket")
+                self._update_groups()
+        self._idle_timer = loop.call_later(1.0, self._check_idle)
+
+    async def stop(self) -> None:
+        for transport in self._transports:
+            transport.close()
+        self._transports.clear()
+        # Closing the socket left its multicast groups
+        self._e131_socket = None
+        self._groups.clear()
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._starting.clear()
+        for instance in list(self._last_packet):
+            await instance.stop_stream()
+        self._last_packet.clear()
+
+    def add_target(self, key: str, universe: int, channel: int, instance: Any) -> None:
+        self._targets[key] = (universe, channel, instance)
+        self._rebuild()
+
+    def remove_target(self, key: str) -> Optional[Any]:
+        """Remove a mapping, returns its instance."""
+        target = self._targets.pop(key, None)
+        self._rebuild()
+        if target is None:
+            return None
+        self._last_packet.pop(target[2], None)
+        return target[2]
+
+    @property
+    def has_targets(self) -> bool:
+        return bool(self._targets)
+
+    def _rebuild(self) -> None:
+        by_universe: Dict[int, List[Tuple[int, Any]]] = {}
+        by_offset = []
+        for universe, channel, instance in self._targets.values():
+            by_universe.setdefault(universe, []).append((channel - 1, instance))
+            by_offset.append(((universe - 1) * UNIVERSE_SIZE + channel - 1, instance))
+        self._by_universe = by_universe
+        self._by_offset = sorted(by_offset, key=lambda target: target[0])
+        self._update_groups()
+
+    def _update_groups(self) -> None:
+        """Join the multicast group of each mapped universe and leave the others."""
+        if self._e131_socket is None:
+            return
+        wanted = set(self._by_universe)
+        for universe in wanted - self._groups:
+            if self._membership(socket.IP_ADD_MEMBERSHIP, universe):
+                self._groups.add(universe)
+        for universe in self._groups - wanted:
+            self._membership(socket.IP_DROP_MEMBERSHIP, universe)
+            self._groups.discard(universe)
+
+    def _membership(self, option: int, universe: int) -> bool:
+        group = e131_multicast_group(universe)
+        request = socket.inet_aton(group) + socket.inet_aton(self._host or "0.0.0.0")
+        try:
+            self._e131_socket.setsockopt(socket.IPPROTO_IP, option, request)
+        except OSError as err:
+            LOGGER.warning("Could not update E1.31 multicast group %s of universe %s: %s", group, universe, err)
+            return False
+        return True
+
+    def _spawn(self, coro: Coroutine[Any, Any, Any]) -> None:
+        """Run a task, keeping a reference until it is done."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _handle_e131(self, data: memoryview, received_at: float) -> None:
+        parsed = parse_e131(data)
+        if parsed is None:
+            self.invalid += 1
+            return
+        self.packets += 1
+        universe, slots = parsed
+        for offset, instance in self._by_universe.get(universe, ()):
+            if offset + 3 <= len(slots):
+                self._push(instance, slots[offset], slots[offset + 1], slots[offset + 2], received_at)
+
+    def _handle_ddp(self, data: memoryview, received_at: float) -> None:
+        parsed = parse_ddp(data)
+        if parsed is None:
+            self.invalid += 1
+            return
+        self.packets += 1
+        start, payload = parsed
+        end = start + len(payload)
+        for offset, instance in self._by_offset:
+            if offset >= end:
+                break
+            if offset >= start and offset + 3 <= end:
+                index = offset - start
+                self._push(instance, payload[index], payload[index + 1], payload[index + 2], received_at)
+
+    def _push(self, instance: Any, r: int, g: int, b: int, received_at: float) -> None:
+        self._last_packet[instance] = received_at
+        if instance.push_color(r, g, b, received_at):
+            return
+        if instance in self._starting:
+            self._starting[instance] = (r, g, b, received_at)
+            return
+        if received_at < self._retry_at.get(instance, 0.0):
+            return
+        self._starting[instance] = (r, g, b, received_at)
+        self._spawn(self._start_stream(instance))
+
+    async def _start_stream(self, instance: Any) -> None:
+        try:
+            await instance.start_stream()
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.warning("%s: Could not start streaming: %s", instance.name, err)
+            self._retry_at[instance] = time.monotonic() + STREAM_RETRY_DELAY
+            self._starting.pop(instance, None)
+            return
+        r, g, b, received_at = self._starting.pop(instance)
+        instance.push_color(r, g, b, received_at)
+
+    def _check_idle(self) -> None:
+        now = time.monotonic()
+        for instance, last in list(self._last_packet.items()):
+            if now - last > STREAM_IDLE_TIMEOUT:
+                del self._last_packet[instance]
+                self._spawn(instance.stop_stream())
+        self._idle_timer = asyncio.get_running_loop().call_later(1.0, self._check_idle)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "packets": self.packets,
+            "invalid": self.invalid,
+            "targets": len(self._targets),
+            "streaming": len(self._last_packet),
+        }
+
+
+async def async_add_udp_target(hass: HomeAssistant, key: str, universe: int, channel: int, instance: Any) -> None:
+    """Map a strip to a universe/channel, starting the listener on first use."""
+    bridge: Optional[UdpBridge] = hass.data.get(UDP_BRIDGE_DATA_KEY)
+    if bridge is None:
+        bridge = hass.data[UDP_BRIDGE_DATA_KEY] = UdpBridge()
+        await bridge.start()
+    bridge.add_target(key, universe, channel, instance)
+
+
+async def async_remove_udp_target(hass: HomeAssistant, key: str) -> None:
+    """Remove a strip mapping, stopping the listener when none is left."""
+    bridge: Optional[UdpBridge] = hass.data.get(UDP_BRIDGE_DATA_KEY)
+    if bridge is None:
+        return
+    instance = bridge.remove_target(key)
+    if instance is not None:
+        await instance.stop_stream()
+    if not bridge.has_targets:
+        del hass.data[UDP_BRIDGE_DATA_KEY]
+        await bridge.stop()